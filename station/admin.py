@@ -1,4 +1,13 @@
+import json
+
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .scheduling import validate_crew_schedule, validate_train_schedule
 from .models import (
     Station,
     Route,
@@ -7,24 +16,83 @@ from .models import (
     Train,
     Journey,
     Order,
-    Ticket
+    Ticket,
+    OccupancyDaily,
+    BookingRequest,
+    ArchivedJourney,
+    ScheduleTemplate,
+    OutboxEvent,
+    Tombstone,
 )
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts Postgres planner statistics for big tables.
+
+    An unfiltered changelist reads ``pg_class.reltuples``; a filtered one
+    asks ``EXPLAIN`` for its row estimate. Exact ``COUNT(*)`` is only run
+    when the estimate is small enough to be cheap.
+    """
+
+    exact_count_threshold = 10000
+
+    def _estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                return int(row[0]) if row else None
+
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None and estimate > self.exact_count_threshold:
+            return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables with millions of rows"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ("-id",)
+
+
 @admin.register(Station)
 class StationAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "latitude", "longitude")
+    search_fields = ("name",)
 
 
 @admin.register(Route)
 class RouteAdmin(admin.ModelAdmin):
     list_display = ("id", "source", "destination", "distance")
+    list_select_related = ("source", "destination")
     search_fields = ("source__name", "destination__name")
+    autocomplete_fields = ("source", "destination")
 
 
 @admin.register(Crew)
 class CrewAdmin(admin.ModelAdmin):
     list_display = ("id", "first_name", "last_name")
+    search_fields = ("first_name", "last_name")
 
 
 @admin.register(TrainType)
@@ -35,30 +103,139 @@ class TrainTypeAdmin(admin.ModelAdmin):
 @admin.register(Train)
 class TrainAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "cargo_num", "places_in_cargo", "train_type")
+    list_select_related = ("train_type",)
     search_fields = ("name", "train_type__name")
 
 
+class JourneyAdminForm(forms.ModelForm):
+    class Meta:
+        model = Journey
+        fields = "__all__"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        departure_time = cleaned_data.get("departure_time")
+        arrival_time = cleaned_data.get("arrival_time")
+
+        if departure_time and arrival_time:
+            if cleaned_data.get("train") and cleaned_data.get("route"):
+                validate_train_schedule(
+                    cleaned_data["train"],
+                    cleaned_data["route"],
+                    departure_time,
+                    arrival_time,
+                    ValidationError,
+                    exclude=self.instance.pk,
+                )
+            validate_crew_schedule(
+                cleaned_data.get("crews", []),
+                departure_time,
+                arrival_time,
+                ValidationError,
+                exclude=self.instance.pk,
+            )
+
+        return cleaned_data
+
+
 @admin.register(Journey)
-class JourneyAdminAdmin(admin.ModelAdmin):
-    list_display = ("id", "route", "train", "departure_time", "arrival_time")
-    list_filter = ("departure_time", "arrival_time")
+class JourneyAdminAdmin(LargeTableAdmin):
+    form = JourneyAdminForm
+    list_display = (
+        "id",
+        "route",
+        "train",
+        "departure_time",
+        "arrival_time",
+        "sale_mode",
+    )
+    list_filter = ("departure_time", "arrival_time", "sale_mode")
+    list_select_related = ("route__source", "route__destination", "train")
     search_fields = ("route__source__name", "route__destination__name")
+    autocomplete_fields = ("route", "train", "crews")
 
 
 @admin.register(Ticket)
-class TicketAdmin(admin.ModelAdmin):
+class TicketAdmin(LargeTableAdmin):
     list_display = ("id", "cargo", "seat", "journey", "order")
-    list_filter = ("journey",)
+    list_filter = ("journey__departure_time",)
+    list_select_related = ("journey__train", "order")
+    autocomplete_fields = ("journey", "order")
 
 
 class TicketInline(admin.TabularInline):
     model = Ticket
     extra = 1
+    autocomplete_fields = ("journey",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("journey__train")
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     inlines = (TicketInline,)
     list_display = ("id", "created_at", "user")
     list_filter = ("created_at",)
-    search_fields = ("user__username",)
+    list_select_related = ("user",)
+    search_fields = ("user__email",)
+    autocomplete_fields = ("user",)
+
+
+@admin.register(OccupancyDaily)
+class OccupancyDailyAdmin(LargeTableAdmin):
+    list_display = (
+        "id",
+        "date",
+        "route",
+        "train",
+        "journeys",
+        "seats_offered",
+        "tickets_sold",
+    )
+    list_filter = ("date",)
+    list_select_related = ("route__source", "route__destination", "train")
+
+
+@admin.register(BookingRequest)
+class BookingRequestAdmin(LargeTableAdmin):
+    list_display = ("id", "journey", "user", "status", "created_at")
+    list_filter = ("status",)
+    list_select_related = ("journey__train", "user")
+    raw_id_fields = ("journey", "user", "order")
+
+
+@admin.register(ArchivedJourney)
+class ArchivedJourneyAdmin(LargeTableAdmin):
+    list_display = ("id", "route", "train", "departure_time", "arrival_time")
+    list_filter = ("departure_time",)
+
+
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "route",
+        "train",
+        "departure_time",
+        "weekdays",
+        "valid_from",
+        "valid_until",
+    )
+    list_filter = ("valid_from", "valid_until")
+    list_select_related = ("route__source", "route__destination", "train")
+    autocomplete_fields = ("route", "train", "crews")
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    list_display = ("id", "topic", "aggregate_id", "created_at")
+    list_filter = ("topic",)
+    readonly_fields = ("topic", "aggregate_id", "payload", "created_at")
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(LargeTableAdmin):
+    list_display = ("id", "model", "object_id", "deleted_at")
+    list_filter = ("model",)
+    readonly_fields = ("model", "object_id", "deleted_at")
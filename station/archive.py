@@ -0,0 +1,84 @@
+from django.db import transaction
+
+from station.boards import invalidate_route_boards
+from station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    Journey,
+    OutboxEvent,
+    Ticket,
+    Tombstone,
+)
+from station.seat_map import invalidate_seat_maps
+from station.signals import muted_signals
+from station.timetable import mark_dirty
+
+
+def archive_journey_batch(journey_ids):
+    """
+    Move the given journeys and their tickets into the archive tables.
+
+    Rows are copied with ``bulk_create`` and removed with a single delete
+    per table. Signals are muted so the occupancy rollup keeps its
+    history; the other side effects of a deletion are made here.
+    """
+    with transaction.atomic(), muted_signals():
+        journeys = list(
+            Journey.objects.filter(id__in=journey_ids).select_related(
+                "route__source", "route__destination", "train"
+            )
+        )
+        ArchivedJourney.objects.bulk_create(
+            [
+                ArchivedJourney(
+                    id=journey.id,
+                    route=str(journey.route),
+                    source=journey.route.source.name,
+                    destination=journey.route.destination.name,
+                    distance=journey.route.distance,
+                    train=journey.train.name,
+                    departure_time=journey.departure_time,
+                    arrival_time=journey.arrival_time,
+                )
+                for journey in journeys
+            ],
+            ignore_conflicts=True,
+        )
+
+        tickets = Ticket.objects.filter(journey_id__in=journey_ids)
+        ArchivedTicket.objects.bulk_create(
+            [
+                ArchivedTicket(**ticket)
+                for ticket in tickets.values(
+                    "id", "cargo", "seat", "journey_id", "order_id"
+                ).iterator(chunk_size=2000)
+            ],
+            batch_size=2000,
+            ignore_conflicts=True,
+        )
+        tickets._raw_delete(tickets.db)
+        Journey.objects.filter(id__in=journey_ids).delete()
+        # What the muted deletion receivers would have done: sync clients,
+        # the change feed and the offline timetable learn of the move
+        Tombstone.record(Journey, journey_ids)
+        OutboxEvent.record_journeys(OutboxEvent.JOURNEY_DELETED, journeys)
+        mark_dirty("journeys")
+
+    invalidate_seat_maps(journey_ids)
+    invalidate_route_boards({journey.route_id for journey in journeys})
+    return len(journey_ids)
+
+
+def archive_journeys(horizon, batch_size=500):
+    """Archive every journey that arrived before ``horizon``, in batches"""
+    archived = 0
+    while True:
+        journey_ids = list(
+            Journey.objects.filter(arrival_time__lt=horizon)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not journey_ids:
+            return archived
+
+        archived += archive_journey_batch(journey_ids)
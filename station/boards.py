@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from station.models import Journey, Route
+
+
+BOARDS = {
+    "departures": ("route__source_id", "departure_time"),
+    "arrivals": ("route__destination_id", "arrival_time"),
+}
+
+
+def _version_key(station_id):
+    return f"station-board-version:{station_id}"
+
+
+def _board_key(station_id, kind, limit):
+    version = cache.get(_version_key(station_id), 0)
+    return f"station-board:{station_id}:{kind}:{limit}:v{version}"
+
+
+def invalidate_station_boards(station_ids):
+    """Drop cached boards of the stations by moving them to a new version"""
+    for station_id in set(station_ids):
+        key = _version_key(station_id)
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def invalidate_route_boards(route_ids):
+    """
+    Invalidate the boards of the routes' stations once the current
+    transaction commits; done earlier, a request could cache the old
+    rows again under the new version
+    """
+    station_ids = {
+        station_id
+        for route in Route.objects.filter(id__in=set(route_ids)).values_list(
+            "source_id", "destination_id"
+        )
+        for station_id in route
+    }
+    transaction.on_commit(
+        lambda: invalidate_station_boards(station_ids), robust=True
+    )
+
+
+def _load_board(station_id, kind, limit):
+    station_field, time_field = BOARDS[kind]
+    return list(
+        Journey.objects.filter(
+            **{station_field: station_id, f"{time_field}__gte": timezone.now()}
+        )
+        .order_by(time_field)
+        .values(
+            "id",
+            "departure_time",
+            "arrival_time",
+            "route__source__name",
+            "route__destination__name",
+            "train__name",
+        )[:limit]
+    )
+
+
+def station_board(station_id, kind, limit):
+    """
+    Next journeys leaving (or reaching) a station, served from cache.
+
+    A cached board lives ``BOARD_CACHE_TTL`` seconds at most and is
+    dropped as soon as a journey on one of the station's routes changes;
+    journeys that left since it was cached are filtered out on read.
+    """
+    key = _board_key(station_id, kind, limit)
+    rows = cache.get(key)
+    if rows is None:
+        rows = _load_board(station_id, kind, limit)
+        cache.set(key, rows, settings.BOARD_CACHE_TTL)
+
+    _, time_field = BOARDS[kind]
+    now = timezone.now()
+    return [
+        {
+            "id": row["id"],
+            "train": row["train__name"],
+            "source": row["route__source__name"],
+            "destination": row["route__destination__name"],
+            "departure_time": row["departure_time"],
+            "arrival_time": row["arrival_time"],
+        }
+        for row in rows
+        if row[time_field] >= now
+    ]
@@ -0,0 +1,92 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+
+# Replica picked for the request being handled, None to read the primary
+_read_replica = ContextVar("read_replica", default=None)
+
+
+def _pin_key(user):
+    return f"db-primary-pin:{user.pk}"
+
+
+def pin_to_primary(user):
+    """Send the user's reads to the primary for a short while"""
+    cache.set(_pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user)))
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to a replica while a replica-safe request is being handled
+    (see ``ReplicaReadMixin``); everything else, including any query run
+    inside ``transaction.atomic()``, goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = _read_replica.get()
+        if replica is None:
+            return DEFAULT_DB_ALIAS
+
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Lets safe-method requests read from a replica, one picked per request
+    so its queries see the same point in time.
+
+    Meant for reference data (stations, routes, trains, timetables)
+    where a lagging replica is harmless. Per-user and booking data
+    (orders, tickets, bookings, occupancy) stays on the primary. Users
+    who just wrote something successfully are pinned to the primary for
+    ``REPLICA_PIN_SECONDS`` so they read their own writes.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            replicas
+            and request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request.user)
+        ):
+            self._replica_token = _read_replica.set(random.choice(replicas))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _read_replica.reset(token)
+            self._replica_token = None
+
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and status.is_success(response.status_code)
+            and user
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
+
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
+
+
+logger = logging.getLogger(__name__)
+
+
+SEAT_TAKEN = "taken"
+SEAT_RELEASED = "released"
+
+
+class Subscription:
+    """
+    Queue of seat events for one listener, bound to the event loop it
+    was created on so publishers on any thread can feed it.
+    """
+
+    def __init__(self, journey_id, maxsize):
+        self.journey_id = journey_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The listener can not keep up; it will drop its backlog
+            # and resync from a fresh snapshot.
+            self.overflowed = True
+
+    def mark_stale(self):
+        """Events may have been missed: resync at the next wakeup"""
+        self.overflowed = True
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class LocalTransport:
+    """Events stay in this process; for development and tests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def next_sequence(self):
+        with self._lock:
+            self._sequence += 1
+            return self._sequence
+
+    @property
+    def last_sequence(self):
+        return self._sequence
+
+    def send(self, event, dispatch):
+        dispatch(event)
+
+    def start(self, dispatch, resync):
+        pass
+
+
+class RedisTransport:
+    """
+    Events go through a Redis channel, so every process sees sales made
+    by the others (web workers, process_sale_queue). Event ids come from
+    a shared counter; each process listens on a background thread.
+    """
+
+    CHANNEL = "seat-events"
+    SEQUENCE_KEY = "seat-events:sequence"
+
+    def __init__(self, client):
+        self.client = client
+        self._listener = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def next_sequence(self):
+        return self.client.incr(self.SEQUENCE_KEY)
+
+    @property
+    def last_sequence(self):
+        return int(self.client.get(self.SEQUENCE_KEY) or 0)
+
+    def send(self, event, dispatch):
+        self.client.publish(self.CHANNEL, json.dumps(event))
+
+    def listen(self, dispatch, resync):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                # Whatever was published while disconnected is lost
+                resync()
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        dispatch(json.loads(message["data"]))
+            except Exception:
+                logger.exception("Seat event listener lost Redis")
+                time.sleep(1)
+
+    def start(self, dispatch, resync):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self.listen,
+                    args=(dispatch, resync),
+                    name="seat-events",
+                    daemon=True,
+                )
+                self._listener.start()
+
+
+class SeatEventBus:
+    """
+    Pub/sub of seat taken/released events per journey. Local listeners
+    are fed by the transport: Redis when ``SEAT_EVENTS_REDIS_URL`` is
+    set, otherwise this process only.
+    """
+
+    def __init__(self, maxsize=256, transport=None):
+        self.maxsize = maxsize
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        if transport is not None:
+            self.transport = transport
+
+    @cached_property
+    def transport(self):
+        if settings.SEAT_EVENTS_REDIS_URL:
+            return RedisTransport.from_url(settings.SEAT_EVENTS_REDIS_URL)
+        return LocalTransport()
+
+    def subscribe(self, journey_id):
+        self.transport.start(self.dispatch, self.resync)
+        subscription = Subscription(journey_id, self.maxsize)
+        with self._lock:
+            self._subscribers[journey_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.journey_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.journey_id]
+
+    @property
+    def last_sequence(self):
+        """Id of the latest event; a snapshot is current up to it"""
+        return self.transport.last_sequence
+
+    def publish(self, journey_id, kind, seats):
+        event = {
+            "id": self.transport.next_sequence(),
+            "event": kind,
+            "journey": journey_id,
+            "seats": [list(seat) for seat in seats],
+        }
+        self.transport.send(event, self.dispatch)
+        return event
+
+    def dispatch(self, event):
+        """Hand an event to this process's listeners of its journey"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(event["journey"], ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.deliver, event
+                )
+            except RuntimeError:
+                # The listener's event loop is already closed
+                self.unsubscribe(subscription)
+
+    def resync(self):
+        """Make every local listener reload its snapshot"""
+        with self._lock:
+            subscribers = [
+                subscription
+                for subscriptions in self._subscribers.values()
+                for subscription in subscriptions
+            ]
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.mark_stale)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+    def publish_on_commit(self, journey_id, kind, seats):
+        """Publish once the surrounding transaction commits"""
+        seats = list(seats)
+        if seats:
+            # Robust: a lost event must not fail a committed sale
+            transaction.on_commit(
+                lambda: self.publish(journey_id, kind, seats), robust=True
+            )
+
+
+seat_events = SeatEventBus()
@@ -0,0 +1,118 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+READ_ACTIONS = ("list", "retrieve")
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description="Only return these fields (ex. ?fields=id,departure_time)",
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Nest these related objects in full (ex. ?expand=route)",
+    ),
+]
+
+
+def _param_to_set(value):
+    """Converts a comma separated string to a set of names"""
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer that accepts ``fields`` and ``expand`` keyword arguments.
+
+    ``fields`` keeps only the named fields; ``expand`` swaps a field for
+    the nested serializer declared in ``expandable_fields``.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        for name in expand or ():
+            if name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[name]
+                self.fields[name] = serializer_class(read_only=True, **options)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    Honours ``?fields=`` and ``?expand=`` on read actions.
+
+    Joins, prefetches and annotations are declared per field in
+    ``get_field_optimizations`` and only applied to the queryset when that
+    field is actually serialized. When every requested field is a plain
+    column, the query also selects just those columns.
+    """
+
+    def get_requested_fields(self):
+        value = self.request.query_params.get("fields")
+        if self.action not in READ_ACTIONS or not value:
+            return None
+        return _param_to_set(value)
+
+    def get_requested_expand(self):
+        value = self.request.query_params.get("expand")
+        if self.action not in READ_ACTIONS or not value:
+            return set()
+        return _param_to_set(value)
+
+    def get_field_optimizations(self, expand):
+        """Map of field name to queryset changes the field needs"""
+        return {}
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in READ_ACTIONS:
+            kwargs.setdefault("fields", self.get_requested_fields())
+            kwargs.setdefault("expand", self.get_requested_expand())
+        return super().get_serializer(*args, **kwargs)
+
+    def optimize_queryset(self, queryset):
+        if self.action not in READ_ACTIONS:
+            return queryset
+
+        serialized = set(self.get_serializer().fields)
+        optimizations = self.get_field_optimizations(
+            self.get_requested_expand()
+        )
+
+        applied = [
+            optimization
+            for name, optimization in optimizations.items()
+            if name in serialized
+        ]
+
+        for optimization in applied:
+            if optimization.get("select_related"):
+                queryset = queryset.select_related(
+                    *optimization["select_related"]
+                )
+            if optimization.get("prefetch_related"):
+                queryset = queryset.prefetch_related(
+                    *optimization["prefetch_related"]
+                )
+            if optimization.get("annotate"):
+                queryset = queryset.annotate(**optimization["annotate"])
+
+        columns = {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        if (
+            self.get_requested_fields() is not None
+            and not applied
+            and serialized <= columns
+        ):
+            queryset = queryset.only(*serialized)
+
+        return queryset
@@ -0,0 +1,38 @@
+from math import asin, cos, radians, sin, sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# A rail route is never shorter than the straight line between its
+# stations and rarely more than twice as long
+MAX_DETOUR_FACTOR = 2.0
+
+
+def great_circle_km(lat1, lon1, lat2, lon2):
+    """Haversine distance between two points given in degrees"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = (
+        sin((lat2 - lat1) / 2) ** 2
+        + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def great_circle_distances(pairs):
+    """
+    Distances for many ``((lat, lon), (lat, lon))`` pairs in one pass
+    """
+    return [
+        great_circle_km(lat1, lon1, lat2, lon2)
+        for (lat1, lon1), (lat2, lon2) in pairs
+    ]
+
+
+def is_distance_outlier(distance, great_circle):
+    """
+    Whether a typed-in route length is implausible for the straight-line
+    distance between its stations (1 km slack for rounding)
+    """
+    return not (
+        great_circle - 1 <= distance <= great_circle * MAX_DETOUR_FACTOR + 1
+    )
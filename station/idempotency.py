@@ -0,0 +1,167 @@
+import hashlib
+import json
+import time
+import zlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from station.models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+POLL_INTERVAL = 0.05
+
+
+def _dumps(data) -> bytes:
+    return json.dumps(
+        data, cls=JSONEncoder, separators=(",", ":"), sort_keys=True
+    ).encode()
+
+
+def request_fingerprint(data) -> str:
+    return hashlib.sha256(_dumps(data)).hexdigest()
+
+
+def encode_response(data) -> bytes:
+    return zlib.compress(_dumps(data))
+
+
+def decode_response(blob) -> object:
+    return json.loads(zlib.decompress(bytes(blob)))
+
+
+class IdempotentCreateMixin:
+    """
+    Makes ``create`` safe to retry when the client sends an
+    ``Idempotency-Key`` header.
+
+    The first request claims the key and its successful response is stored
+    compressed until ``IDEMPOTENCY_KEY_TTL`` passes. Replays are answered
+    from that copy; duplicates arriving while the first request is still
+    running wait for it instead of redoing the work, unless it has held
+    the key past ``IDEMPOTENCY_LOCK_TIMEOUT``: then its worker is taken
+    to be dead and the retry runs the request itself.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be at most 255 chars."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request.data)
+        record, claimed = self._claim_key(request.user, key, fingerprint)
+
+        if not claimed:
+            return self._replay(record, fingerprint)
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            self._owned(record).delete()
+            raise
+
+        if not status.is_success(response.status_code):
+            self._owned(record).delete()
+            return response
+
+        self._owned(record).update(
+            status_code=response.status_code,
+            response=encode_response(response.data),
+            locked_until=None,
+        )
+        return response
+
+    @staticmethod
+    def _owned(record):
+        """The key's row as long as this request still holds the claim"""
+        return IdempotencyKey.objects.filter(
+            pk=record.pk, claimed_at=record.claimed_at
+        )
+
+    @staticmethod
+    def _claim_key(user, key, fingerprint):
+        while True:
+            now = timezone.now()
+            locked_until = now + settings.IDEMPOTENCY_LOCK_TIMEOUT
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user=user,
+                        key=key,
+                        request_hash=fingerprint,
+                        expires_at=now + settings.IDEMPOTENCY_KEY_TTL,
+                        claimed_at=now,
+                        locked_until=locked_until,
+                    )
+                return record, True
+            except IntegrityError:
+                record = IdempotencyKey.objects.filter(
+                    user=user, key=key
+                ).first()
+
+            if record is None:
+                continue
+
+            if record.is_expired:
+                record.delete()
+                continue
+
+            if record.is_abandoned and record.request_hash == fingerprint:
+                # The worker that claimed the key died mid-request; only
+                # one retry wins the lapsed lock
+                taken = IdempotencyKey.objects.filter(
+                    pk=record.pk,
+                    status_code__isnull=True,
+                    claimed_at=record.claimed_at,
+                ).update(claimed_at=now, locked_until=locked_until)
+                if taken:
+                    record.claimed_at = now
+                    record.locked_until = locked_until
+                    return record, True
+                continue
+
+            return record, False
+
+    @staticmethod
+    def _replay(record, fingerprint):
+        if record.request_hash != fingerprint:
+            return Response(
+                {
+                    "detail": f"{IDEMPOTENCY_HEADER} was already used "
+                              f"with a different request body."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while not record.is_completed:
+            if time.monotonic() >= deadline:
+                return Response(
+                    {"detail": "A request with this key is still in progress."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            time.sleep(POLL_INTERVAL)
+            record = IdempotencyKey.objects.filter(pk=record.pk).first()
+            if record is None:
+                return Response(
+                    {"detail": "The original request failed, retry it."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+        return Response(
+            decode_response(record.response),
+            status=record.status_code,
+            headers={REPLAYED_HEADER: "true"},
+        )
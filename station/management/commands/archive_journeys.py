@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from station.archive import archive_journeys
+from station.models import Journey
+
+
+class Command(BaseCommand):
+    help = "Move departed journeys and their tickets to the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.JOURNEY_RETENTION_DAYS,
+            help="Keep journeys that arrived within this many days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of journeys moved per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many journeys would be archived",
+        )
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(days=options["days"])
+
+        if options["dry_run"]:
+            count = Journey.objects.filter(arrival_time__lt=horizon).count()
+            self.stdout.write(f"{count} journeys would be archived.")
+            return
+
+        self.stdout.write(f"Archiving journeys that arrived before {horizon}...")
+        archived = archive_journeys(horizon, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} journeys."))
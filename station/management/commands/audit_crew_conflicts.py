@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from station.scheduling import audit_crew_conflicts
+
+
+class Command(BaseCommand):
+    help = "Report crew members assigned to overlapping journeys"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error when conflicts are found",
+        )
+
+    def handle(self, *args, **options):
+        conflicts = audit_crew_conflicts()
+
+        for crew_id, first_journey, second_journey in conflicts:
+            self.stdout.write(
+                f"Crew member {crew_id}: journeys {first_journey} "
+                f"and {second_journey} overlap"
+            )
+
+        if not conflicts:
+            self.stdout.write(self.style.SUCCESS("No crew conflicts found."))
+            return
+
+        message = f"Found {len(conflicts)} crew conflicts."
+        if options["fail"]:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from station.network import build_matrix
+
+
+class Command(BaseCommand):
+    help = "Rebuild the all-pairs station distance matrix file"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Building distance matrix...")
+        stations = build_matrix()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Distance matrix built for {stations} stations."
+            )
+        )
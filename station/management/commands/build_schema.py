@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from drf_spectacular.settings import spectacular_settings
+
+from train_station_api_service.schema import (
+    code_version,
+    write_schema_artifact,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once and store it for /api/schema/ "
+        "to serve until the code version changes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=settings.SCHEMA_PATH,
+            help="Artifact path (default: SCHEMA_PATH).",
+        )
+
+    def handle(self, *args, **options):
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+        write_schema_artifact(schema, options["file"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Schema for code version {code_version()} "
+                f"written to {options['file']}."
+            )
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from station.timetable import build_snapshot
+
+
+class Command(BaseCommand):
+    help = "Build a new offline timetable snapshot from changed sections"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild every section, not only the changed ones.",
+        )
+
+    def handle(self, *args, **options):
+        snapshot = build_snapshot(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Timetable v{snapshot.version} "
+                f"({len(snapshot.bundle)} bytes compressed)."
+            )
+        )
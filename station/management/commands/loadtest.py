@@ -0,0 +1,288 @@
+import json
+import queue
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from math import ceil
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Host of in-process replays, allowed for the run whatever ALLOWED_HOSTS
+# says (the test client would otherwise send "testserver")
+LOCAL_HOST = "localhost"
+
+
+def endpoint_of(method, path):
+    """Group requests by route: drop the query, mask numeric ids"""
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path.split("?", 1)[0])
+    return f"{method} {path}"
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(results, elapsed):
+    """Throughput, latency percentiles and errors, overall and per endpoint"""
+    groups = defaultdict(list)
+    for result in results:
+        groups[result["endpoint"]].append(result)
+        groups["TOTAL"].append(result)
+
+    report = {}
+    for endpoint, group in groups.items():
+        latencies = sorted(result["ms"] for result in group)
+        report[endpoint] = {
+            "count": len(group),
+            "rps": round(len(group) / elapsed, 1) if elapsed else None,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "client_errors": sum(
+                1 for r in group if r["status"] and 400 <= r["status"] < 500
+            ),
+            "errors": sum(
+                1 for r in group if not r["status"] or r["status"] >= 500
+            ),
+        }
+    return report
+
+
+def change(current, previous):
+    if current is None or not previous:
+        return ""
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a request log captured by RequestCaptureMiddleware and "
+        "report throughput, latency percentiles and errors per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log", help="JSON lines request log to replay.")
+        parser.add_argument(
+            "--base-url",
+            help=(
+                "Server to send requests to (ex. http://localhost:8000); "
+                "in-process through the Django test client if omitted."
+            ),
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--limit", type=int, help="Replay only the first N requests."
+        )
+        parser.add_argument(
+            "--allow-writes",
+            action="store_true",
+            help=(
+                "Also replay requests that change data (POST, PUT, PATCH, "
+                "DELETE); skipped by default, as they place real orders."
+            ),
+        )
+        parser.add_argument(
+            "--no-throttle",
+            action="store_true",
+            help="Disable API throttling for in-process replays.",
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--baseline", help="Report of a previous run to compare with."
+        )
+        parser.add_argument("--save", help="Write this run's report here.")
+
+    def load_records(self, path, safe_only, limit):
+        records = []
+        try:
+            with open(path, encoding="utf-8") as log:
+                for line in log:
+                    if limit is not None and len(records) >= limit:
+                        break
+                    record = json.loads(line)
+                    if safe_only and record["method"] not in SAFE_METHODS:
+                        continue
+                    records.append(record)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Can not read {path}: {error}")
+        return records
+
+    @staticmethod
+    def tokens_for(records):
+        """Access tokens that replay each captured identity"""
+        user_ids = {record["user"] for record in records if record["user"]}
+        users = get_user_model().objects.in_bulk(user_ids)
+        return {
+            user_id: f"Bearer {AccessToken.for_user(user)}"
+            for user_id, user in users.items()
+        }
+
+    def local_sender(self):
+        clients = threading.local()
+
+        def send(record, authorization):
+            if not hasattr(clients, "client"):
+                clients.client = Client(
+                    raise_request_exception=False,
+                    SERVER_NAME=LOCAL_HOST,
+                    HTTP_HOST=LOCAL_HOST,
+                )
+            extra = {}
+            if authorization:
+                extra["HTTP_AUTHORIZATION"] = authorization
+            response = clients.client.generic(
+                record["method"],
+                record["path"],
+                data=record.get("body") or "",
+                content_type=record.get("content_type") or "application/json",
+                **extra,
+            )
+            return response.status_code
+
+        return send
+
+    def remote_sender(self, base_url, timeout):
+        def send(record, authorization):
+            body = record.get("body")
+            request = urllib.request.Request(
+                base_url.rstrip("/") + record["path"],
+                data=body.encode() if body else None,
+                method=record["method"],
+            )
+            if body:
+                request.add_header(
+                    "Content-Type",
+                    record.get("content_type") or "application/json",
+                )
+            if authorization:
+                request.add_header("Authorization", authorization)
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as res:
+                    res.read()
+                    return res.status
+            except urllib.error.HTTPError as error:
+                return error.code
+
+        return send
+
+    def replay(self, records, send, tokens, concurrency):
+        pending = queue.SimpleQueue()
+        for record in records:
+            pending.put(record)
+        results = []
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        record = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        status = send(record, tokens.get(record["user"]))
+                    except Exception:
+                        status = None
+                    results.append(
+                        {
+                            "endpoint": endpoint_of(
+                                record["method"], record["path"]
+                            ),
+                            "status": status,
+                            "ms": (time.perf_counter() - started) * 1000,
+                        }
+                    )
+            finally:
+                connections.close_all()
+
+        workers = [
+            threading.Thread(target=worker) for _ in range(concurrency)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results
+
+    def print_report(self, report, baseline):
+        self.stdout.write(
+            f"{'endpoint':<48} {'count':>6} {'rps':>7} {'p50':>7} "
+            f"{'p95':>7} {'p99':>7} {'4xx':>5} {'err':>5}"
+            + ("  p95 chg  rps chg" if baseline else "")
+        )
+        for endpoint in sorted(report, key=lambda e: (e == "TOTAL", e)):
+            row = report[endpoint]
+            line = (
+                f"{endpoint[:48]:<48} {row['count']:>6} {row['rps']:>7} "
+                f"{row['p50']:>7.1f} {row['p95']:>7.1f} {row['p99']:>7.1f} "
+                f"{row['client_errors']:>5} {row['errors']:>5}"
+            )
+            if baseline:
+                previous = baseline.get(endpoint, {})
+                line += (
+                    f"  {change(row['p95'], previous.get('p95')):>7}"
+                    f"  {change(row['rps'], previous.get('rps')):>7}"
+                )
+            if row["errors"]:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        records = self.load_records(
+            options["log"], not options["allow_writes"], options["limit"]
+        )
+        if not records:
+            raise CommandError("No requests to replay.")
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as file:
+                baseline = json.load(file)
+
+        tokens = self.tokens_for(records)
+        if options["base_url"]:
+            send = self.remote_sender(options["base_url"], options["timeout"])
+        else:
+            send = self.local_sender()
+
+        overrides = {}
+        if not options["base_url"]:
+            overrides["ALLOWED_HOSTS"] = [*settings.ALLOWED_HOSTS, LOCAL_HOST]
+        if options["no_throttle"]:
+            overrides["REST_FRAMEWORK"] = {
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_CLASSES": [],
+            }
+
+        self.stdout.write(
+            f"Replaying {len(records)} requests "
+            f"with concurrency {options['concurrency']}..."
+        )
+        with override_settings(**overrides):
+            started = time.perf_counter()
+            results = self.replay(
+                records, send, tokens, max(1, options["concurrency"])
+            )
+            elapsed = time.perf_counter() - started
+
+        report = summarize(results, elapsed)
+        self.print_report(report, baseline)
+
+        if options["save"]:
+            with open(options["save"], "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Report saved to {options['save']}.")
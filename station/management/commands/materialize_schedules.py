@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from station.scheduling import materialize_schedules
+
+
+class Command(BaseCommand):
+    help = "Create journeys from schedule templates for the coming days"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Horizon in days, starting today",
+        )
+
+    def handle(self, *args, **options):
+        until = timezone.localdate() + timedelta(days=options["days"])
+        self.stdout.write(f"Materializing schedules until {until}...")
+        journeys, skipped = materialize_schedules(until)
+
+        for template, departure_time, _ in skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Skipped {template} at {departure_time}: "
+                    f"train or crew already booked, or the train is "
+                    f"elsewhere"
+                )
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {len(journeys)} journeys.")
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from station.sale_queue import process_sale_queues
+
+
+class Command(BaseCommand):
+    help = "Book queued orders for journeys in sale mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Maximum number of requests booked per journey and batch",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.2,
+            help="Seconds to sleep when the queues are empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process a single batch per journey and exit",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Processing sale queues...")
+        while True:
+            processed = process_sale_queues(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} booking requests.")
+
+            if options["once"]:
+                break
+
+            if not processed:
+                time.sleep(options["interval"])
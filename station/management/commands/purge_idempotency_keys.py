@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from station.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete stored idempotency keys whose TTL has passed"
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {deleted} expired idempotency keys.")
+        )
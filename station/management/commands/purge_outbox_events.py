@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from station.models import OutboxEvent
+
+
+class Command(BaseCommand):
+    help = "Delete change feed events older than OUTBOX_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        # Events not yet in the feed are kept until they have a position
+        deleted, _ = OutboxEvent.objects.filter(
+            sequence__isnull=False,
+            created_at__lt=timezone.now()
+            - timedelta(days=settings.OUTBOX_RETENTION_DAYS),
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {deleted} change feed events.")
+        )
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from station.models import CommitSequence, Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than SYNC_TOMBSTONE_DAYS"
+
+    def handle(self, *args, **options):
+        expired = Tombstone.objects.filter(
+            sync_sequence__isnull=False,
+            deleted_at__lt=timezone.now()
+            - timedelta(days=settings.SYNC_TOMBSTONE_DAYS),
+        )
+        with transaction.atomic():
+            last = expired.aggregate(last=Max("sync_sequence"))["last"]
+            deleted, _ = expired.filter(sync_sequence__lte=last or 0).delete()
+            # Clients behind the purged tombstones have to start over
+            if last:
+                CommitSequence.objects.filter(
+                    name=CommitSequence.SYNC_PURGED, value__lt=last
+                ).update(value=last)
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {deleted} expired tombstones.")
+        )
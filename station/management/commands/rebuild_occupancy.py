@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from station.models import OccupancyDaily
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily occupancy rollup from journeys and tickets"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding occupancy rollup...")
+        rows = OccupancyDaily.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Occupancy rollup rebuilt: {rows} rows.")
+        )
@@ -1,26 +1,84 @@
+import random
 import time
-from django.db import connections
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import OperationalError
 from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
+    help = "Wait until the database accepts connections"
+
+    base_delay = 0.1
+    max_delay = 5.0
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to wait for",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60.0,
+            help="Give up after this many seconds",
+        )
+        parser.add_argument(
+            "--migrations",
+            action="store_true",
+            help="Also wait until all migrations are applied",
+        )
+
+    def backoff(self, attempt, deadline):
+        """Full-jitter exponential backoff that never sleeps past deadline"""
+        delay = random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** attempt)
+        )
+        return max(0.0, min(delay, deadline - time.monotonic()))
+
+    def pending_migrations(self, db_conn):
+        executor = MigrationExecutor(db_conn)
+        targets = executor.loader.graph.leaf_nodes()
+        return executor.migration_plan(targets)
 
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        attempts = 0
-        while not db_conn:
+        db_conn = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        attempt = 0
+        connected = False
+
+        while True:
             try:
-                db_conn = connections["default"]
+                if not connected:
+                    db_conn.ensure_connection()
+                    connected = True
+                    self.stdout.write(self.style.SUCCESS("Database connected!"))
 
-                db_conn.ensure_connection()
-                self.stdout.write(self.style.SUCCESS("Database connected!"))
-            except OperationalError:
-                attempts += 1
-                if attempts > 5:
-                    raise CommandError(
-                        "Database unavailable, tried 5 times and failed."
+                if not options["migrations"]:
+                    return
+
+                pending = self.pending_migrations(db_conn)
+                if not pending:
+                    self.stdout.write(
+                        self.style.SUCCESS("All migrations applied!")
                     )
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                    return
+                reason = f"{len(pending)} migrations pending"
+            except OperationalError:
+                connected = False
+                db_conn.close()
+                reason = "Database unavailable"
+
+            attempt += 1
+            if time.monotonic() >= deadline:
+                raise CommandError(
+                    f"{reason}, gave up after {attempt} attempts "
+                    f"and {options['timeout']:g} seconds."
+                )
+
+            delay = self.backoff(attempt, deadline)
+            self.stdout.write(f"{reason}, waiting {delay:.2f} seconds...")
+            time.sleep(delay)
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0004_alter_journey_route_alter_journey_train_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("journeys", models.IntegerField(default=0)),
+                ("seats_offered", models.IntegerField(default=0)),
+                ("tickets_sold", models.IntegerField(default=0)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="station.route",
+                    ),
+                ),
+                (
+                    "train",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="station.train",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "occupancy daily",
+                "ordering": ["-date", "route", "train"],
+                "unique_together": {("route", "train", "date")},
+            },
+        ),
+    ]
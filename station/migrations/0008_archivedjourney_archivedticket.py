@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0007_journey_sale_mode_bookingrequest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedJourney",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("route", models.CharField(max_length=255)),
+                ("source", models.CharField(max_length=100)),
+                ("destination", models.CharField(max_length=100)),
+                ("distance", models.IntegerField()),
+                ("train", models.CharField(max_length=100)),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name_plural": "archived journeys",
+                "ordering": ["-departure_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("cargo", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                (
+                    "journey",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tickets",
+                        to="station.archivedjourney",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tickets",
+                        to="station.order",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["cargo", "seat"],
+            },
+        ),
+    ]
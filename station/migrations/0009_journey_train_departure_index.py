@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0008_archivedjourney_archivedticket"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["train", "departure_time"],
+                name="station_jou_train_i_13d639_idx",
+            ),
+        ),
+    ]
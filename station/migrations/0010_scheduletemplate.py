@@ -0,0 +1,84 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:42
+
+import django.db.models.deletion
+import station.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0009_journey_train_departure_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduleTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("departure_time", models.TimeField()),
+                ("duration", models.DurationField()),
+                (
+                    "weekdays",
+                    models.CharField(
+                        default="1234567",
+                        help_text="ISO day numbers the service runs on (ex. 12345)",
+                        max_length=7,
+                        validators=[station.models.validate_weekdays],
+                    ),
+                ),
+                ("valid_from", models.DateField()),
+                ("valid_until", models.DateField()),
+                (
+                    "crews",
+                    models.ManyToManyField(
+                        blank=True, related_name="schedule_templates", to="station.crew"
+                    ),
+                ),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="schedule_templates",
+                        to="station.route",
+                    ),
+                ),
+                (
+                    "train",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="schedule_templates",
+                        to="station.train",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["route", "departure_time"],
+            },
+        ),
+        migrations.AddField(
+            model_name="journey",
+            name="schedule",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="journeys",
+                to="station.scheduletemplate",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="journey",
+            constraint=models.UniqueConstraint(
+                fields=("schedule", "departure_time"), name="unique_schedule_departure"
+            ),
+        ),
+    ]
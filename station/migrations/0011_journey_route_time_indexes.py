@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0010_scheduletemplate"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["route", "departure_time"],
+                name="station_jou_route_i_d72ab9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["route", "arrival_time"], name="station_jou_route_i_df2989_idx"
+            ),
+        ),
+    ]
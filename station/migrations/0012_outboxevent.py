@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:52
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0011_journey_route_time_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "topic",
+                    models.CharField(
+                        choices=[
+                            ("order.created", "Order created"),
+                            ("journey.created", "Journey created"),
+                            ("journey.updated", "Journey updated"),
+                            ("journey.deleted", "Journey deleted"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("aggregate_id", models.BigIntegerField()),
+                (
+                    "payload",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "ordering": ("id",),
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0012_outboxevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimetableSection",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=32, unique=True)),
+                ("dirty", models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TimetableSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField(unique=True)),
+                ("window_start", models.DateField()),
+                ("content", models.JSONField()),
+                ("bundle", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ("-version",),
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0013_timetablesnapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "-created_at"], name="station_ord_user_id_8a3d87_idx"
+            ),
+        ),
+    ]
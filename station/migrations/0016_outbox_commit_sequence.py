@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-19 06:21
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def number_existing_events(apps, schema_editor):
+    """Existing events keep their id as position, so cursors stay valid"""
+    CommitSequence = apps.get_model("station", "CommitSequence")
+    OutboxEvent = apps.get_model("station", "OutboxEvent")
+    OutboxEvent.objects.update(sequence=F("id"))
+    last = OutboxEvent.objects.aggregate(last=Max("id"))["last"] or 0
+    CommitSequence.objects.create(name="outbox", value=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0015_sync_updated_at_tombstone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommitSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=32, unique=True)),
+                ("value", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="outboxevent",
+            name="sequence",
+            field=models.PositiveBigIntegerField(null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.1 on 2026-10-19 06:23
+
+from django.db import migrations, models
+
+
+def create_sync_counters(apps, schema_editor):
+    CommitSequence = apps.get_model("station", "CommitSequence")
+    CommitSequence.objects.create(name="sync")
+    CommitSequence.objects.create(name="sync-purged")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0016_outbox_commit_sequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="journey",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(
+                editable=False, null=True, unique=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(
+                editable=False, null=True, unique=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="station",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(
+                editable=False, null=True, unique=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="train",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(
+                editable=False, null=True, unique=True
+            ),
+        ),
+        migrations.RunPython(create_sync_counters, migrations.RunPython.noop),
+    ]
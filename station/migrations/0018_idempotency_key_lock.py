@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-19 06:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0017_sync_commit_sequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="claimed_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="locked_until",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-19 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0018_idempotency_key_lock"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bookingrequest",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("confirmed", "Confirmed"),
+                    ("rejected", "Rejected"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-19 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0019_booking_request_failed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(
+                fields=["departure_time"], name="station_jou_departu_f114b4_idx"
+            ),
+        ),
+    ]
@@ -3,14 +3,43 @@ from django.contrib.auth.models import User
 
 import os
 import uuid
+from datetime import datetime, timedelta
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import TruncDate
 from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
 
 
-class Station(models.Model):
+class SyncedModel(models.Model):
+    """
+    Row followed by delta sync clients: ``sync_sequence`` is cleared on
+    every save and handed out again once the change has committed (see
+    ``CommitSequence``). Queryset ``update()`` calls have to clear it
+    themselves.
+    """
+
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    sync_sequence = models.PositiveBigIntegerField(
+        null=True, unique=True, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.sync_sequence = None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "sync_sequence"}
+        return super().save(*args, **kwargs)
+
+
+class Station(SyncedModel):
     name = models.CharField(max_length=100)
     latitude = models.FloatField()
     longitude = models.FloatField()
@@ -19,7 +48,7 @@ class Station(models.Model):
         return self.name
 
 
-class Route(models.Model):
+class Route(SyncedModel):
     source = models.ForeignKey(
         Station, related_name="departure_station", on_delete=models.CASCADE
     )
@@ -58,11 +87,13 @@ def train_image_file_path(instance, filename):
     return os.path.join("uploads/train_images/", filename)
 
 
-class Train(models.Model):
+class Train(SyncedModel):
     name = models.CharField(max_length=100)
     cargo_num = models.IntegerField()
     places_in_cargo = models.IntegerField()
-    train_type = models.ForeignKey(TrainType, on_delete=models.CASCADE)
+    train_type = models.ForeignKey(
+        TrainType, on_delete=models.CASCADE, related_name="trains"
+    )
     image = models.ImageField(null=True, upload_to=train_image_file_path)
 
     @property
@@ -73,20 +104,102 @@ class Train(models.Model):
         return self.name
 
 
-class Journey(models.Model):
-    route = models.ForeignKey(Route, on_delete=models.CASCADE)
-    train = models.ForeignKey(Train, on_delete=models.CASCADE)
+def validate_weekdays(value):
+    if not value or any(day not in "1234567" for day in value):
+        raise ValidationError(
+            "Weekdays must be ISO day numbers 1-7 (ex. 12345 for Mon-Fri)."
+        )
+
+
+class ScheduleTemplate(models.Model):
+    """Recurring service that materializes into journeys"""
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="schedule_templates"
+    )
+    train = models.ForeignKey(
+        Train, on_delete=models.CASCADE, related_name="schedule_templates"
+    )
+    departure_time = models.TimeField()
+    duration = models.DurationField()
+    weekdays = models.CharField(
+        max_length=7,
+        default="1234567",
+        validators=[validate_weekdays],
+        help_text="ISO day numbers the service runs on (ex. 12345)",
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    crews = models.ManyToManyField(
+        Crew, related_name="schedule_templates", blank=True
+    )
+
+    class Meta:
+        ordering = ["route", "departure_time"]
+
+    def __str__(self):
+        return f"{self.route} {self.departure_time} ({self.weekdays})"
+
+    def departures(self, start, end):
+        """Aware departure datetimes of the service between two dates"""
+        day = max(start, self.valid_from)
+        end = min(end, self.valid_until)
+        while day <= end:
+            if str(day.isoweekday()) in self.weekdays:
+                yield timezone.make_aware(
+                    datetime.combine(day, self.departure_time)
+                )
+            day += timedelta(days=1)
+
+
+class Journey(SyncedModel):
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="journeys"
+    )
+    train = models.ForeignKey(
+        Train, on_delete=models.CASCADE, related_name="journeys"
+    )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crews = models.ManyToManyField(Crew, related_name="journeys")
+    sale_mode = models.BooleanField(
+        default=False,
+        help_text="Queue orders for this journey and book them in batches",
+    )
+    schedule = models.ForeignKey(
+        ScheduleTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="journeys",
+    )
 
     class Meta:
         verbose_name_plural = "journeys"
         ordering = ["-departure_time"]
+        indexes = [
+            # Date windows over every journey, ex. tickets by ?date=
+            models.Index(fields=["departure_time"]),
+            models.Index(fields=["train", "departure_time"]),
+            models.Index(fields=["route", "departure_time"]),
+            models.Index(fields=["route", "arrival_time"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "departure_time"],
+                name="unique_schedule_departure",
+            )
+        ]
 
     def __str__(self):
         return self.train.name + " " + str(self.departure_time)
 
+    def save(self, *args, **kwargs):
+        # Keep post_save receivers (occupancy, outbox) in the same
+        # transaction as the row itself
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -97,6 +210,7 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "-created_at"])]
 
     def __str__(self):
         return str(self.created_at)
@@ -167,3 +281,496 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("journey", "cargo", "seat")
         ordering = ["cargo", "seat"]
+
+
+class ArchivedJourney(models.Model):
+    """Departed journey moved out of the hot Journey table"""
+
+    id = models.BigIntegerField(primary_key=True)
+    route = models.CharField(max_length=255)
+    source = models.CharField(max_length=100)
+    destination = models.CharField(max_length=100)
+    distance = models.IntegerField()
+    train = models.CharField(max_length=100)
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "archived journeys"
+        ordering = ["-departure_time"]
+
+    def __str__(self):
+        return self.train + " " + str(self.departure_time)
+
+
+class ArchivedTicket(models.Model):
+    """Ticket of an archived journey, still attached to its order"""
+
+    id = models.BigIntegerField(primary_key=True)
+    cargo = models.IntegerField()
+    seat = models.IntegerField()
+    journey = models.ForeignKey(
+        ArchivedJourney, on_delete=models.CASCADE, related_name="tickets"
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+
+    class Meta:
+        ordering = ["cargo", "seat"]
+
+    def __str__(self):
+        return (
+            f"{str(self.journey)} (cargo: {self.cargo}, seat: {self.seat})"
+        )
+
+
+class BookingRequest(models.Model):
+    """Order request queued for a journey in sale mode"""
+
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    REJECTED = "rejected"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (CONFIRMED, "Confirmed"),
+        (REJECTED, "Rejected"),
+        (FAILED, "Failed"),
+    )
+
+    journey = models.ForeignKey(
+        Journey, on_delete=models.CASCADE, related_name="booking_requests"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="booking_requests",
+    )
+    seats = models.JSONField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="booking_request",
+    )
+    errors = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["journey", "status", "id"])]
+
+    def __str__(self):
+        return f"{self.journey} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """Stored outcome of a create request sent with an Idempotency-Key"""
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.BinaryField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Set by the request running the key, which may take it over from
+    # one whose worker died once ``locked_until`` has passed
+    claimed_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return self.key
+
+    @property
+    def is_completed(self) -> bool:
+        return self.status_code is not None
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at <= timezone.now()
+
+    @property
+    def is_abandoned(self) -> bool:
+        return (
+            not self.is_completed
+            and self.locked_until is not None
+            and self.locked_until <= timezone.now()
+        )
+
+
+class OccupancyDaily(models.Model):
+    """Load-factor rollup per route, train and departure day."""
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="occupancy"
+    )
+    train = models.ForeignKey(
+        Train, on_delete=models.CASCADE, related_name="occupancy"
+    )
+    date = models.DateField()
+    journeys = models.IntegerField(default=0)
+    seats_offered = models.IntegerField(default=0)
+    tickets_sold = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "occupancy daily"
+        unique_together = ("route", "train", "date")
+        ordering = ["-date", "route", "train"]
+
+    def __str__(self):
+        return f"{self.route} {self.train} {self.date}"
+
+    @property
+    def load_factor(self) -> float:
+        if not self.seats_offered:
+            return 0.0
+        return round(self.tickets_sold / self.seats_offered, 4)
+
+    @staticmethod
+    def key_for(journey):
+        return {
+            "route_id": journey.route_id,
+            "train_id": journey.train_id,
+            "date": timezone.localdate(journey.departure_time),
+        }
+
+    @classmethod
+    def increment(cls, key, journeys=0, seats_offered=0, tickets_sold=0):
+        """Apply deltas to one rollup row, creating it if needed"""
+        cls.objects.get_or_create(**key)
+        cls.objects.filter(**key).update(
+            journeys=F("journeys") + journeys,
+            seats_offered=F("seats_offered") + seats_offered,
+            tickets_sold=F("tickets_sold") + tickets_sold,
+        )
+
+    @classmethod
+    def add_journeys(cls, journeys):
+        """Count many new journeys with one read and two bulk writes"""
+        deltas = {}
+        for journey in journeys:
+            key = tuple(cls.key_for(journey).values())
+            count, seats = deltas.get(key, (0, 0))
+            deltas[key] = (count + 1, seats + journey.train.capacity)
+
+        if not deltas:
+            return
+
+        route_ids, train_ids, dates = zip(*deltas)
+        with transaction.atomic():
+            existing = {
+                (row.route_id, row.train_id, row.date): row
+                for row in cls.objects.select_for_update().filter(
+                    route_id__in=set(route_ids),
+                    train_id__in=set(train_ids),
+                    date__range=(min(dates), max(dates)),
+                )
+                if (row.route_id, row.train_id, row.date) in deltas
+            }
+            created = []
+            for key, (count, seats) in deltas.items():
+                row = existing.get(key)
+                if row is None:
+                    row = cls(route_id=key[0], train_id=key[1], date=key[2])
+                    created.append(row)
+                row.journeys += count
+                row.seats_offered += seats
+
+            cls.objects.bulk_update(
+                existing.values(), ["journeys", "seats_offered"]
+            )
+            cls.objects.bulk_create(created)
+
+    @classmethod
+    def refresh(cls, route_id, train_id, date):
+        """Recompute one rollup row from the journeys of that day"""
+        key = {"route_id": route_id, "train_id": train_id, "date": date}
+        totals = Journey.objects.filter(
+            route_id=route_id,
+            train_id=train_id,
+            departure_time__date=date,
+        ).aggregate(
+            journeys=Count("id", distinct=True),
+            seats_offered=Sum(
+                F("train__cargo_num") * F("train__places_in_cargo")
+            ),
+        )
+        tickets_sold = Ticket.objects.filter(
+            journey__route_id=route_id,
+            journey__train_id=train_id,
+            journey__departure_time__date=date,
+        ).count()
+
+        if not totals["journeys"]:
+            cls.objects.filter(**key).delete()
+            return None
+
+        row, _ = cls.objects.update_or_create(
+            **key,
+            defaults={
+                "journeys": totals["journeys"],
+                "seats_offered": totals["seats_offered"] or 0,
+                "tickets_sold": tickets_sold,
+            },
+        )
+        return row
+
+    @classmethod
+    def rebuild(cls):
+        """Rebuild the whole rollup table from journeys and tickets"""
+        day = TruncDate("departure_time")
+        journey_totals = (
+            Journey.objects.annotate(day=day)
+            .values("route_id", "train_id", "day")
+            .annotate(
+                journeys=Count("id"),
+                seats_offered=Sum(
+                    F("train__cargo_num") * F("train__places_in_cargo")
+                ),
+            )
+        )
+        ticket_totals = {
+            (row["journey__route_id"], row["journey__train_id"], row["day"]):
+                row["tickets_sold"]
+            for row in Ticket.objects.annotate(
+                day=TruncDate("journey__departure_time")
+            )
+            .values("journey__route_id", "journey__train_id", "day")
+            .annotate(tickets_sold=Count("id"))
+        }
+        rows = [
+            cls(
+                route_id=row["route_id"],
+                train_id=row["train_id"],
+                date=row["day"],
+                journeys=row["journeys"],
+                seats_offered=row["seats_offered"] or 0,
+                tickets_sold=ticket_totals.get(
+                    (row["route_id"], row["train_id"], row["day"]), 0
+                ),
+            )
+            for row in journey_totals
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+class CommitSequence(models.Model):
+    """
+    Named counter that numbers rows in the order their transactions
+    commit. Ids and timestamps are taken when a row is written, so a
+    slow transaction can commit rows below a cursor a reader already
+    passed; a sequence is only handed out to rows that are already
+    visible, one pass at a time under the counter's row lock.
+    """
+
+    OUTBOX = "outbox"
+    SYNC = "sync"
+    # Not a counter: the highest sync sequence of a purged tombstone
+    SYNC_PURGED = "sync-purged"
+
+    name = models.CharField(max_length=32, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+    @classmethod
+    def assign(cls, name, querysets, field="sequence", wait=True):
+        """
+        Number the committed rows of ``querysets`` whose ``field`` is
+        still empty. With ``wait=False`` a pass already running elsewhere
+        is left to do the job; readers wait so they see every row.
+        """
+        with transaction.atomic():
+            counter = (
+                cls.objects.select_for_update(skip_locked=not wait)
+                .filter(name=name)
+                .first()
+            )
+            if counter is None:
+                return 0
+
+            assigned = 0
+            for queryset in querysets:
+                pending = (
+                    queryset.filter(**{f"{field}__isnull": True})
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                while ids := list(pending[:1000]):
+                    numbers = (
+                        When(pk=pk, then=Value(counter.value + offset))
+                        for offset, pk in enumerate(ids, start=1)
+                    )
+                    queryset.filter(pk__in=ids).update(
+                        **{field: Case(*numbers)}
+                    )
+                    counter.value += len(ids)
+                    assigned += len(ids)
+            counter.save(update_fields=["value"])
+        return assigned
+
+
+class OutboxEvent(models.Model):
+    """
+    Append-only log of booking and timetable changes, written in the
+    same transaction as the change itself and read by consumers in
+    commit order (``sequence``) through the change feed.
+    """
+
+    ORDER_CREATED = "order.created"
+    JOURNEY_CREATED = "journey.created"
+    JOURNEY_UPDATED = "journey.updated"
+    JOURNEY_DELETED = "journey.deleted"
+    TOPIC_CHOICES = [
+        (ORDER_CREATED, "Order created"),
+        (JOURNEY_CREATED, "Journey created"),
+        (JOURNEY_UPDATED, "Journey updated"),
+        (JOURNEY_DELETED, "Journey deleted"),
+    ]
+
+    topic = models.CharField(max_length=32, choices=TOPIC_CHOICES)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Position in the change feed, given once the event has committed
+    sequence = models.PositiveBigIntegerField(null=True, unique=True)
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self):
+        return f"{self.topic} #{self.aggregate_id}"
+
+    @classmethod
+    def assign_sequences(cls, wait=True):
+        return CommitSequence.assign(
+            CommitSequence.OUTBOX, [cls.objects.all()], wait=wait
+        )
+
+    @classmethod
+    def _record(cls, events):
+        events = cls.objects.bulk_create(events)
+        if events:
+            transaction.on_commit(lambda: cls.assign_sequences(wait=False))
+        return events
+
+    @staticmethod
+    def journey_payload(journey):
+        return {
+            "id": journey.id,
+            "route": journey.route_id,
+            "train": journey.train_id,
+            "departure_time": journey.departure_time,
+            "arrival_time": journey.arrival_time,
+            "sale_mode": journey.sale_mode,
+        }
+
+    @staticmethod
+    def order_payload(order, tickets):
+        return {
+            "id": order.id,
+            "user": order.user_id,
+            "created_at": order.created_at,
+            "tickets": [
+                {
+                    "journey": ticket.journey_id,
+                    "cargo": ticket.cargo,
+                    "seat": ticket.seat,
+                }
+                for ticket in tickets
+            ],
+        }
+
+    @classmethod
+    def record_orders(cls, orders_with_tickets):
+        """Log new orders; ``orders_with_tickets`` yields (order, tickets)"""
+        return cls._record(
+            cls(
+                topic=cls.ORDER_CREATED,
+                aggregate_id=order.id,
+                payload=cls.order_payload(order, tickets),
+            )
+            for order, tickets in orders_with_tickets
+        )
+
+    @classmethod
+    def record_journeys(cls, topic, journeys):
+        return cls._record(
+            cls(
+                topic=topic,
+                aggregate_id=journey.id,
+                payload=cls.journey_payload(journey),
+            )
+            for journey in journeys
+        )
+
+
+class Tombstone(models.Model):
+    """Id of a deleted row, kept for delta sync clients to drop it"""
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    sync_sequence = models.PositiveBigIntegerField(null=True, unique=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [models.Index(fields=["model", "deleted_at"])]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+    @classmethod
+    def record(cls, model, ids):
+        return cls.objects.bulk_create(
+            cls(model=model._meta.model_name, object_id=object_id)
+            for object_id in ids
+        )
+
+
+class TimetableSection(models.Model):
+    """Marks a part of the offline timetable as changed since last build"""
+
+    name = models.CharField(max_length=32, unique=True)
+    dirty = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.name
+
+
+class TimetableSnapshot(models.Model):
+    """
+    Versioned offline timetable: columnar ``content`` per section plus
+    the same bundle pre-compressed with gzip for download
+    """
+
+    version = models.PositiveIntegerField(unique=True)
+    window_start = models.DateField()
+    content = models.JSONField()
+    bundle = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-version",)
+
+    def __str__(self):
+        return f"Timetable v{self.version}"
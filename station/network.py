@@ -0,0 +1,181 @@
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from collections import defaultdict
+from math import inf, isinf
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from station.models import Route, Station
+
+
+# File layout: header (magic, station count), station ids as int64,
+# then the row-major matrix of float32 kilometres, inf when unreachable
+MAGIC = b"TSDM"
+HEADER = struct.Struct("<4sI")
+
+
+def shortest_distances(station_ids, edges):
+    """
+    All-pairs shortest distances over the directed route graph, one
+    Dijkstra run per source station
+    """
+    position = {station_id: i for i, station_id in enumerate(station_ids)}
+    graph = defaultdict(list)
+    for source, destination, distance in edges:
+        graph[position[source]].append((position[destination], distance))
+
+    size = len(station_ids)
+    matrix = array("f", [inf]) * (size * size)
+    for source in range(size):
+        row = source * size
+        best = {source: 0}
+        queue = [(0, source)]
+        while queue:
+            distance, node = heapq.heappop(queue)
+            if distance > best[node]:
+                continue
+            matrix[row + node] = distance
+            for neighbour, length in graph[node]:
+                candidate = distance + length
+                if candidate < best.get(neighbour, inf):
+                    best[neighbour] = candidate
+                    heapq.heappush(queue, (candidate, neighbour))
+    return matrix
+
+
+def build_matrix(path=None):
+    """Compute the matrix and atomically replace the file at ``path``"""
+    path = path or settings.DISTANCE_MATRIX_PATH
+    station_ids = list(
+        Station.objects.order_by("id").values_list("id", flat=True)
+    )
+    edges = Route.objects.values_list(
+        "source_id", "destination_id", "distance"
+    )
+    matrix = shortest_distances(station_ids, edges)
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        file.write(HEADER.pack(MAGIC, len(station_ids)))
+        array("q", station_ids).tofile(file)
+        matrix.tofile(file)
+    os.replace(file.name, path)
+    return len(station_ids)
+
+
+class DistanceMatrix:
+    """
+    Read side of the matrix file: memory-mapped, so every process shares
+    the pages and a lookup is one index into the mapped floats. The file
+    is mapped again whenever a rebuild replaced it.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        # (station id -> row, row length, mapped floats), swapped as one
+        self._state = ({}, 0, None)
+        self._rebuild_timer = None
+
+    @property
+    def path(self):
+        return self._path or settings.DISTANCE_MATRIX_PATH
+
+    def ensure_current(self):
+        """
+        Map the file again if it was replaced. False while there is no
+        file yet: ``build_distance_matrix`` runs on deploy, and a request
+        only starts a background build instead of running it inline.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._start_rebuild_timer()
+            return False
+
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self._stamp:
+            return True
+        with self._lock:
+            if stamp != self._stamp:
+                self._load(stamp)
+        return True
+
+    def _load(self, stamp):
+        with open(self.path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a distance matrix file.")
+
+        ids_offset = HEADER.size
+        values_offset = ids_offset + size * 8
+        station_ids = array("q")
+        station_ids.frombytes(mapped[ids_offset:values_offset])
+
+        position = {
+            station_id: i for i, station_id in enumerate(station_ids)
+        }
+        values = memoryview(mapped)[values_offset:].cast("f")
+        self._state = (position, size, values)
+        self._stamp = stamp
+
+    def distances(self, sources, destinations):
+        """
+        Many-to-many lookup: one row per source of shortest network
+        distances in km, None where unknown or unreachable. None as a
+        whole until the matrix file has been built.
+        """
+        if not self.ensure_current():
+            return None
+        position, size, values = self._state
+        columns = [position.get(station_id) for station_id in destinations]
+
+        rows = []
+        for source in sources:
+            i = position.get(source)
+            row = []
+            for j in columns:
+                if i is None or j is None:
+                    row.append(None)
+                    continue
+                value = values[i * size + j]
+                row.append(None if isinf(value) else round(value, 1))
+            rows.append(row)
+        return rows
+
+    def schedule_rebuild(self):
+        """
+        Rebuild in a background thread once the current transaction
+        commits; changes arriving within the delay share one rebuild
+        """
+        transaction.on_commit(self._start_rebuild_timer)
+
+    def _start_rebuild_timer(self):
+        with self._lock:
+            if self._rebuild_timer is not None:
+                return
+            self._rebuild_timer = threading.Timer(
+                settings.DISTANCE_MATRIX_REBUILD_DELAY, self._rebuild
+            )
+            self._rebuild_timer.daemon = True
+            self._rebuild_timer.start()
+
+    def _rebuild(self):
+        with self._lock:
+            self._rebuild_timer = None
+        try:
+            build_matrix(self.path)
+        finally:
+            connections.close_all()
+
+
+network_matrix = DistanceMatrix()
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+
+
+def int_param(request, name, default, min_value=None, max_value=None):
+    """
+    Integer query parameter: ``default`` when missing, 400 when it is
+    not a number or below ``min_value``, capped at ``max_value``
+    """
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return default
+
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: "A valid integer is required."})
+    if min_value is not None and value < min_value:
+        raise ValidationError(
+            {name: f"Ensure this value is at least {min_value}."}
+        )
+    return value if max_value is None else min(value, max_value)
+
+
+def ids_param(request, name):
+    """Comma separated ids (``?source=1,2``), an empty list when missing"""
+    value = request.query_params.get(name)
+    if not value:
+        return []
+
+    try:
+        return [int(str_id) for str_id in value.split(",")]
+    except ValueError:
+        raise ValidationError({name: "Expected comma separated ids."})
+
+
+def date_param(request, name):
+    """``YYYY-MM-DD`` query parameter as a date, None when missing"""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({name: "Use the YYYY-MM-DD format."})
@@ -0,0 +1,206 @@
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from station.events import SEAT_TAKEN, seat_events
+from station.seat_map import patch_seat_map_on_commit
+from station.serializers import BookingRequestSerializer
+from station.models import (
+    BookingRequest,
+    Journey,
+    OccupancyDaily,
+    Order,
+    OutboxEvent,
+    Ticket,
+)
+
+
+POLL_INTERVAL = 0.2
+
+
+def sale_mode_journey(tickets_data):
+    """Return the journey of an order if it has to go through the queue"""
+    journeys = {ticket["journey"] for ticket in tickets_data}
+    queued = [journey for journey in journeys if journey.sale_mode]
+
+    if not queued:
+        return None
+
+    if len(journeys) > 1:
+        raise serializers.ValidationError(
+            {
+                "tickets": "Orders for a journey in sale mode can not "
+                           "contain tickets for other journeys."
+            }
+        )
+
+    return queued[0]
+
+
+def enqueue_booking(journey, user, tickets_data):
+    return BookingRequest.objects.create(
+        journey=journey,
+        user=user,
+        seats=[
+            {"cargo": ticket["cargo"], "seat": ticket["seat"]}
+            for ticket in tickets_data
+        ],
+    )
+
+
+def book_requests(journey, bookings):
+    """Create the orders and tickets of accepted booking requests"""
+    orders = Order.objects.bulk_create(
+        [Order(user_id=booking.user_id) for booking in bookings]
+    )
+    tickets = []
+    for booking, order in zip(bookings, orders):
+        booking.status = BookingRequest.CONFIRMED
+        booking.order = order
+        tickets.extend(
+            Ticket(
+                journey=journey,
+                order=order,
+                cargo=seat["cargo"],
+                seat=seat["seat"],
+            )
+            for seat in booking.seats
+        )
+    Ticket.objects.bulk_create(tickets)
+    OutboxEvent.record_orders(
+        (order, [t for t in tickets if t.order is order]) for order in orders
+    )
+
+    if tickets:
+        OccupancyDaily.increment(
+            OccupancyDaily.key_for(journey), tickets_sold=len(tickets)
+        )
+        seats = [(ticket.cargo, ticket.seat) for ticket in tickets]
+        seat_events.publish_on_commit(journey.id, SEAT_TAKEN, seats)
+        patch_seat_map_on_commit(journey.id, seats, taken=True)
+
+
+def process_journey_queue(journey_id, batch_size=500):
+    """
+    Book a batch of pending requests for one journey in a single
+    transaction.
+
+    The journey row is locked for the whole batch, so only one writer
+    handles a journey at a time. Seats are checked against an in-memory
+    set of taken places, so conflicting requests are rejected up front
+    instead of failing on the unique index. Should the insert still fail
+    (ex. a ticket sold outside the queue), the accepted requests of the
+    batch are marked failed rather than left pending forever.
+    """
+    with transaction.atomic():
+        journey = (
+            Journey.objects.select_for_update()
+            .select_related("train")
+            .get(pk=journey_id)
+        )
+        requests = list(
+            BookingRequest.objects.filter(
+                journey=journey, status=BookingRequest.PENDING
+            ).order_by("id")[:batch_size]
+        )
+        if not requests:
+            return 0
+
+        taken = set(
+            Ticket.objects.filter(journey=journey).values_list("cargo", "seat")
+        )
+        accepted = []
+        processed_at = timezone.now()
+
+        for booking in requests:
+            places = [(seat["cargo"], seat["seat"]) for seat in booking.seats]
+            conflicts = [
+                {"cargo": cargo, "seat": seat}
+                for cargo, seat in places
+                if (cargo, seat) in taken
+            ]
+            if conflicts or len(set(places)) != len(places):
+                booking.status = BookingRequest.REJECTED
+                booking.errors = {
+                    "tickets": "Some of the requested seats are not available.",
+                    "seats": conflicts,
+                }
+            else:
+                taken.update(places)
+                accepted.append(booking)
+            booking.processed_at = processed_at
+
+        try:
+            # A savepoint, so a failed insert leaves the statuses to save
+            with transaction.atomic():
+                book_requests(journey, accepted)
+        except IntegrityError:
+            for booking in accepted:
+                booking.status = BookingRequest.FAILED
+                booking.order = None
+                booking.errors = {
+                    "detail": "The booking could not be saved, retry it."
+                }
+
+        BookingRequest.objects.bulk_update(
+            requests, ["status", "order", "errors", "processed_at"]
+        )
+
+    return len(requests)
+
+
+def process_sale_queues(batch_size=500):
+    """Run one batch for every journey that has pending requests"""
+    journey_ids = (
+        BookingRequest.objects.filter(status=BookingRequest.PENDING)
+        .values_list("journey_id", flat=True)
+        .distinct()
+    )
+    return sum(
+        process_journey_queue(journey_id, batch_size)
+        for journey_id in list(journey_ids)
+    )
+
+
+def wait_for_booking(booking, timeout):
+    """Long-poll a booking request until it leaves the queue"""
+    deadline = time.monotonic() + timeout
+    while (
+        booking.status == BookingRequest.PENDING
+        and time.monotonic() < deadline
+    ):
+        time.sleep(POLL_INTERVAL)
+        booking.refresh_from_db()
+    return booking
+
+
+class SaleQueueCreateMixin:
+    """
+    Sends orders for journeys in sale mode to the per-journey queue and
+    answers with ``202 Accepted`` and a booking handle to poll.
+    """
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        journey = sale_mode_journey(serializer.validated_data["tickets"])
+
+        if journey is None:
+            self.perform_create(serializer)
+            headers = self.get_success_headers(serializer.data)
+            return Response(
+                serializer.data, status=status.HTTP_201_CREATED, headers=headers
+            )
+
+        booking = enqueue_booking(
+            journey, request.user, serializer.validated_data["tickets"]
+        )
+        return Response(
+            BookingRequestSerializer(
+                booking, context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
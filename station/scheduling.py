@@ -0,0 +1,406 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.utils import timezone
+
+from station.boards import invalidate_route_boards
+from station.timetable import mark_dirty
+from station.models import (
+    Journey,
+    OccupancyDaily,
+    OutboxEvent,
+    ScheduleTemplate,
+)
+
+
+def find_overlaps(intervals):
+    """
+    Find every overlapping pair of intervals that share the same key.
+
+    ``intervals`` holds ``(key, start, end, item)`` tuples. They are sorted
+    once and swept with a min-heap of the intervals still open, so the
+    whole pass costs O(n log n + k) for k reported overlaps.
+    """
+    overlaps = []
+    ordered = sorted(intervals, key=itemgetter(0, 1, 2))
+
+    for key, group in groupby(ordered, key=itemgetter(0)):
+        active = []
+        for position, (_, start, end, item) in enumerate(group):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            overlaps.extend((key, other, item) for _, _, other in active)
+            heapq.heappush(active, (end, position, item))
+
+    return overlaps
+
+
+def crew_conflicts(crew_ids, departure_time, arrival_time, exclude=None):
+    """Journeys of the given crew members that overlap the time window"""
+    conflicts = (
+        Journey.crews.through.objects.filter(
+            crew_id__in=crew_ids,
+            journey__departure_time__lt=arrival_time,
+            journey__arrival_time__gt=departure_time,
+        )
+        .order_by("crew_id", "journey__departure_time")
+        .values_list("crew_id", "journey_id")
+    )
+    if exclude is not None:
+        conflicts = conflicts.exclude(journey_id=exclude)
+
+    return list(conflicts)
+
+
+def validate_crew_schedule(
+    crews, departure_time, arrival_time, error_to_raise, exclude=None
+):
+    conflicts = crew_conflicts(
+        [crew.id for crew in crews], departure_time, arrival_time, exclude
+    )
+    if conflicts:
+        raise error_to_raise(
+            {
+                "crews": [
+                    f"Crew member {crew_id} is already assigned to "
+                    f"overlapping journey {journey_id}."
+                    for crew_id, journey_id in conflicts
+                ]
+            }
+        )
+
+
+def audit_crew_conflicts():
+    """Every pair of overlapping journeys assigned to the same crew member"""
+    rows = Journey.crews.through.objects.values_list(
+        "crew_id",
+        "journey__departure_time",
+        "journey__arrival_time",
+        "journey_id",
+    )
+    return find_overlaps(rows.iterator(chunk_size=5000))
+
+
+def train_neighbours(train_id, departure_time, exclude=None):
+    """The train's journeys right before and right after a departure"""
+    journeys = Journey.objects.filter(train_id=train_id).select_related("route")
+    if exclude is not None:
+        journeys = journeys.exclude(pk=exclude)
+
+    previous = (
+        journeys.filter(departure_time__lt=departure_time)
+        .order_by("-departure_time")
+        .first()
+    )
+    following = (
+        journeys.filter(departure_time__gte=departure_time)
+        .order_by("departure_time")
+        .first()
+    )
+    return previous, following
+
+
+def validate_train_schedule(
+    train, route, departure_time, arrival_time, error_to_raise, exclude=None
+):
+    """
+    Check a journey against the train's neighbouring journeys.
+
+    The train's journeys never overlap, so only the closest journey on
+    each side can clash with the new one; both are single index lookups
+    on ``(train, departure_time)``.
+    """
+    previous, following = train_neighbours(train.id, departure_time, exclude)
+    errors = {}
+
+    if previous and previous.arrival_time > departure_time:
+        errors["train"] = (
+            f"Train is still on journey {previous.id} until "
+            f"{previous.arrival_time}."
+        )
+    elif following and following.departure_time < arrival_time:
+        errors["train"] = (
+            f"Train leaves for journey {following.id} at "
+            f"{following.departure_time}."
+        )
+    elif previous and previous.route.destination_id != route.source_id:
+        errors["route"] = (
+            f"Train arrives at station {previous.route.destination_id} "
+            f"on journey {previous.id}, not at station {route.source_id}."
+        )
+    elif following and following.route.source_id != route.destination_id:
+        errors["route"] = (
+            f"Train departs from station {following.route.source_id} "
+            f"on journey {following.id}, not from station "
+            f"{route.destination_id}."
+        )
+
+    if errors:
+        raise error_to_raise(errors)
+
+
+def train_utilization(train_id, start, end):
+    """
+    Active and idle time of a train inside ``[start, end)``.
+
+    Journeys come back sorted by departure, so overlapping or touching
+    ones are merged in a single pass.
+    """
+    journeys = (
+        Journey.objects.filter(
+            train_id=train_id, departure_time__lt=end, arrival_time__gt=start
+        )
+        .order_by("departure_time")
+        .values_list("departure_time", "arrival_time")
+    )
+    active = timedelta()
+    count = 0
+    covered_until = start
+
+    for departure_time, arrival_time in journeys:
+        count += 1
+        departure_time = max(departure_time, covered_until)
+        arrival_time = min(arrival_time, end)
+        if arrival_time > departure_time:
+            active += arrival_time - departure_time
+            covered_until = arrival_time
+
+    window = end - start
+    return {
+        "train": train_id,
+        "start": start,
+        "end": end,
+        "journeys": count,
+        "active_seconds": int(active.total_seconds()),
+        "idle_seconds": int((window - active).total_seconds()),
+        "utilization": round(active / window, 4) if window else 0.0,
+    }
+
+
+def _clashing_plans(intervals):
+    """Indexes of planned journeys that overlap something on the same key"""
+    clashes = set()
+    for _, earlier, later in find_overlaps(intervals):
+        for kind, index in (later, earlier):
+            if kind == "new" and index not in clashes:
+                clashes.add(index)
+                break
+    return clashes
+
+
+def _train_timelines(train_ids, window_start, window_end):
+    """
+    Per train, its journeys inside the window plus the closest one on
+    each side, sorted by departure as ``(departure, source, destination,
+    id)``
+    """
+    fields = (
+        "departure_time",
+        "route__source_id",
+        "route__destination_id",
+        "id",
+    )
+    timelines = defaultdict(list)
+    for train_id, *journey in Journey.objects.filter(
+        train_id__in=train_ids,
+        departure_time__gte=window_start,
+        departure_time__lte=window_end,
+    ).values_list("train_id", *fields):
+        timelines[train_id].append(tuple(journey))
+
+    for train_id in train_ids:
+        journeys = Journey.objects.filter(train_id=train_id)
+        timelines[train_id].extend(
+            journey
+            for journey in (
+                journeys.filter(departure_time__lt=window_start)
+                .order_by("-departure_time")
+                .values_list(*fields)
+                .first(),
+                journeys.filter(departure_time__gt=window_end)
+                .order_by("departure_time")
+                .values_list(*fields)
+                .first(),
+            )
+            if journey
+        )
+        timelines[train_id].sort()
+    return timelines
+
+
+def _continuity_breaks(timeline, plans):
+    """
+    Indexes of planned journeys that leave the train at the wrong station.
+
+    ``timeline`` holds the train's journeys as ``(departure, source,
+    destination, id)`` and ``plans`` its new ones as ``(departure, source,
+    destination, index)``. Both are walked in departure order, as if the
+    plans were entered one at a time: a plan is kept when the train
+    arrives where it starts, and kept plans that end anywhere but where
+    the next existing journey starts are dropped again.
+    """
+    merged = sorted(
+        [(departure, 0, *rest) for departure, *rest in timeline]
+        + [(departure, 1, *rest) for departure, *rest in plans]
+    )
+    kept = []
+    breaks = set()
+    for _, is_plan, source, destination, key in merged:
+        if is_plan:
+            if kept and kept[-1][1] != source:
+                breaks.add(key)
+            else:
+                kept.append((is_plan, destination, key))
+            continue
+
+        while kept and kept[-1][0] and kept[-1][1] != source:
+            breaks.add(kept.pop()[2])
+        kept.append((is_plan, destination, key))
+    return breaks
+
+
+def materialize_schedules(until, templates=None):
+    """
+    Create the journeys of schedule templates up to the ``until`` date.
+
+    Departures that already exist for a template are skipped, so re-runs
+    only add what is missing. Journeys that would double-book the train or
+    a crew member, or leave the train at the wrong station for the
+    journeys around them (existing or planned in the same run), are left
+    out and returned as skipped.
+    Everything new is written with ``bulk_create`` for journeys and the
+    crews through table.
+
+    Templates and their trains are locked for the run, so concurrent runs
+    wait for each other instead of planning the same departures.
+    """
+    if templates is None:
+        templates = ScheduleTemplate.objects.all()
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        templates = (
+            templates.select_related("route", "train")
+            .prefetch_related("crews")
+            .select_for_update(of=("self", "train"))
+            .order_by("id")
+        )
+        plans = []
+        for template in templates:
+            existing = set(
+                template.journeys.filter(
+                    departure_time__date__gte=today
+                ).values_list("departure_time", flat=True)
+            )
+            plans.extend(
+                (template, departure_time, departure_time + template.duration)
+                for departure_time in template.departures(today, until)
+                if departure_time not in existing
+            )
+
+        if not plans:
+            return [], []
+
+        window_start = min(departure for _, departure, _ in plans)
+        window_end = max(arrival for _, _, arrival in plans)
+        overlapping = {
+            "departure_time__lt": window_end,
+            "arrival_time__gt": window_start,
+        }
+        train_ids = {template.train_id for template, _, _ in plans}
+
+        train_intervals = [
+            (train_id, departure, arrival, ("existing", journey_id))
+            for train_id, departure, arrival, journey_id in (
+                Journey.objects.filter(
+                    train_id__in=train_ids, **overlapping
+                ).values_list(
+                    "train_id", "departure_time", "arrival_time", "id"
+                )
+            )
+        ]
+        crew_intervals = [
+            (crew_id, departure, arrival, ("existing", journey_id))
+            for crew_id, departure, arrival, journey_id in (
+                Journey.crews.through.objects.filter(
+                    crew_id__in={
+                        crew.id
+                        for template, _, _ in plans
+                        for crew in template.crews.all()
+                    },
+                    **{
+                        f"journey__{key}": value
+                        for key, value in overlapping.items()
+                    },
+                ).values_list(
+                    "crew_id",
+                    "journey__departure_time",
+                    "journey__arrival_time",
+                    "journey_id",
+                )
+            )
+        ]
+        for index, (template, departure, arrival) in enumerate(plans):
+            train_intervals.append(
+                (template.train_id, departure, arrival, ("new", index))
+            )
+            crew_intervals.extend(
+                (crew.id, departure, arrival, ("new", index))
+                for crew in template.crews.all()
+            )
+
+        clashes = _clashing_plans(train_intervals) | _clashing_plans(
+            crew_intervals
+        )
+        timelines = _train_timelines(train_ids, window_start, window_end)
+        train_plans = defaultdict(list)
+        for index, (template, departure, _) in enumerate(plans):
+            if index not in clashes:
+                train_plans[template.train_id].append(
+                    (
+                        departure,
+                        template.route.source_id,
+                        template.route.destination_id,
+                        index,
+                    )
+                )
+        for train_id, new in train_plans.items():
+            clashes |= _continuity_breaks(timelines[train_id], new)
+        accepted = [
+            plan for index, plan in enumerate(plans) if index not in clashes
+        ]
+        skipped = [
+            plan for index, plan in enumerate(plans) if index in clashes
+        ]
+
+        journeys = Journey.objects.bulk_create(
+            [
+                Journey(
+                    route=template.route,
+                    train=template.train,
+                    departure_time=departure,
+                    arrival_time=arrival,
+                    schedule=template,
+                )
+                for template, departure, arrival in accepted
+            ],
+            batch_size=1000,
+        )
+        Journey.crews.through.objects.bulk_create(
+            [
+                Journey.crews.through(journey_id=journey.id, crew_id=crew.id)
+                for journey, (template, _, _) in zip(journeys, accepted)
+                for crew in template.crews.all()
+            ],
+            batch_size=1000,
+        )
+        OccupancyDaily.add_journeys(journeys)
+        OutboxEvent.record_journeys(OutboxEvent.JOURNEY_CREATED, journeys)
+        mark_dirty("journeys")
+
+    invalidate_route_boards({journey.route_id for journey in journeys})
+    return journeys, skipped
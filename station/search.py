@@ -0,0 +1,167 @@
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from station.models import Journey, Station
+
+
+INDEX_VERSION_KEY = "station-index-version"
+
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e",
+    "є": "ie", "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia", "ё": "e",
+    "ы": "y", "э": "e", "ъ": "", "'": "", "’": "",
+}
+
+
+def normalize(text: str) -> str:
+    """Casefold, transliterate Cyrillic and strip accents (Київ -> kyiv)"""
+    text = "".join(CYRILLIC_TO_LATIN.get(char, char) for char in text.casefold())
+    text = "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+    return " ".join(
+        "".join(char if char.isalnum() else " " for char in text).split()
+    )
+
+
+def index_keys(name: str) -> set:
+    """The full normalized name plus every suffix starting at a word"""
+    words = normalize(name).split()
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class StationIndex:
+    """
+    Sorted array of normalized station names for prefix lookups.
+
+    A query is a binary search for the first key with the prefix followed
+    by a scan of the matching slice, so lookups never touch the database.
+    Popularity (journeys from and to a station) is counted again once it
+    is ``STATION_POPULARITY_TTL`` seconds old.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._ids = []
+        self._names = {}
+        self._popularity = {}
+        self._popularity_loaded_at = 0
+        self.version = None
+        self.built = False
+
+    @staticmethod
+    def _load_popularity():
+        popularity = {}
+        for field in ("route__source", "route__destination"):
+            for row in Journey.objects.values(field).annotate(n=Count("id")):
+                popularity[row[field]] = popularity.get(row[field], 0) + row["n"]
+        return popularity
+
+    def build(self):
+        version = current_index_version()
+        entries = []
+        names = {}
+        for station_id, name in Station.objects.values_list("id", "name"):
+            names[station_id] = name
+            entries.extend((key, station_id) for key in index_keys(name))
+        entries.sort()
+        popularity = self._load_popularity()
+
+        with self._lock:
+            self._keys = [key for key, _ in entries]
+            self._ids = [station_id for _, station_id in entries]
+            self._names = names
+            self._popularity = popularity
+            self._popularity_loaded_at = time.monotonic()
+            self.version = version
+            self.built = True
+
+    def refresh_popularity(self):
+        popularity = self._load_popularity()
+        with self._lock:
+            self._popularity = popularity
+            self._popularity_loaded_at = time.monotonic()
+
+    def add(self, station):
+        with self._lock:
+            self._names[station.id] = station.name
+            for key in index_keys(station.name):
+                position = bisect_left(self._keys, key)
+                self._keys.insert(position, key)
+                self._ids.insert(position, station.id)
+
+    def remove(self, station_id):
+        with self._lock:
+            self._names.pop(station_id, None)
+            keep = [
+                (key, id_)
+                for key, id_ in zip(self._keys, self._ids)
+                if id_ != station_id
+            ]
+            self._keys = [key for key, _ in keep]
+            self._ids = [id_ for _, id_ in keep]
+
+    def ensure_current(self):
+        if not self.built or self.version != current_index_version():
+            self.build()
+        elif (
+            time.monotonic() - self._popularity_loaded_at
+            >= settings.STATION_POPULARITY_TTL
+        ):
+            self.refresh_popularity()
+
+    def search(self, query, limit=10):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        self.ensure_current()
+        with self._lock:
+            keys, ids = self._keys, self._ids
+            position = bisect_left(keys, prefix)
+            matches = set()
+            while position < len(keys) and keys[position].startswith(prefix):
+                matches.add(ids[position])
+                position += 1
+            best = heapq.nlargest(
+                limit,
+                matches,
+                key=lambda station_id: (
+                    self._popularity.get(station_id, 0),
+                    -station_id,
+                ),
+            )
+            return [
+                {
+                    "id": station_id,
+                    "name": self._names[station_id],
+                    "popularity": self._popularity.get(station_id, 0),
+                }
+                for station_id in best
+            ]
+
+
+def current_index_version():
+    return cache.get(INDEX_VERSION_KEY) or 0
+
+
+def bump_index_version():
+    """Tell other processes their station index is out of date"""
+    cache.add(INDEX_VERSION_KEY, 0, None)
+    return cache.incr(INDEX_VERSION_KEY)
+
+
+station_index = StationIndex()
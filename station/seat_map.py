@@ -0,0 +1,143 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from station.models import Journey, Ticket
+
+
+FREE = "0"
+TAKEN = "1"
+
+
+def _key(journey_id):
+    return f"seat-map:{journey_id}"
+
+
+@contextmanager
+def cache_lock(key, timeout=5, wait=2.0):
+    """
+    Best-effort mutex on top of the cache: ``add`` only succeeds for one
+    caller, the lock expires by itself if its holder dies
+    """
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + wait
+    while not cache.add(lock_key, 1, timeout):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Could not lock {key}")
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        cache.delete(lock_key)
+
+
+def render_seat_map(journey_id):
+    """
+    Grid of a journey: one string per cargo, one character per seat,
+    ``1`` where the seat is taken. Read from the primary, as a map
+    rendered from a lagging replica would be cached without its latest
+    sales.
+    """
+    train = (
+        Journey.objects.using(DEFAULT_DB_ALIAS)
+        .filter(pk=journey_id)
+        .values("train__cargo_num", "train__places_in_cargo")
+        .first()
+    )
+    if train is None:
+        return None
+
+    cargo_num = train["train__cargo_num"]
+    places = train["train__places_in_cargo"]
+    grid = [[FREE] * places for _ in range(cargo_num)]
+    taken = (
+        Ticket.objects.using(DEFAULT_DB_ALIAS)
+        .filter(journey_id=journey_id)
+        .values_list("cargo", "seat")
+    )
+    for cargo, seat in taken:
+        grid[cargo - 1][seat - 1] = TAKEN
+
+    cargos = ["".join(row) for row in grid]
+    return {
+        "journey": journey_id,
+        "cargo_num": cargo_num,
+        "places_in_cargo": places,
+        "available": sum(row.count(FREE) for row in cargos),
+        "cargos": cargos,
+    }
+
+
+def get_seat_map(journey_id):
+    """Seat map from cache, rendered and cached on a miss"""
+    if not settings.SEAT_MAP_CACHE:
+        return render_seat_map(journey_id)
+
+    key = _key(journey_id)
+    seat_map = cache.get(key)
+    if seat_map is not None:
+        return seat_map
+
+    # Render under the lock so a concurrent patch can not be lost
+    with cache_lock(key):
+        seat_map = cache.get(key)
+        if seat_map is None:
+            seat_map = render_seat_map(journey_id)
+            if seat_map is not None:
+                cache.set(key, seat_map, settings.SEAT_MAP_CACHE_TTL)
+    return seat_map
+
+
+def patch_seat_map(journey_id, seats, taken):
+    """
+    Write-through update of a cached seat map: flip the given
+    ``(cargo, seat)`` pairs in place instead of rendering it again
+    """
+    if not settings.SEAT_MAP_CACHE:
+        return
+
+    key = _key(journey_id)
+    mark = TAKEN if taken else FREE
+    with cache_lock(key):
+        seat_map = cache.get(key)
+        if seat_map is None:
+            return
+
+        cargos = [list(row) for row in seat_map["cargos"]]
+        for cargo, seat in seats:
+            cargos[cargo - 1][seat - 1] = mark
+        seat_map["cargos"] = ["".join(row) for row in cargos]
+        seat_map["available"] = sum(
+            row.count(FREE) for row in seat_map["cargos"]
+        )
+        cache.set(key, seat_map, settings.SEAT_MAP_CACHE_TTL)
+
+
+def patch_or_invalidate_seat_map(journey_id, seats, taken):
+    """
+    Patch the cached map, or drop it when its lock is busy: this runs
+    after the sale committed, so it must not fail the request
+    """
+    try:
+        patch_seat_map(journey_id, seats, taken)
+    except TimeoutError:
+        invalidate_seat_maps([journey_id])
+
+
+def patch_seat_map_on_commit(journey_id, seats, taken):
+    seats = list(seats)
+    if seats:
+        transaction.on_commit(
+            lambda: patch_or_invalidate_seat_map(journey_id, seats, taken),
+            robust=True,
+        )
+
+
+def invalidate_seat_maps(journey_ids):
+    if settings.SEAT_MAP_CACHE:
+        cache.delete_many(
+            [_key(journey_id) for journey_id in journey_ids]
+        )
@@ -1,6 +1,14 @@
 from django.db import transaction
 
 from rest_framework import serializers
+from station.fieldsets import DynamicFieldsMixin
+from station.geo import great_circle_distances, is_distance_outlier
+from station.network import network_matrix
+from station.scheduling import (
+    validate_crew_schedule,
+    validate_train_schedule,
+)
+from station.timetable import mark_dirty
 from station.models import (
     Station,
     Route,
@@ -10,16 +18,31 @@ from station.models import (
     Journey,
     Order,
     Ticket,
+    OccupancyDaily,
+    BookingRequest,
+    ArchivedJourney,
+    ArchivedTicket,
+    ScheduleTemplate,
+    OutboxEvent,
 )
 
 
-class StationSerializer(serializers.ModelSerializer):
+class StationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Station
         fields = ("id", "name", "latitude", "longitude")
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class StationBoardSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    train = serializers.CharField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class RouteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Route
@@ -29,6 +52,10 @@ class RouteSerializer(serializers.ModelSerializer):
 class RouteListSerializer(RouteSerializer):
     source = serializers.CharField(source="source.name")
     destination = serializers.CharField(source="destination.name")
+    expandable_fields = {
+        "source": (StationSerializer, {}),
+        "destination": (StationSerializer, {}),
+    }
 
     class Meta:
         model = Route
@@ -44,6 +71,101 @@ class RouteDetailSerializer(RouteSerializer):
         fields = ("id", "source", "destination", "distance")
 
 
+class RouteBulkItemSerializer(serializers.Serializer):
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    distance = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        if attrs["source"] == attrs["destination"]:
+            raise serializers.ValidationError(
+                "Source and destination must be different stations."
+            )
+        return attrs
+
+
+class RouteBulkCreateSerializer(serializers.Serializer):
+    routes = RouteBulkItemSerializer(
+        many=True, allow_empty=False, max_length=1000
+    )
+
+    def validate_routes(self, routes):
+        # Resolve every station in one query rather than one per pair
+        station_ids = {
+            station_id
+            for route in routes
+            for station_id in (route["source"], route["destination"])
+        }
+        stations = Station.objects.only("latitude", "longitude").in_bulk(
+            station_ids
+        )
+        missing = sorted(station_ids - set(stations))
+        if missing:
+            raise serializers.ValidationError(
+                f"Unknown station ids: {', '.join(map(str, missing))}."
+            )
+        self.context["stations"] = stations
+        return routes
+
+    def create(self, validated_data):
+        stations = self.context["stations"]
+        routes_data = validated_data["routes"]
+        coordinates = {
+            station_id: (station.latitude, station.longitude)
+            for station_id, station in stations.items()
+        }
+        great_circles = great_circle_distances(
+            (coordinates[route["source"]], coordinates[route["destination"]])
+            for route in routes_data
+        )
+
+        with transaction.atomic():
+            routes = Route.objects.bulk_create(
+                Route(
+                    source_id=route["source"],
+                    destination_id=route["destination"],
+                    distance=(
+                        route.get("distance") or max(1, round(great_circle))
+                    ),
+                )
+                for route, great_circle in zip(routes_data, great_circles)
+            )
+            # bulk_create skips the signals that flag the timetable and
+            # refresh the distance matrix
+            mark_dirty("routes")
+            network_matrix.schedule_rebuild()
+
+        for route, route_data, great_circle in zip(
+            routes, routes_data, great_circles
+        ):
+            route.great_circle = round(great_circle, 1)
+            route.distance_computed = "distance" not in route_data
+            route.outlier = is_distance_outlier(route.distance, great_circle)
+        return {"routes": routes}
+
+
+class RouteBulkResultSerializer(serializers.ModelSerializer):
+    great_circle = serializers.FloatField(
+        help_text="Straight-line distance between the stations, km"
+    )
+    distance_computed = serializers.BooleanField()
+    outlier = serializers.BooleanField(
+        help_text="Given distance is implausible for the station coordinates"
+    )
+
+    class Meta:
+        model = Route
+        fields = (
+            "id",
+            "source",
+            "destination",
+            "distance",
+            "great_circle",
+            "distance_computed",
+            "outlier",
+        )
+
+
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
@@ -56,7 +178,7 @@ class TrainTypeSerializer(serializers.ModelSerializer):
         fields = ("id", "name")
 
 
-class TrainSerializer(serializers.ModelSerializer):
+class TrainSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     train_type = serializers.CharField(source="train_type.name")
 
     class Meta:
@@ -87,14 +209,10 @@ class TrainImageSerializer(serializers.ModelSerializer):
 class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
-        Ticket.validate_cargo(
+        Ticket.validate_ticket(
             attrs["cargo"],
-            attrs["journey"].train.cargo_num,
-            serializers.ValidationError,
-        )
-        Ticket.validate_seat(
             attrs["seat"],
-            attrs["journey"].train.places_in_cargo,
+            attrs["journey"].train,
             serializers.ValidationError,
         )
 
@@ -105,7 +223,44 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ("id", "cargo", "seat", "journey", "order")
 
 
-class JourneySerializer(serializers.ModelSerializer):
+class OrderTicketSerializer(TicketSerializer):
+    class Meta:
+        model = Ticket
+        fields = ("id", "cargo", "seat", "journey")
+
+
+class JourneySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    def validate(self, attrs):
+        data = super(JourneySerializer, self).validate(attrs=attrs)
+        departure_time = attrs.get(
+            "departure_time", getattr(self.instance, "departure_time", None)
+        )
+        arrival_time = attrs.get(
+            "arrival_time", getattr(self.instance, "arrival_time", None)
+        )
+
+        if arrival_time <= departure_time:
+            raise serializers.ValidationError(
+                {"arrival_time": "Arrival time must be after departure time."}
+            )
+
+        validate_train_schedule(
+            attrs.get("train", getattr(self.instance, "train", None)),
+            attrs.get("route", getattr(self.instance, "route", None)),
+            departure_time,
+            arrival_time,
+            serializers.ValidationError,
+            exclude=getattr(self.instance, "pk", None),
+        )
+        validate_crew_schedule(
+            attrs.get("crews", []),
+            departure_time,
+            arrival_time,
+            serializers.ValidationError,
+            exclude=getattr(self.instance, "pk", None),
+        )
+
+        return data
 
     class Meta:
         model = Journey
@@ -115,10 +270,28 @@ class JourneySerializer(serializers.ModelSerializer):
             "departure_time",
             "arrival_time",
             "route",
-            "crews"
+            "crews",
+            "sale_mode",
         )
 
 
+class JourneyCrewAssignmentSerializer(serializers.Serializer):
+    crews = serializers.PrimaryKeyRelatedField(
+        many=True, queryset=Crew.objects.all(), allow_empty=False
+    )
+
+    def validate(self, attrs):
+        journey = self.context["journey"]
+        validate_crew_schedule(
+            attrs["crews"],
+            journey.departure_time,
+            journey.arrival_time,
+            serializers.ValidationError,
+            exclude=journey.pk,
+        )
+        return attrs
+
+
 class JourneyListSerializer(JourneySerializer):
     train = TrainSerializer(many=False, read_only=True)
     route_distance = serializers.IntegerField(source="route.distance")
@@ -127,6 +300,10 @@ class JourneyListSerializer(JourneySerializer):
     seats_places_in_cargo_available = serializers.IntegerField(read_only=True)
     count_taken_seats = serializers.IntegerField(read_only=True)
     count_taken_cargo = serializers.IntegerField(read_only=True)
+    expandable_fields = {
+        "route": (RouteDetailSerializer, {}),
+        "crews": (CrewSerializer, {"many": True}),
+    }
 
     class Meta:
         model = Journey
@@ -148,6 +325,55 @@ class TicketListSerializer(TicketSerializer):
     journey = JourneyListSerializer(many=False, read_only=True)
 
 
+class RoundTripSearchSerializer(serializers.Serializer):
+    origin = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    outbound_date = serializers.DateField()
+    return_date = serializers.DateField()
+    min_stay = serializers.IntegerField(
+        min_value=0, default=0, help_text="Hours between arrival and return"
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate(self, attrs):
+        if attrs["origin"] == attrs["destination"]:
+            raise serializers.ValidationError(
+                "Origin and destination must be different stations."
+            )
+        if attrs["return_date"] < attrs["outbound_date"]:
+            raise serializers.ValidationError(
+                "Return date can not be before the outbound date."
+            )
+        return attrs
+
+
+class RoundTripLegSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    train = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    available_seats = serializers.IntegerField()
+
+
+class RoundTripSerializer(serializers.Serializer):
+    outbound = RoundTripLegSerializer()
+    inbound = RoundTripLegSerializer()
+    total_duration = serializers.DurationField()
+    stay = serializers.DurationField()
+    available_seats = serializers.IntegerField()
+
+
+class SeatMapSerializer(serializers.Serializer):
+    journey = serializers.IntegerField()
+    cargo_num = serializers.IntegerField()
+    places_in_cargo = serializers.IntegerField()
+    available = serializers.IntegerField()
+    cargos = serializers.ListField(
+        child=serializers.CharField(),
+        help_text="One string per cargo, one character per seat: 1 = taken",
+    )
+
+
 class JourneyDetailSerializer(JourneySerializer):
     route = RouteSerializer(many=False, read_only=True)
     crews = CrewSerializer(many=True, read_only=True)
@@ -158,6 +384,7 @@ class JourneyDetailSerializer(JourneySerializer):
     taken_cargo = serializers.SlugRelatedField(
         source="tickets", many=True, read_only=True, slug_field="cargo"
     )
+    expandable_fields = {"train": (TrainSerializer, {})}
 
     class Meta:
         model = Journey
@@ -175,7 +402,9 @@ class JourneyDetailSerializer(JourneySerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = OrderTicketSerializer(
+        many=True, read_only=False, allow_empty=False
+    )
 
     class Meta:
         model = Order
@@ -185,10 +414,137 @@ class OrderSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
+            tickets = [
                 Ticket.objects.create(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            ]
+            OutboxEvent.record_orders([(order, tickets)])
             return order
 
 
+class ArchivedJourneySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedJourney
+        fields = (
+            "id",
+            "route",
+            "source",
+            "destination",
+            "distance",
+            "train",
+            "departure_time",
+            "arrival_time",
+        )
+
+
+class ArchivedTicketSerializer(serializers.ModelSerializer):
+    journey = ArchivedJourneySerializer(many=False, read_only=True)
+
+    class Meta:
+        model = ArchivedTicket
+        fields = ("id", "cargo", "seat", "journey", "order")
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+    archived_tickets = ArchivedTicketSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ("id", "created_at", "tickets", "archived_tickets")
+
+
+class BookingRequestSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="station:booking-detail"
+    )
+
+    class Meta:
+        model = BookingRequest
+        fields = (
+            "id",
+            "url",
+            "journey",
+            "seats",
+            "status",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = fields
+
+
+class OccupancyDailySerializer(serializers.ModelSerializer):
+    route = serializers.StringRelatedField(read_only=True)
+    train = serializers.CharField(source="train.name", read_only=True)
+    load_factor = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = OccupancyDaily
+        fields = (
+            "id",
+            "date",
+            "route_id",
+            "route",
+            "train_id",
+            "train",
+            "journeys",
+            "seats_offered",
+            "tickets_sold",
+            "load_factor",
+        )
+
+
+class ScheduleTemplateSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        data = super(ScheduleTemplateSerializer, self).validate(attrs=attrs)
+        if attrs["valid_until"] < attrs["valid_from"]:
+            raise serializers.ValidationError(
+                {"valid_until": "Validity must end after it starts."}
+            )
+        return data
+
+    class Meta:
+        model = ScheduleTemplate
+        fields = (
+            "id",
+            "route",
+            "train",
+            "departure_time",
+            "duration",
+            "weekdays",
+            "valid_from",
+            "valid_until",
+            "crews",
+        )
+
+
+class ScheduleMaterializeSerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=366, default=30)
+
+
+class OutboxEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OutboxEvent
+        fields = (
+            "id",
+            "sequence",
+            "topic",
+            "aggregate_id",
+            "payload",
+            "created_at",
+        )
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    next_cursor = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    results = OutboxEventSerializer(many=True)
+
+
+class SyncSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    changed = serializers.ListField(child=serializers.DictField())
+    deleted = serializers.ListField(child=serializers.IntegerField())
@@ -0,0 +1,254 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from station.boards import invalidate_route_boards
+from station.events import SEAT_RELEASED, SEAT_TAKEN, seat_events
+from station.models import (
+    Journey,
+    OccupancyDaily,
+    OutboxEvent,
+    Route,
+    Station,
+    Ticket,
+    Tombstone,
+    Train,
+)
+from station.network import network_matrix
+from station.search import bump_index_version, station_index
+from station.seat_map import invalidate_seat_maps, patch_seat_map_on_commit
+from station.timetable import mark_dirty
+
+
+_muted = ContextVar("station_signals_muted", default=False)
+
+
+@contextmanager
+def muted_signals():
+    """Skip the station receivers, e.g. while bulk-moving rows"""
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+def unless_muted(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _muted.get():
+            return handler(*args, **kwargs)
+
+    return wrapper
+
+
+@receiver(pre_save, sender=Journey)
+@unless_muted
+def remember_journey_occupancy_key(sender, instance, **kwargs):
+    instance._previous_occupancy_key = None
+    if instance.pk:
+        previous = Journey.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._previous_occupancy_key = OccupancyDaily.key_for(previous)
+
+
+@receiver(post_save, sender=Journey)
+@unless_muted
+def update_occupancy_on_journey_save(sender, instance, created, **kwargs):
+    if created:
+        OccupancyDaily.increment(
+            OccupancyDaily.key_for(instance),
+            journeys=1,
+            seats_offered=instance.train.capacity,
+        )
+        return
+
+    previous_key = getattr(instance, "_previous_occupancy_key", None)
+    current_key = OccupancyDaily.key_for(instance)
+    for key in {tuple(k.values()) for k in (previous_key, current_key) if k}:
+        OccupancyDaily.refresh(*key)
+
+
+@receiver(post_save, sender=Journey)
+@unless_muted
+def invalidate_boards_on_journey_save(sender, instance, **kwargs):
+    previous_key = getattr(instance, "_previous_occupancy_key", None) or {}
+    invalidate_route_boards(
+        {instance.route_id, previous_key.get("route_id", instance.route_id)}
+    )
+
+
+@receiver(post_delete, sender=Journey)
+@unless_muted
+def update_occupancy_on_journey_delete(sender, instance, **kwargs):
+    OccupancyDaily.refresh(*OccupancyDaily.key_for(instance).values())
+    invalidate_route_boards([instance.route_id])
+
+
+@receiver(post_save, sender=Journey)
+@unless_muted
+def record_journey_change(sender, instance, created, **kwargs):
+    OutboxEvent.record_journeys(
+        OutboxEvent.JOURNEY_CREATED if created else OutboxEvent.JOURNEY_UPDATED,
+        [instance],
+    )
+
+
+@receiver(post_delete, sender=Journey)
+@unless_muted
+def record_journey_delete(sender, instance, **kwargs):
+    OutboxEvent.record_journeys(OutboxEvent.JOURNEY_DELETED, [instance])
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def update_occupancy_on_ticket_sale(sender, instance, created, **kwargs):
+    if created:
+        OccupancyDaily.increment(
+            OccupancyDaily.key_for(instance.journey), tickets_sold=1
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def update_occupancy_on_ticket_delete(sender, instance, **kwargs):
+    journey = Journey.objects.filter(pk=instance.journey_id).first()
+    if journey:
+        OccupancyDaily.increment(
+            OccupancyDaily.key_for(journey), tickets_sold=-1
+        )
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def publish_seat_taken(sender, instance, created, **kwargs):
+    if created:
+        seat_events.publish_on_commit(
+            instance.journey_id, SEAT_TAKEN, [(instance.cargo, instance.seat)]
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def publish_seat_released(sender, instance, **kwargs):
+    seat_events.publish_on_commit(
+        instance.journey_id, SEAT_RELEASED, [(instance.cargo, instance.seat)]
+    )
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def mark_seat_taken(sender, instance, created, **kwargs):
+    if created:
+        patch_seat_map_on_commit(
+            instance.journey_id, [(instance.cargo, instance.seat)], taken=True
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def mark_seat_free(sender, instance, **kwargs):
+    patch_seat_map_on_commit(
+        instance.journey_id, [(instance.cargo, instance.seat)], taken=False
+    )
+
+
+@receiver(post_save, sender=Journey)
+@receiver(post_delete, sender=Journey)
+@unless_muted
+def invalidate_seat_map_on_journey_change(sender, instance, **kwargs):
+    # Only a new train changes the grid, but journeys are edited rarely
+    if not kwargs.get("created"):
+        journey_id = instance.id
+        transaction.on_commit(lambda: invalidate_seat_maps([journey_id]))
+
+
+@receiver(post_save, sender=Station)
+@unless_muted
+def update_station_index_on_save(sender, instance, created, **kwargs):
+    # After commit, so other processes never rebuild without the change
+    def update():
+        version = bump_index_version()
+        if station_index.built and station_index.version == version - 1:
+            if not created:
+                station_index.remove(instance.id)
+            station_index.add(instance)
+            station_index.version = version
+
+    transaction.on_commit(update)
+
+
+@receiver(post_delete, sender=Station)
+@unless_muted
+def update_station_index_on_delete(sender, instance, **kwargs):
+    station_id = instance.id
+
+    def update():
+        version = bump_index_version()
+        if station_index.built and station_index.version == version - 1:
+            station_index.remove(station_id)
+            station_index.version = version
+
+    transaction.on_commit(update)
+
+
+TIMETABLE_SECTIONS = {
+    Station: "stations",
+    Route: "routes",
+    Train: "trains",
+    Journey: "journeys",
+}
+
+
+@receiver([post_save, post_delete], sender=Station)
+@receiver([post_save, post_delete], sender=Route)
+@receiver([post_save, post_delete], sender=Train)
+@receiver([post_save, post_delete], sender=Journey)
+@unless_muted
+def mark_timetable_dirty(sender, instance, **kwargs):
+    mark_dirty(TIMETABLE_SECTIONS[sender])
+
+
+@receiver([post_save, post_delete], sender=Route)
+@unless_muted
+def rebuild_distance_matrix(sender, instance, **kwargs):
+    network_matrix.schedule_rebuild()
+
+
+@receiver(post_delete, sender=Station)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Train)
+@receiver(post_delete, sender=Journey)
+@unless_muted
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.record(sender, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Journey.crews.through)
+@unless_muted
+def touch_journeys_on_crew_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # Crews are part of the synced journey, but adding them leaves the
+    # journey row itself untouched. A cleared crew is handled before the
+    # clear, while its journeys can still be found.
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        journeys = Journey.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        journeys = Journey.objects.filter(crews=instance)
+    else:
+        journeys = Journey.objects.filter(pk__in=pk_set)
+    journeys.update(updated_at=timezone.now(), sync_sequence=None)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from station.events import seat_events
+from station.models import Journey, Ticket
+
+
+async def _authenticate(request):
+    """
+    Resolve the user from a JWT in the Authorization header or, since
+    EventSource can not send headers, from the ``token`` query param
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is not None:
+        raw_token = authentication.get_raw_token(header)
+    else:
+        raw_token = request.GET.get("token")
+    if not raw_token:
+        return None
+
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _format_event(event_id, kind, data):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _snapshot(journey):
+    """Seats taken right now, current up to the returned event id"""
+    # A network round trip with Redis, kept off the event loop
+    event_id = await sync_to_async(lambda: seat_events.last_sequence)()
+    taken = [
+        [cargo, seat]
+        async for cargo, seat in Ticket.objects.filter(
+            journey_id=journey.id
+        ).values_list("cargo", "seat")
+    ]
+    return event_id, _format_event(
+        event_id,
+        "snapshot",
+        {
+            "journey": journey.id,
+            "cargo_num": journey.train.cargo_num,
+            "places_in_cargo": journey.train.places_in_cargo,
+            "taken": taken,
+        },
+    )
+
+
+async def _seat_event_stream(journey):
+    subscription = seat_events.subscribe(journey.id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SEAT_STREAM_MAX_SECONDS
+    try:
+        yield "retry: 3000\n\n"
+        snapshot_id, snapshot = await _snapshot(journey)
+        yield snapshot
+
+        while (timeout := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    min(timeout, settings.SEAT_STREAM_HEARTBEAT),
+                )
+            except asyncio.TimeoutError:
+                event = None
+
+            if subscription.overflowed:
+                subscription.drain()
+                snapshot_id, snapshot = await _snapshot(journey)
+                yield snapshot
+            elif event is None:
+                yield ": heartbeat\n\n"
+            elif event["id"] > snapshot_id:
+                yield _format_event(
+                    event["id"], event["event"], {"seats": event["seats"]}
+                )
+    finally:
+        seat_events.unsubscribe(subscription)
+
+
+@require_GET
+async def journey_seat_stream(request, pk):
+    """
+    Server-Sent Events stream of a journey's seats: a ``snapshot`` of
+    the taken seats first, then ``taken``/``released`` deltas as tickets
+    are sold or cancelled, with heartbeat comments in between. Streams
+    are closed after ``SEAT_STREAM_MAX_SECONDS``; clients reconnect and
+    get a fresh snapshot.
+
+    Needs the ASGI app: a WSGI server would consume the stream
+    synchronously and hold a worker for the whole stream.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Seat streams are only served by the ASGI app."},
+            status=501,
+        )
+
+    if await _authenticate(request) is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+        )
+
+    journey = (
+        await Journey.objects.select_related("train").filter(pk=pk).afirst()
+    )
+    if journey is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    response = StreamingHttpResponse(
+        _seat_event_stream(journey), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
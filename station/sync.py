@@ -0,0 +1,132 @@
+from django.db import DEFAULT_DB_ALIAS
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from station.models import CommitSequence, Tombstone
+from station.params import int_param
+from station.serializers import SyncSerializer
+
+
+SYNC_PARAMETERS = [
+    OpenApiParameter(
+        "since",
+        type=OpenApiTypes.INT,
+        description=(
+            "Cursor returned by the previous sync; 0 or omitted for every "
+            "row (ex. ?since=1520)"
+        ),
+    ),
+    OpenApiParameter(
+        "limit",
+        type=OpenApiTypes.INT,
+        description="Changes per page (ex. ?limit=500, max 1000)",
+    ),
+]
+
+
+def assign_sync_sequences(model, wait=True):
+    """Number the committed changes and deletions of ``model``"""
+    return CommitSequence.assign(
+        CommitSequence.SYNC,
+        [
+            model.objects.all(),
+            Tombstone.objects.filter(model=model._meta.model_name),
+        ],
+        field="sync_sequence",
+        wait=wait,
+    )
+
+
+class SyncMixin:
+    """
+    Adds ``sync/?since=<cursor>`` to a viewset: rows changed and ids
+    deleted (``Tombstone``) after the cursor, a page at a time, with the
+    cursor to pass next.
+
+    The cursor is a commit sequence (see ``CommitSequence``), handed out
+    only to changes that have committed, so a slow transaction can not
+    land behind a cursor a client already passed. Reads go to the
+    primary, as a lagging replica could hide rows the cursor skips.
+    Cursors older than the last purged tombstone are refused with
+    ``410 Gone``: the client has to start over from 0.
+    """
+
+    sync_serializer_class = None
+    sync_related = ()
+    sync_max_limit = 1000
+
+    def get_sync_queryset(self):
+        queryset = self.queryset.model.objects.using(DEFAULT_DB_ALIAS)
+        if self.sync_related:
+            queryset = queryset.select_related(*self.sync_related)
+        return queryset
+
+    @extend_schema(parameters=SYNC_PARAMETERS, responses=SyncSerializer)
+    @action(methods=["GET"], detail=False, url_path="sync")
+    def sync(self, request):
+        """Endpoint for rows changed and deleted since a sync cursor"""
+        since = int_param(request, "since", 0, min_value=0)
+        limit = int_param(
+            request, "limit", 500, min_value=1, max_value=self.sync_max_limit
+        )
+        model = self.queryset.model
+        assign_sync_sequences(model)
+
+        counters = dict(
+            CommitSequence.objects.using(DEFAULT_DB_ALIAS)
+            .filter(
+                name__in=[CommitSequence.SYNC, CommitSequence.SYNC_PURGED]
+            )
+            .values_list("name", "value")
+        )
+        if since and not (
+            counters.get(CommitSequence.SYNC_PURGED, 0)
+            <= since
+            <= counters.get(CommitSequence.SYNC, 0)
+        ):
+            return Response(
+                {"detail": "Cursor expired, sync again from since=0."},
+                status=status.HTTP_410_GONE,
+            )
+
+        changed = list(
+            self.get_sync_queryset()
+            .filter(sync_sequence__gt=since)
+            .order_by("sync_sequence")[: limit + 1]
+        )
+        deleted = []
+        if since:
+            deleted = list(
+                Tombstone.objects.using(DEFAULT_DB_ALIAS)
+                .filter(
+                    model=model._meta.model_name, sync_sequence__gt=since
+                )
+                .order_by("sync_sequence")
+                .values_list("sync_sequence", "object_id")[: limit + 1]
+            )
+
+        # One page of both lists merged in sequence order
+        page = sorted(
+            [(row.sync_sequence, row) for row in changed] + deleted,
+            key=lambda item: item[0],
+        )
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        serializer = SyncSerializer(
+            {
+                "cursor": page[-1][0] if page else since,
+                "has_more": has_more,
+                "changed": self.sync_serializer_class(
+                    [item for _, item in page if isinstance(item, model)],
+                    many=True,
+                ).data,
+                "deleted": sorted(
+                    {item for _, item in page if isinstance(item, int)}
+                ),
+            }
+        )
+        return Response(serializer.data)
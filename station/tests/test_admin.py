@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_login(self.admin)
+        self.route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        self.train = create_sample_train(
+            train_type=create_sample_traintype(), cargo_num=5
+        )
+
+    def add_tickets(self, count):
+        order = Order.objects.create(user=self.admin)
+        for _ in range(count):
+            journey = create_sample_journey(route=self.route, train=self.train)
+            Ticket.objects.create(journey=journey, order=order, cargo=1, seat=1)
+
+    def changelist_queries(self, model_name):
+        url = reverse(f"admin:station_{model_name}_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_tickets(1)
+        baseline = {
+            model: self.changelist_queries(model)
+            for model in ("ticket", "journey", "order")
+        }
+
+        self.add_tickets(5)
+
+        for model, queries in baseline.items():
+            self.assertEqual(self.changelist_queries(model), queries, model)
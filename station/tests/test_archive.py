@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    Journey,
+    OccupancyDaily,
+    Order,
+    OutboxEvent,
+    Ticket,
+    TimetableSection,
+)
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+class ArchiveJourneysTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        train = create_sample_train(train_type=create_sample_traintype())
+        departed = timezone.now() - timedelta(days=400)
+        self.old_journey = create_sample_journey(
+            route=route,
+            train=train,
+            departure_time=departed,
+            arrival_time=departed + timedelta(hours=2),
+        )
+        self.new_journey = create_sample_journey(
+            route=route,
+            train=train,
+            departure_time=timezone.now() + timedelta(days=1),
+            arrival_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            journey=self.old_journey, order=self.order, cargo=1, seat=1
+        )
+        Ticket.objects.create(
+            journey=self.new_journey, order=self.order, cargo=1, seat=1
+        )
+
+    def test_old_journeys_move_to_archive(self):
+        call_command("archive_journeys", "--days=180", stdout=StringIO())
+
+        self.assertEqual(list(Journey.objects.all()), [self.new_journey])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertTrue(
+            ArchivedJourney.objects.filter(id=self.old_journey.id).exists()
+        )
+        self.assertEqual(ArchivedTicket.objects.get().order, self.order)
+        self.assertEqual(OccupancyDaily.objects.count(), 2)
+
+    def test_order_history_includes_archived_tickets(self):
+        call_command("archive_journeys", "--days=180", stdout=StringIO())
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(ORDER_URL)
+
+        order = res.data["results"][0]
+        self.assertEqual(len(order["tickets"]), 1)
+        self.assertEqual(len(order["archived_tickets"]), 1)
+        self.assertEqual(
+            order["archived_tickets"][0]["journey"]["id"], self.old_journey.id
+        )
+
+        detail = client.get(
+            reverse("station:order-detail", args=[order["id"]])
+        )
+        self.assertEqual(len(detail.data["archived_tickets"]), 1)
+
+    def test_archiving_reaches_change_feed_and_timetable(self):
+        TimetableSection.objects.update_or_create(
+            name="journeys", defaults={"dirty": False}
+        )
+
+        call_command("archive_journeys", "--days=180", stdout=StringIO())
+
+        self.assertTrue(
+            OutboxEvent.objects.filter(
+                topic=OutboxEvent.JOURNEY_DELETED,
+                aggregate_id=self.old_journey.id,
+            ).exists()
+        )
+        self.assertTrue(TimetableSection.objects.get(name="journeys").dirty)
@@ -0,0 +1,123 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.tests.test_journey_api import create_sample_station
+from station.views import StationViewSet
+
+
+BATCH_URL = reverse("batch")
+
+
+class BatchApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.station = create_sample_station(name="Kyiv")
+
+    def test_auth_required(self):
+        res = APIClient().post(BATCH_URL, {"requests": []}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_sub_requests_share_authentication(self):
+        res = self.client.post(
+            BATCH_URL,
+            {
+                "requests": [
+                    {"path": "/api/station/stations/"},
+                    {"path": "/api/station/routes/", "params": {"source": "1"}},
+                    {"path": "/api/user/me/"},
+                    {"path": "/api/station/missing/"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        stations, routes, me, missing = res.data["responses"]
+        self.assertEqual(stations["status"], status.HTTP_200_OK)
+        self.assertEqual(stations["body"][0]["id"], self.station.id)
+        self.assertEqual(routes["body"], [])
+        self.assertEqual(me["body"]["email"], self.user.email)
+        self.assertEqual(missing["status"], status.HTTP_404_NOT_FOUND)
+
+    def test_only_reads_to_api_routes_are_allowed(self):
+        for sub_request in (
+            {"method": "POST", "path": "/api/station/stations/"},
+            {"path": "/admin/"},
+        ):
+            res = self.client.post(
+                BATCH_URL, {"requests": [sub_request]}, format="json"
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failing_and_streaming_sub_requests_get_an_entry(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        with mock.patch.object(
+            StationViewSet, "list", side_effect=RuntimeError
+        ), self.assertLogs("train_station_api_service.batch", "ERROR"):
+            res = self.client.post(
+                BATCH_URL,
+                {
+                    "requests": [
+                        {"path": "/api/station/stations/"},
+                        {"path": "/api/station/tickets/export/"},
+                        {"path": "/api/user/me/"},
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        failed, export, me = res.data["responses"]
+        self.assertEqual(
+            failed["status"], status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+        self.assertEqual(export["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(me["status"], status.HTTP_200_OK)
+
+
+class ParallelBatchApiTests(TransactionTestCase):
+    """Worker threads use connections of their own, so rows are committed"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.station = create_sample_station(name="Kyiv")
+
+    def test_parallel_sub_requests_keep_their_order(self):
+        res = self.client.post(
+            BATCH_URL,
+            {
+                "requests": [
+                    {"path": "/api/station/stations/"},
+                    {"path": "/api/user/me/"},
+                    {"path": "/api/station/missing/"},
+                ],
+                "parallel": True,
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        stations, me, missing = res.data["responses"]
+        self.assertEqual(stations["body"][0]["id"], self.station.id)
+        self.assertEqual(me["body"]["email"], self.user.email)
+        self.assertEqual(missing["status"], status.HTTP_404_NOT_FOUND)
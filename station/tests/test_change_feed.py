@@ -0,0 +1,141 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import OutboxEvent
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+CHANGES_URL = reverse("station:change-list")
+ORDER_URL = reverse("station:order-list")
+
+
+class ChangeFeedApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        train = create_sample_train(train_type=create_sample_traintype())
+        self.journey = create_sample_journey(route=route, train=train)
+
+    def test_order_and_journey_changes_are_recorded(self):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"cargo": 1, "seat": 3, "journey": self.journey.id}]},
+            format="json",
+        )
+        self.journey.departure_time -= timedelta(hours=1)
+        self.journey.save()
+        journey_id = self.journey.id
+        self.journey.delete()
+
+        events = self.client.get(CHANGES_URL).data["results"]
+
+        self.assertEqual(
+            [event["topic"] for event in events],
+            [
+                OutboxEvent.JOURNEY_CREATED,
+                OutboxEvent.ORDER_CREATED,
+                OutboxEvent.JOURNEY_UPDATED,
+                OutboxEvent.JOURNEY_DELETED,
+            ],
+        )
+        self.assertEqual(events[1]["aggregate_id"], res.data["id"])
+        self.assertEqual(
+            events[1]["payload"]["tickets"],
+            [{"journey": journey_id, "cargo": 1, "seat": 3}],
+        )
+        self.assertEqual(events[3]["payload"]["id"], journey_id)
+
+    def test_cursor_pages_through_events(self):
+        for hours in (1, 2, 3):
+            self.journey.arrival_time += timedelta(hours=hours)
+            self.journey.save()
+
+        first = self.client.get(CHANGES_URL, {"limit": 3}).data
+        second = self.client.get(
+            CHANGES_URL, {"after": first["next_cursor"], "limit": 3}
+        ).data
+
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["results"]), 3)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(len(second["results"]), 1)
+        self.assertGreater(
+            second["results"][0]["sequence"], first["results"][-1]["sequence"]
+        )
+
+    def test_filter_by_topic(self):
+        self.journey.save()
+
+        res = self.client.get(CHANGES_URL, {"topic": "journey.updated"})
+
+        self.assertEqual(
+            [event["topic"] for event in res.data["results"]],
+            [OutboxEvent.JOURNEY_UPDATED],
+        )
+
+    def test_late_commit_with_lower_id_is_not_skipped(self):
+        OutboxEvent.objects.all().delete()
+        event = {"topic": OutboxEvent.JOURNEY_UPDATED, "payload": {}}
+        OutboxEvent.objects.create(id=10, aggregate_id=1, **event)
+        first = self.client.get(CHANGES_URL).data
+
+        # A slower transaction that took its id earlier commits now
+        OutboxEvent.objects.create(id=5, aggregate_id=2, **event)
+        second = self.client.get(
+            CHANGES_URL, {"after": first["next_cursor"]}
+        ).data
+
+        self.assertEqual([e["id"] for e in first["results"]], [10])
+        self.assertEqual([e["id"] for e in second["results"]], [5])
+        self.assertGreater(second["next_cursor"], first["next_cursor"])
+
+    def test_invalid_cursor_and_limit(self):
+        for params in ({"after": "abc"}, {"limit": "x"}, {"limit": 0}):
+            res = self.client.get(CHANGES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_keeps_recent_events(self):
+        self.client.get(CHANGES_URL)
+        OutboxEvent.objects.filter(topic=OutboxEvent.JOURNEY_CREATED).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        self.journey.save()
+
+        call_command("purge_outbox_events", stdout=StringIO())
+
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list("topic", flat=True)),
+            [OutboxEvent.JOURNEY_UPDATED],
+        )
+
+    def test_feed_is_staff_only(self):
+        user = get_user_model().objects.create_user("test@test.com", "pass")
+        self.client.force_authenticate(user)
+
+        res = self.client.get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Crew
+from station.scheduling import find_overlaps
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def assign_crews_url(journey_id):
+    return reverse("station:journey-assign-crews", args=[journey_id])
+
+
+class FindOverlapsTests(SimpleTestCase):
+    def test_reports_each_overlapping_pair_per_key(self):
+        intervals = [
+            ("a", 1, 5, "a1"),
+            ("a", 4, 8, "a2"),
+            ("a", 5, 6, "a3"),
+            ("a", 8, 9, "a4"),
+            ("b", 2, 7, "b1"),
+        ]
+
+        self.assertEqual(
+            sorted(find_overlaps(intervals)),
+            [("a", "a1", "a2"), ("a", "a2", "a3")],
+        )
+
+
+class CrewScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        self.train = create_sample_train(train_type=create_sample_traintype())
+        self.crew = Crew.objects.create(first_name="John", last_name="Doe")
+        self.start = timezone.make_aware(datetime(2024, 3, 1, 8))
+        self.journey = create_sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=self.start,
+            arrival_time=self.start + timedelta(hours=3),
+        )
+        self.journey.crews.add(self.crew)
+
+    def create_journey(self, departure_time, arrival_time):
+        return self.client.post(
+            JOURNEY_URL,
+            {
+                "route": self.route.id,
+                "train": create_sample_train(
+                    train_type=self.train.train_type, name="Train 2"
+                ).id,
+                "departure_time": departure_time,
+                "arrival_time": arrival_time,
+                "crews": [self.crew.id],
+            },
+        )
+
+    def test_overlapping_crew_assignment_is_rejected(self):
+        res = self.create_journey(
+            self.start + timedelta(hours=2), self.start + timedelta(hours=5)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crews", res.data)
+
+    def test_back_to_back_journeys_are_allowed(self):
+        res = self.create_journey(
+            self.start + timedelta(hours=3), self.start + timedelta(hours=5)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_assign_crews_checks_overlaps(self):
+        other = create_sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=self.start + timedelta(hours=1),
+            arrival_time=self.start + timedelta(hours=2),
+        )
+
+        res = self.client.post(assign_crews_url(other.id), {"crews": [self.crew.id]})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(other.crews.exists())
+
+    def test_audit_command_reports_conflicts(self):
+        other = create_sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=self.start + timedelta(hours=1),
+            arrival_time=self.start + timedelta(hours=2),
+        )
+        other.crews.add(self.crew)
+        out = StringIO()
+
+        call_command("audit_crew_conflicts", stdout=out)
+
+        self.assertIn(
+            f"journeys {self.journey.id} and {other.id} overlap", out.getvalue()
+        )
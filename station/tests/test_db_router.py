@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station.db_router import (
+    PrimaryReplicaRouter,
+    _read_replica,
+    is_pinned_to_primary,
+)
+from station.models import Station
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.token = _read_replica.set("replica_1")
+
+    def tearDown(self):
+        _read_replica.reset(self.token)
+
+    def test_reads_go_to_replica_during_safe_requests(self):
+        self.assertEqual(self.router.db_for_read(Station), "replica_1")
+        self.assertEqual(self.router.db_for_write(Station), "default")
+
+    def test_reads_outside_safe_requests_use_primary(self):
+        _read_replica.set(None)
+        self.assertEqual(self.router.db_for_read(Station), "default")
+
+    def test_reads_inside_atomic_block_use_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Station), "default")
+
+    @override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"])
+    def test_request_keeps_its_replica(self):
+        _read_replica.set("replica_2")
+        self.assertEqual(
+            {self.router.db_for_read(Station) for _ in range(20)},
+            {"replica_2"},
+        )
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica_1", "station"))
+        self.assertTrue(self.router.allow_migrate("default", "station"))
+
+
+class ReadYourWritesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_write_pins_user_to_primary(self):
+        self.assertFalse(is_pinned_to_primary(self.user))
+
+        self.client.post(
+            reverse("station:station-list"),
+            {"name": "Kyiv", "latitude": 50.45, "longitude": 30.52},
+        )
+
+        self.assertTrue(is_pinned_to_primary(self.user))
+
+    def test_failed_write_does_not_pin(self):
+        self.client.post(reverse("station:station-list"), {"name": ""})
+
+        self.assertFalse(is_pinned_to_primary(self.user))
+
+    @override_settings(DATABASE_REPLICAS=["default"])
+    def test_replica_is_picked_once_per_request(self):
+        with mock.patch(
+            "station.db_router.random.choice", return_value="default"
+        ) as choice:
+            self.client.get(reverse("station:route-list"))
+
+        choice.assert_called_once_with(["default"])
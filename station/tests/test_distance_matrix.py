@@ -0,0 +1,139 @@
+import os
+import tempfile
+from math import inf
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.network import (
+    DistanceMatrix,
+    build_matrix,
+    network_matrix,
+    shortest_distances,
+)
+from station.tests.test_journey_api import (
+    create_sample_route,
+    create_sample_station,
+)
+
+
+DISTANCES_URL = reverse("station:station-distances")
+
+
+class ShortestDistancesTests(SimpleTestCase):
+    def test_dijkstra_prefers_shorter_chain(self):
+        matrix = shortest_distances(
+            [1, 2, 3, 4],
+            [(1, 2, 100), (2, 3, 100), (1, 3, 500), (3, 1, 50)],
+        )
+
+        row = list(matrix[0:4])
+        self.assertEqual(row, [0, 100, 200, inf])
+        self.assertEqual(matrix[2 * 4 + 1], 150)
+
+
+class DistanceMatrixTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "matrix.bin")
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.zhytomyr = create_sample_station(name="Zhytomyr")
+        self.lviv = create_sample_station(name="Lviv")
+        create_sample_route(self.kyiv, self.zhytomyr, distance=140)
+        create_sample_route(self.zhytomyr, self.lviv, distance=400)
+
+    def test_file_is_mapped_and_remapped_after_rebuild(self):
+        build_matrix(self.path)
+        matrix = DistanceMatrix(self.path)
+
+        self.assertEqual(
+            matrix.distances([self.kyiv.id], [self.lviv.id, 999]),
+            [[540, None]],
+        )
+        self.assertEqual(
+            matrix.distances([self.lviv.id], [self.kyiv.id]), [[None]]
+        )
+
+        create_sample_route(self.kyiv, self.lviv, distance=470)
+        build_matrix(self.path)
+
+        self.assertEqual(
+            matrix.distances([self.kyiv.id], [self.lviv.id]), [[470]]
+        )
+
+    def test_route_change_schedules_background_rebuild(self):
+        with mock.patch.object(
+            network_matrix, "_start_rebuild_timer"
+        ) as start, self.captureOnCommitCallbacks(execute=True):
+            create_sample_route(self.lviv, self.kyiv, distance=540)
+
+        start.assert_called_once()
+
+
+class StationDistancesApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(
+            DISTANCE_MATRIX_PATH=os.path.join(self.directory.name, "m.bin")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+        self.odesa = create_sample_station(name="Odesa")
+        create_sample_route(self.kyiv, self.lviv, distance=540)
+        create_sample_route(self.kyiv, self.odesa, distance=475)
+        build_matrix()
+
+    def test_many_to_many_distances(self):
+        res = self.client.get(
+            DISTANCES_URL,
+            {
+                "source": f"{self.kyiv.id},{self.lviv.id}",
+                "destination": f"{self.lviv.id},{self.odesa.id}",
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["distances"], [[540, 475], [0, None]])
+
+    def test_source_and_destination_required(self):
+        res = self.client.get(DISTANCES_URL, {"source": self.kyiv.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ids_are_rejected(self):
+        res = self.client.get(
+            DISTANCES_URL, {"source": "1,kyiv", "destination": "2"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unavailable_until_the_matrix_is_built(self):
+        os.remove(network_matrix.path)
+
+        with mock.patch.object(
+            network_matrix, "_start_rebuild_timer"
+        ) as start:
+            res = self.client.get(
+                DISTANCES_URL,
+                {"source": self.kyiv.id, "destination": self.lviv.id},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        start.assert_called_once()
@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station.management.commands.loadtest import (
+    endpoint_of,
+    percentile,
+    summarize,
+)
+from station.tests.test_journey_api import create_sample_station
+
+
+class LoadtestReportTests(SimpleTestCase):
+    def test_endpoints_mask_ids_and_query(self):
+        self.assertEqual(
+            endpoint_of("GET", "/api/station/journeys/12/?fields=id"),
+            "GET /api/station/journeys/{id}/",
+        )
+
+    def test_summary_percentiles_and_errors(self):
+        results = [
+            {"endpoint": "GET /a/", "status": 200, "ms": float(ms)}
+            for ms in range(1, 101)
+        ]
+        results.append({"endpoint": "GET /b/", "status": None, "ms": 5.0})
+        results.append({"endpoint": "GET /b/", "status": 404, "ms": 5.0})
+
+        report = summarize(results, elapsed=2)
+
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(report["GET /a/"]["p95"], 95.0)
+        self.assertEqual(report["GET /a/"]["rps"], 50.0)
+        self.assertEqual(report["GET /b/"]["errors"], 1)
+        self.assertEqual(report["GET /b/"]["client_errors"], 1)
+        self.assertEqual(report["TOTAL"]["count"], 102)
+
+
+class RequestCaptureAndReplayTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = os.path.join(directory.name, "requests.jsonl")
+        self.report = os.path.join(directory.name, "report.json")
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.station = create_sample_station(name="Kyiv")
+
+    def capture(self):
+        with override_settings(
+            REQUEST_CAPTURE_PATH=self.log, REQUEST_CAPTURE_SAMPLE_RATE=1
+        ):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            client.get(reverse("station:station-list"))
+            client.get(
+                reverse("station:station-departures", args=[self.station.id]),
+                {"limit": 5, "token": "secret"},
+            )
+            client.post(
+                reverse("station:station-list"),
+                {"name": "Lviv", "latitude": 1, "longitude": 2},
+                format="json",
+            )
+
+    def test_capture_records_request_shapes(self):
+        self.capture()
+
+        with open(self.log) as log:
+            records = [json.loads(line) for line in log]
+
+        self.assertEqual(
+            [(r["method"], r["status"]) for r in records],
+            [("GET", 200), ("GET", 200), ("POST", 403)],
+        )
+        self.assertEqual(records[0]["user"], self.user.id)
+        self.assertEqual(
+            records[1]["path"],
+            f"/api/station/stations/{self.station.id}/departures/?limit=5",
+        )
+        self.assertIn('"Lviv"', records[2]["body"])
+
+    def test_replay_reports_per_endpoint_against_baseline(self):
+        self.capture()
+        call_command(
+            "loadtest",
+            self.log,
+            "--concurrency=2",
+            "--allow-writes",
+            "--no-throttle",
+            f"--save={self.report}",
+            stdout=StringIO(),
+        )
+        out = StringIO()
+
+        call_command(
+            "loadtest",
+            self.log,
+            "--no-throttle",
+            f"--baseline={self.report}",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("Replaying 2 requests", output)
+        self.assertIn("GET /api/station/stations/{id}/departures/", output)
+        self.assertIn("p95 chg", output)
+        with open(self.report) as file:
+            report = json.load(file)
+        self.assertEqual(report["POST /api/station/stations/"]["count"], 1)
+        self.assertEqual(report["TOTAL"]["errors"], 0)
+
+    def test_in_process_replay_passes_host_validation(self):
+        self.capture()
+
+        # Without the "testserver" host the test runner allows
+        with override_settings(ALLOWED_HOSTS=[]):
+            call_command(
+                "loadtest",
+                self.log,
+                "--no-throttle",
+                f"--save={self.report}",
+                stdout=StringIO(),
+            )
+
+        with open(self.report) as file:
+            report = json.load(file)
+        self.assertEqual(report["TOTAL"]["count"], 2)
+        self.assertEqual(report["TOTAL"]["client_errors"], 0)
+
+    def test_oversized_bodies_are_not_captured(self):
+        with override_settings(
+            REQUEST_CAPTURE_PATH=self.log,
+            REQUEST_CAPTURE_SAMPLE_RATE=1,
+            REQUEST_CAPTURE_MAX_BODY=10,
+        ):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            client.post(
+                reverse("station:station-list"),
+                {"name": "Lviv", "latitude": 1, "longitude": 2},
+                format="json",
+            )
+            client.get(reverse("station:station-list"))
+
+        with open(self.log) as log:
+            records = [json.loads(line) for line in log]
+
+        self.assertEqual([r["method"] for r in records], ["GET"])
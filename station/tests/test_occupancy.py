@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import OccupancyDaily, Order, Ticket
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+OCCUPANCY_URL = reverse("station:occupancy-list")
+
+
+class OccupancyRollupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        train = create_sample_train(
+            train_type=create_sample_traintype(), cargo_num=2
+        )
+        self.journey = create_sample_journey(route=route, train=train)
+
+    def sell_tickets(self, *seats):
+        order = Order.objects.create(user=self.user)
+        for seat in seats:
+            Ticket.objects.create(
+                journey=self.journey, order=order, cargo=1, seat=seat
+            )
+
+    def test_rollup_tracks_journeys_and_ticket_sales(self):
+        self.sell_tickets(1, 2, 3)
+
+        row = OccupancyDaily.objects.get()
+        self.assertEqual(row.journeys, 1)
+        self.assertEqual(row.seats_offered, 10)
+        self.assertEqual(row.tickets_sold, 3)
+        self.assertEqual(row.load_factor, 0.3)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.sell_tickets(1, 2)
+        expected = list(
+            OccupancyDaily.objects.values(
+                "route", "train", "date", "journeys", "tickets_sold"
+            )
+        )
+        OccupancyDaily.objects.update(tickets_sold=0)
+
+        call_command("rebuild_occupancy", stdout=StringIO())
+
+        self.assertEqual(
+            list(
+                OccupancyDaily.objects.values(
+                    "route", "train", "date", "journeys", "tickets_sold"
+                )
+            ),
+            expected,
+        )
+
+    def test_occupancy_endpoint_is_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.get(OCCUPANCY_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = client.get(OCCUPANCY_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 1)
+
+    def test_occupancy_filters_reject_bad_values(self):
+        self.user.is_staff = True
+        self.user.save()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        for params in ({"route": "1,x"}, {"date_from": "2024-13-01"}):
+            res = client.get(OCCUPANCY_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.idempotency import request_fingerprint
+from station.models import IdempotencyKey, Order, Ticket
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+class IdempotentOrderApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        train = create_sample_train(train_type=create_sample_traintype())
+        self.journey = create_sample_journey(route=route, train=train)
+
+    def post_order(self, seat, key="key-1"):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"cargo": 1, "seat": seat, "journey": self.journey.id}]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_original_response(self):
+        first = self.post_order(seat=1)
+        retry = self.post_order(seat=1)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_key_reused_with_other_payload_is_rejected(self):
+        self.post_order(seat=1)
+        res = self.post_order(seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        self.post_order(seat=1, key="other")
+        failed = self.post_order(seat=1)
+        retry = self.post_order(seat=1)
+
+        self.assertEqual(failed.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.filter(key="key-1").exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_duplicate_of_in_flight_request_gets_conflict(self):
+        first = self.post_order(seat=1)
+        IdempotencyKey.objects.filter(key="key-1").update(
+            status_code=None, response=None
+        )
+
+        res = self.post_order(seat=1)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_expired_key_is_claimed_again(self):
+        self.post_order(seat=1)
+        IdempotencyKey.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        res = self.post_order(seat=1)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_abandoned_in_flight_request_is_taken_over(self):
+        # The worker handling the first request died before finishing
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key="key-1",
+            request_hash=request_fingerprint(
+                {
+                    "tickets": [
+                        {"cargo": 1, "seat": 1, "journey": self.journey.id}
+                    ]
+                }
+            ),
+            expires_at=timezone.now() + timedelta(hours=1),
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        res = self.post_order(seat=1)
+        retry = self.post_order(seat=1)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
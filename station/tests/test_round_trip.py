@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.trips import pair_round_trips
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+ROUND_TRIP_URL = reverse("station:journey-round-trip")
+
+
+def leg(journey_id, departure_hour, hours, seats=10):
+    departure = datetime(2024, 3, 1) + timedelta(hours=departure_hour)
+    return {
+        "id": journey_id,
+        "departure_time": departure,
+        "arrival_time": departure + timedelta(hours=hours),
+        "available_seats": seats,
+    }
+
+
+class PairRoundTripsTests(SimpleTestCase):
+    def test_pairs_respect_min_stay_and_rank_by_duration(self):
+        outbound = [leg(1, 8, 5), leg(2, 12, 3)]
+        inbound = [leg(10, 14, 4), leg(11, 18, 6), leg(12, 20, 2)]
+
+        trips = pair_round_trips(outbound, inbound, timedelta(hours=2), 3)
+
+        self.assertEqual(
+            [(t["outbound"]["id"], t["inbound"]["id"]) for t in trips],
+            [(2, 12), (1, 12), (2, 11)],
+        )
+        self.assertEqual(trips[0]["total_duration"], timedelta(hours=5))
+        self.assertEqual(trips[0]["stay"], timedelta(hours=5))
+
+    def test_more_seats_break_ties(self):
+        outbound = [leg(1, 8, 2, seats=3), leg(2, 9, 2, seats=40)]
+        inbound = [leg(10, 20, 2, seats=50)]
+
+        trips = pair_round_trips(outbound, inbound, timedelta(0), 1)
+
+        self.assertEqual(trips[0]["outbound"]["id"], 2)
+        self.assertEqual(trips[0]["available_seats"], 40)
+
+
+class RoundTripApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+        there = create_sample_route(source=self.kyiv, destination=self.lviv)
+        back = create_sample_route(source=self.lviv, destination=self.kyiv)
+        train_type = create_sample_traintype()
+        self.day = timezone.localdate() + timedelta(days=3)
+        start = timezone.make_aware(
+            datetime.combine(self.day, datetime.min.time())
+        )
+
+        def journey(route, train_name, hours_from_start, places=5):
+            departure = start + timedelta(hours=hours_from_start)
+            return create_sample_journey(
+                route=route,
+                train=create_sample_train(
+                    train_type,
+                    name=train_name,
+                    cargo_num=1,
+                    places_in_cargo=places,
+                ),
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=5),
+            )
+
+        self.morning = journey(there, "Morning", 6)
+        self.full = journey(there, "Full", 7, places=1)
+        self.evening_back = journey(back, "Evening", 30)
+        self.early_back = journey(back, "Early", 12)
+        Ticket.objects.create(
+            journey=self.full,
+            order=Order.objects.create(user=self.user),
+            cargo=1,
+            seat=1,
+        )
+
+    def search(self, **params):
+        return self.client.get(
+            ROUND_TRIP_URL,
+            {
+                "origin": self.kyiv.id,
+                "destination": self.lviv.id,
+                "outbound_date": self.day.isoformat(),
+                "return_date": (self.day + timedelta(days=1)).isoformat(),
+                **params,
+            },
+        )
+
+    def test_round_trips_skip_full_journeys(self):
+        res = self.search(min_stay=2)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(t["outbound"]["id"], t["inbound"]["id"]) for t in res.data],
+            [(self.morning.id, self.evening_back.id)],
+        )
+        self.assertEqual(res.data[0]["total_duration"], "10:00:00")
+
+    def test_invalid_search(self):
+        res = self.search(return_date=self.day - timedelta(days=1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
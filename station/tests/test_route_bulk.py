@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.geo import great_circle_km, is_distance_outlier
+from station.models import Route
+from station.tests.test_journey_api import create_sample_station
+
+
+ROUTE_BULK_URL = reverse("station:route-bulk")
+
+
+class GreatCircleTests(SimpleTestCase):
+    def test_kyiv_lviv_distance(self):
+        self.assertAlmostEqual(
+            great_circle_km(50.4501, 30.5234, 49.8397, 24.0297), 468, delta=2
+        )
+
+    def test_outliers(self):
+        self.assertFalse(is_distance_outlier(540, 468.2))
+        self.assertTrue(is_distance_outlier(120, 468.2))
+        self.assertTrue(is_distance_outlier(1500, 468.2))
+
+
+class RouteBulkCreateApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.kyiv = create_sample_station("Kyiv", 50.4501, 30.5234)
+        self.lviv = create_sample_station("Lviv", 49.8397, 24.0297)
+        self.odesa = create_sample_station("Odesa", 46.4825, 30.7233)
+
+    def post(self, routes):
+        return self.client.post(
+            ROUTE_BULK_URL, {"routes": routes}, format="json"
+        )
+
+    def test_routes_created_with_computed_distances_and_flags(self):
+        with self.assertNumQueries(5):
+            res = self.post(
+                [
+                    {"source": self.kyiv.id, "destination": self.lviv.id},
+                    {
+                        "source": self.kyiv.id,
+                        "destination": self.odesa.id,
+                        "distance": 50,
+                    },
+                ]
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        computed, typed = res.data
+        self.assertEqual(computed["distance"], 468)
+        self.assertTrue(computed["distance_computed"])
+        self.assertFalse(computed["outlier"])
+        self.assertEqual(typed["distance"], 50)
+        self.assertTrue(typed["outlier"])
+        self.assertEqual(Route.objects.count(), 2)
+
+    def test_unknown_station_rejects_whole_batch(self):
+        res = self.post(
+            [
+                {"source": self.kyiv.id, "destination": self.lviv.id},
+                {"source": self.kyiv.id, "destination": 999},
+            ]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("999", str(res.data["routes"]))
+        self.assertEqual(Route.objects.count(), 0)
+
+    def test_same_source_and_destination_rejected(self):
+        res = self.post([{"source": self.kyiv.id, "destination": self.kyiv.id}])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_is_staff_only(self):
+        user = get_user_model().objects.create_user("test@test.com", "pass")
+        self.client.force_authenticate(user)
+
+        res = self.post([{"source": self.kyiv.id, "destination": self.lviv.id}])
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
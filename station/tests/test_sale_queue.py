@@ -0,0 +1,114 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import BookingRequest, OccupancyDaily, Order, Ticket
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+def booking_url(booking_id):
+    return reverse("station:booking-detail", args=[booking_id])
+
+
+class SaleModeOrderApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        train = create_sample_train(train_type=create_sample_traintype())
+        self.journey = create_sample_journey(route=route, train=train)
+        self.journey.sale_mode = True
+        self.journey.save()
+
+    def order(self, *seats):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"cargo": 1, "seat": seat, "journey": self.journey.id}
+                    for seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_orders_are_queued_and_booked_in_one_batch(self):
+        first = self.order(1, 2)
+        second = self.order(2)
+        third = self.order(3)
+
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(first.data["status"], BookingRequest.PENDING)
+        self.assertFalse(Ticket.objects.exists())
+
+        call_command("process_sale_queue", "--once", stdout=StringIO())
+
+        statuses = {
+            res.data["id"]: self.client.get(booking_url(res.data["id"])).data
+            for res in (first, second, third)
+        }
+        self.assertEqual(
+            statuses[first.data["id"]]["status"], BookingRequest.CONFIRMED
+        )
+        self.assertEqual(
+            statuses[second.data["id"]]["status"], BookingRequest.REJECTED
+        )
+        self.assertEqual(
+            statuses[third.data["id"]]["status"], BookingRequest.CONFIRMED
+        )
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.assertEqual(OccupancyDaily.objects.get().tickets_sold, 3)
+
+    def test_long_poll_returns_processed_booking(self):
+        res = self.order(1)
+        call_command("process_sale_queue", "--once", stdout=StringIO())
+
+        poll = self.client.get(booking_url(res.data["id"]), {"wait": 5})
+
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.data["status"], BookingRequest.CONFIRMED)
+        self.assertIsNotNone(poll.data["order"])
+
+    def test_bad_wait_is_rejected(self):
+        res = self.order(1)
+
+        poll = self.client.get(booking_url(res.data["id"]), {"wait": "soon"})
+
+        self.assertEqual(poll.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_insert_marks_batch_failed(self):
+        res = self.order(1)
+
+        with mock.patch.object(
+            Ticket.objects, "bulk_create", side_effect=IntegrityError
+        ):
+            call_command("process_sale_queue", "--once", stdout=StringIO())
+
+        booking = BookingRequest.objects.get(pk=res.data["id"])
+        self.assertEqual(booking.status, BookingRequest.FAILED)
+        self.assertIsNone(booking.order)
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,141 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Crew, Journey, OccupancyDaily, ScheduleTemplate
+from station.scheduling import materialize_schedules
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+def materialize_url(template_id):
+    return reverse("station:schedule-materialize", args=[template_id])
+
+
+class MaterializeScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        self.train = create_sample_train(train_type=create_sample_traintype())
+        self.crew = Crew.objects.create(first_name="John", last_name="Doe")
+        self.today = timezone.localdate()
+        self.template = ScheduleTemplate.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=time(10, 0),
+            duration=timedelta(hours=2),
+            weekdays="1234567",
+            valid_from=self.today,
+            valid_until=self.today + timedelta(days=60),
+        )
+        self.template.crews.add(self.crew)
+        # The way back brings the train to the start of the next departure
+        self.returning = ScheduleTemplate.objects.create(
+            route=create_sample_route(
+                source=self.route.destination, destination=self.route.source
+            ),
+            train=self.train,
+            departure_time=time(14, 0),
+            duration=timedelta(hours=2),
+            weekdays="1234567",
+            valid_from=self.today,
+            valid_until=self.today + timedelta(days=60),
+        )
+
+    def materialize(self, days=6):
+        return self.client.post(
+            materialize_url(self.template.id), {"days": days}
+        )
+
+    def materialize_all(self, days=6):
+        return materialize_schedules(self.today + timedelta(days=days))
+
+    def add_journey(self, route, day, hour, hours):
+        departure = timezone.make_aware(
+            datetime.combine(self.today + timedelta(days=day), time(hour))
+        )
+        return create_sample_journey(
+            route=route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=hours),
+        )
+
+    def test_one_way_template_stops_where_the_train_is_left(self):
+        res = self.materialize()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["created"]), 1)
+        self.assertEqual(len(res.data["skipped"]), 6)
+
+    def test_journeys_are_created_with_crews(self):
+        journeys, skipped = self.materialize_all()
+
+        self.assertEqual(len(journeys), 14)
+        self.assertEqual(skipped, [])
+        self.assertEqual(
+            Journey.objects.filter(schedule=self.template).count(), 7
+        )
+        self.assertEqual(
+            Journey.crews.through.objects.filter(crew=self.crew).count(), 7
+        )
+        self.assertEqual(
+            OccupancyDaily.objects.aggregate(total=Sum("journeys"))["total"],
+            14,
+        )
+
+    def test_rerun_is_idempotent(self):
+        self.materialize_all()
+        journeys, _ = self.materialize_all(days=7)
+
+        self.assertEqual(len(journeys), 2)
+        self.assertEqual(Journey.objects.count(), 16)
+
+    def test_departures_that_double_book_the_train_are_skipped(self):
+        self.add_journey(self.route, day=2, hour=11, hours=1)
+
+        journeys, skipped = self.materialize_all()
+
+        self.assertEqual(len(journeys), 13)
+        self.assertEqual(
+            [
+                (template, departure.date())
+                for template, departure, _ in skipped
+            ],
+            [(self.template, self.today + timedelta(days=2))],
+        )
+
+    def test_departures_that_break_route_continuity_are_skipped(self):
+        # The train leaves for Station 3 on day 3 and never comes back
+        self.add_journey(
+            create_sample_route(
+                source=self.route.source,
+                destination=create_sample_station(name="Station 3"),
+            ),
+            day=3,
+            hour=10,
+            hours=2,
+        )
+
+        journeys, skipped = self.materialize_all()
+
+        self.assertEqual(len(journeys), 6)
+        self.assertEqual(len(skipped), 8)
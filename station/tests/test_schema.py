@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+
+from train_station_api_service.schema import CachedSchemaView, code_version
+
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CachedSchemaView._schemas.clear()
+        CachedSchemaView._rendered.clear()
+        self.addCleanup(CachedSchemaView._schemas.clear)
+        self.addCleanup(CachedSchemaView._rendered.clear)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "schema.json")
+        self.settings = override_settings(SCHEMA_PATH=self.path)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_schema_generated_once_and_revalidated(self):
+        with mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        ) as get_schema:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(SCHEMA_URL)
+            json_schema = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertIn(b"/api/station/journeys/", first.content)
+        self.assertEqual(
+            json.loads(json_schema.content)["info"]["title"],
+            "Train station Service API",
+        )
+        self.assertNotEqual(first["ETag"], json_schema["ETag"])
+        self.assertIn("max-age=3600", first["Cache-Control"])
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_artifact_of_current_code_is_served(self):
+        call_command("build_schema", stdout=StringIO())
+        with open(self.path) as file:
+            self.assertEqual(json.load(file)["code_version"], code_version())
+
+        with mock.patch.object(SchemaGenerator, "get_schema") as get_schema:
+            res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        get_schema.assert_not_called()
+        paths = json.loads(res.content)["paths"]
+        self.assertIn("/api/station/journeys/", paths)
+
+    def test_artifact_of_other_code_version_is_ignored(self):
+        with open(self.path, "w") as file:
+            json.dump({"code_version": "old", "schema": {"paths": {}}}, file)
+
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        paths = json.loads(res.content)["paths"]
+        self.assertIn("/api/station/journeys/", paths)
+
+    def test_unknown_versions_and_languages_share_the_default(self):
+        with mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        ) as get_schema:
+            responses = [
+                self.client.get(SCHEMA_URL, params)
+                for params in (
+                    {},
+                    {"version": "v1"},
+                    {"version": "anything"},
+                    {"lang": "xx"},
+                )
+            ]
+            self.client.get(SCHEMA_URL, HTTP_ACCEPT="*/*; q=0.9; a=1")
+
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(len({res["ETag"] for res in responses}), 1)
+        self.assertEqual(len(CachedSchemaView._schemas), 1)
+        self.assertEqual(len(CachedSchemaView._rendered), 1)
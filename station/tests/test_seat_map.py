@@ -0,0 +1,129 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.events import seat_events
+from station.models import BookingRequest, Order, Ticket
+from station.sale_queue import process_journey_queue
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+def seat_map_url(journey_id):
+    return reverse("station:journey-seat-map", args=[journey_id])
+
+
+@override_settings(SEAT_MAP_CACHE=True)
+class SeatMapApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        route = create_sample_route(
+            source=create_sample_station(name="Kyiv"),
+            destination=create_sample_station(name="Lviv"),
+        )
+        train = create_sample_train(
+            create_sample_traintype(), cargo_num=2, places_in_cargo=4
+        )
+        self.journey = create_sample_journey(route=route, train=train)
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            journey=self.journey, order=self.order, cargo=2, seat=3
+        )
+
+    def test_grid_is_rendered_per_cargo(self):
+        res = self.client.get(seat_map_url(self.journey.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["cargos"], ["0000", "0010"])
+        self.assertEqual(res.data["available"], 7)
+
+    def test_cached_map_is_patched_on_sale_and_cancel(self):
+        self.client.get(seat_map_url(self.journey.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(
+                journey=self.journey, order=self.order, cargo=1, seat=1
+            )
+        with self.assertNumQueries(0):
+            res = self.client.get(seat_map_url(self.journey.id))
+        self.assertEqual(res.data["cargos"], ["1000", "0010"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+        res = self.client.get(seat_map_url(self.journey.id))
+        self.assertEqual(res.data["cargos"], ["0000", "0010"])
+        self.assertEqual(res.data["available"], 7)
+
+    def test_busy_lock_drops_the_map_instead_of_failing_the_sale(self):
+        self.client.get(seat_map_url(self.journey.id))
+
+        with mock.patch(
+            "station.seat_map.cache_lock", side_effect=TimeoutError
+        ), self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                journey=self.journey, order=self.order, cargo=1, seat=1
+            )
+
+        self.assertEqual(cache.get(f"seat-map:{self.journey.id}"), None)
+        res = self.client.get(seat_map_url(self.journey.id))
+        self.assertEqual(res.data["cargos"], ["1000", "0010"])
+
+    def test_failed_publish_does_not_fail_the_sale(self):
+        with mock.patch.object(
+            seat_events, "publish", side_effect=ConnectionError
+        ), self.assertLogs("django.test", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.create(
+                    journey=self.journey, order=self.order, cargo=1, seat=1
+                )
+
+        res = self.client.get(seat_map_url(self.journey.id))
+        self.assertEqual(res.data["cargos"], ["1000", "0010"])
+
+    def test_sale_queue_batch_patches_map(self):
+        self.client.get(seat_map_url(self.journey.id))
+        BookingRequest.objects.create(
+            journey=self.journey,
+            user=self.user,
+            seats=[{"cargo": 1, "seat": 2}, {"cargo": 1, "seat": 4}],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_journey_queue(self.journey.id)
+
+        res = self.client.get(seat_map_url(self.journey.id))
+        self.assertEqual(res.data["cargos"], ["0101", "0010"])
+
+    def test_unknown_journey(self):
+        res = self.client.get(seat_map_url(999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(SEAT_MAP_CACHE=False)
+    def test_without_shared_cache_map_is_rendered_every_time(self):
+        self.client.get(seat_map_url(self.journey.id))
+        # A sale made elsewhere: no on-commit patch reaches this process
+        Ticket.objects.create(
+            journey=self.journey, order=self.order, cargo=1, seat=1
+        )
+
+        res = self.client.get(seat_map_url(self.journey.id))
+
+        self.assertEqual(res.data["cargos"], ["1000", "0010"])
+        self.assertEqual(cache.get(f"seat-map:{self.journey.id}"), None)
@@ -0,0 +1,197 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.events import (
+    SEAT_RELEASED,
+    SEAT_TAKEN,
+    RedisTransport,
+    SeatEventBus,
+    seat_events,
+)
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+def stream_url(journey_id):
+    return reverse("station:journey-seat-stream", args=[journey_id])
+
+
+def parse_event(chunk):
+    fields = dict(
+        line.split(": ", 1) for line in chunk.decode().strip().splitlines()
+    )
+    return fields.get("event"), json.loads(fields.get("data", "null"))
+
+
+class SeatEventBusTests(SimpleTestCase):
+    def test_publish_reaches_only_journey_subscribers(self):
+        bus = SeatEventBus()
+
+        async def scenario():
+            listener = bus.subscribe(1)
+            other = bus.subscribe(2)
+            bus.publish(1, SEAT_TAKEN, [(1, 3)])
+            event = await asyncio.wait_for(listener.queue.get(), 1)
+            self.assertTrue(other.queue.empty())
+            bus.unsubscribe(listener)
+            bus.unsubscribe(other)
+            return event
+
+        event = asyncio.run(scenario())
+        self.assertEqual(event["seats"], [[1, 3]])
+        self.assertEqual(bus.last_sequence, 1)
+
+    def test_slow_listener_is_flagged_for_resync(self):
+        bus = SeatEventBus(maxsize=1)
+
+        async def scenario():
+            listener = bus.subscribe(1)
+            bus.publish(1, SEAT_TAKEN, [(1, 1)])
+            bus.publish(1, SEAT_TAKEN, [(1, 2)])
+            await asyncio.sleep(0)
+            return listener.overflowed
+
+        self.assertTrue(asyncio.run(scenario()))
+
+
+class FakeRedis:
+    """Just enough of a Redis client to run the transport against"""
+
+    def __init__(self, messages=()):
+        self.counter = 0
+        self.messages = list(messages)
+        self.published = []
+
+    def incr(self, key):
+        self.counter += 1
+        return self.counter
+
+    def get(self, key):
+        return str(self.counter).encode()
+
+    def publish(self, channel, data):
+        self.published.append((channel, json.loads(data)))
+
+    def pubsub(self, ignore_subscribe_messages):
+        return self
+
+    def subscribe(self, channel):
+        pass
+
+    def listen(self):
+        yield from self.messages
+        raise SystemExit
+
+
+class RedisTransportTests(SimpleTestCase):
+    def test_events_are_published_and_dispatched_across_processes(self):
+        event = {"id": 7, "event": SEAT_TAKEN, "journey": 1, "seats": [[1, 1]]}
+        client = FakeRedis(
+            [{"type": "message", "data": json.dumps(event).encode()}]
+        )
+        bus = SeatEventBus(transport=RedisTransport(client))
+        dispatched, resyncs = [], []
+
+        published = bus.publish(1, SEAT_RELEASED, [(2, 3)])
+        with self.assertRaises(SystemExit):
+            bus.transport.listen(dispatched.append, lambda: resyncs.append(1))
+
+        self.assertEqual(client.published, [("seat-events", published)])
+        self.assertEqual(bus.last_sequence, 1)
+        self.assertEqual(dispatched, [event])
+        self.assertEqual(resyncs, [1])
+
+
+class SeatEventPublishingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        route = create_sample_route(
+            source=create_sample_station(name="Kyiv"),
+            destination=create_sample_station(name="Lviv"),
+        )
+        self.journey = create_sample_journey(
+            route=route, train=create_sample_train(create_sample_traintype())
+        )
+
+    @mock.patch.object(seat_events, "publish")
+    def test_ticket_sale_and_cancel_publish_after_commit(self, publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(
+                journey=self.journey,
+                order=Order.objects.create(user=self.user),
+                cargo=1,
+                seat=4,
+            )
+            publish.assert_not_called()
+        publish.assert_called_once_with(self.journey.id, SEAT_TAKEN, [(1, 4)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+        publish.assert_called_with(self.journey.id, SEAT_RELEASED, [(1, 4)])
+
+
+@override_settings(SEAT_STREAM_HEARTBEAT=0.05, SEAT_STREAM_MAX_SECONDS=5)
+class SeatStreamApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        route = create_sample_route(
+            source=create_sample_station(name="Kyiv"),
+            destination=create_sample_station(name="Lviv"),
+        )
+        self.journey = create_sample_journey(
+            route=route, train=create_sample_train(create_sample_traintype())
+        )
+        Ticket.objects.create(
+            journey=self.journey,
+            order=Order.objects.create(user=self.user),
+            cargo=1,
+            seat=2,
+        )
+
+    def test_stream_requires_asgi(self):
+        res = self.client.get(stream_url(self.journey.id))
+        self.assertEqual(res.status_code, 501)
+
+    async def test_stream_requires_token(self):
+        res = await self.async_client.get(stream_url(self.journey.id))
+        self.assertEqual(res.status_code, 401)
+
+    async def test_snapshot_then_deltas_and_heartbeats(self):
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        res = await self.async_client.get(
+            stream_url(self.journey.id), {"token": str(token)}
+        )
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        chunks = aiter(res.streaming_content)
+
+        self.assertTrue((await anext(chunks)).startswith(b"retry:"))
+        kind, snapshot = parse_event(await anext(chunks))
+        self.assertEqual(kind, "snapshot")
+        self.assertEqual(snapshot["taken"], [[1, 2]])
+        self.assertEqual(snapshot["places_in_cargo"], 5)
+
+        self.assertEqual(await anext(chunks), b": heartbeat\n\n")
+        seat_events.publish(self.journey.id, SEAT_TAKEN, [(1, 3)])
+        self.assertEqual(
+            parse_event(await anext(chunks)), ("taken", {"seats": [[1, 3]]})
+        )
+        await chunks.aclose()
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from station.models import Crew
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def journey_detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+class SparseFieldsetApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        route = create_sample_route(
+            source=create_sample_station(name="Station 1"),
+            destination=create_sample_station(name="Station 2"),
+        )
+        train = create_sample_train(train_type=create_sample_traintype())
+        self.journey = create_sample_journey(route=route, train=train)
+        self.journey.crews.add(
+            Crew.objects.create(first_name="John", last_name="Doe")
+        )
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        return res, queries
+
+    def test_fields_narrow_response_and_query(self):
+        res, queries = self.get(
+            JOURNEY_URL, fields="id,departure_time,arrival_time"
+        )
+
+        self.assertEqual(
+            set(res.data[0]), {"id", "departure_time", "arrival_time"}
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("JOIN", queries[0]["sql"])
+
+    def test_default_list_is_unchanged(self):
+        res, _ = self.get(JOURNEY_URL)
+
+        self.assertEqual(res.data[0]["train"]["name"], "TrainName")
+        self.assertEqual(res.data[0]["count_taken_seats"], 0)
+        self.assertEqual(res.data[0]["crews"], ["John Doe"])
+
+    def test_expand_nests_related_objects(self):
+        res, _ = self.get(
+            JOURNEY_URL, fields="id,route,crews", expand="route,crews"
+        )
+
+        self.assertEqual(res.data[0]["route"]["source"]["name"], "Station 1")
+        self.assertEqual(res.data[0]["crews"][0]["full_name"], "John Doe")
+
+    def test_detail_without_tickets_skips_their_prefetch(self):
+        res, queries = self.get(
+            journey_detail_url(self.journey.id), fields="id,train,route"
+        )
+
+        self.assertEqual(set(res.data), {"id", "train", "route"})
+        self.assertFalse(
+            any("station_ticket" in query["sql"] for query in queries)
+        )
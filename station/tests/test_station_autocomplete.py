@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.search import normalize, station_index
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+AUTOCOMPLETE_URL = reverse("station:station-autocomplete")
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_transliterates_and_folds_accents(self):
+        self.assertEqual(normalize("Київ"), "kyiv")
+        self.assertEqual(normalize("Львів-Головний"), "lviv holovnyi")
+        self.assertEqual(normalize("Zürich HB"), "zurich hb")
+
+
+class StationAutocompleteApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # The index lives on in the process across tests
+        station_index.built = False
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Київ-Пасажирський")
+        self.kyivska = create_sample_station(name="Kyivska")
+        self.lviv = create_sample_station(name="Львів")
+        route = create_sample_route(source=self.kyivska, destination=self.lviv)
+        create_sample_journey(
+            route=route, train=create_sample_train(create_sample_traintype())
+        )
+
+    def suggest(self, query, **params):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": query, **params})
+        return [station["id"] for station in res.data]
+
+    def test_prefix_matches_ranked_by_popularity(self):
+        self.assertEqual(self.suggest("kyi"), [self.kyivska.id, self.kyiv.id])
+        self.assertEqual(self.suggest("Київ"), [self.kyivska.id, self.kyiv.id])
+        self.assertEqual(self.suggest("kyi", limit=1), [self.kyivska.id])
+
+    def test_matches_later_words(self):
+        self.assertEqual(self.suggest("pasazh"), [self.kyiv.id])
+
+    def test_created_station_is_searchable(self):
+        self.suggest("od")
+        with self.captureOnCommitCallbacks() as callbacks:
+            odesa = create_sample_station(name="Одеса")
+            # Not in the index until the transaction commits
+            self.assertEqual(self.suggest("odes"), [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.suggest("odes"), [odesa.id])
+
+    @override_settings(STATION_POPULARITY_TTL=0)
+    def test_popularity_follows_new_journeys(self):
+        self.suggest("kyi")
+        route = create_sample_route(source=self.kyiv, destination=self.lviv)
+        train = create_sample_train(create_sample_traintype())
+        for _ in range(2):
+            create_sample_journey(route=route, train=train)
+
+        self.assertEqual(
+            self.suggest("kyi"), [self.kyiv.id, self.kyivska.id]
+        )
+
+    def test_invalid_limit_is_rejected(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "kyi", "limit": "ten"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
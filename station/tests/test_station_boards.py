@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+def board_url(station_id, kind="departures"):
+    return reverse(f"station:station-{kind}", args=[station_id])
+
+
+class StationBoardApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+        self.route = create_sample_route(source=self.kyiv, destination=self.lviv)
+        self.train = create_sample_train(create_sample_traintype())
+        self.now = timezone.now()
+
+    def add_journey(self, hours):
+        departure = self.now + timedelta(hours=hours)
+        return create_sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=1),
+        )
+
+    def test_departures_are_upcoming_and_ordered(self):
+        self.add_journey(-5)
+        later = self.add_journey(10)
+        sooner = self.add_journey(2)
+
+        res = self.client.get(board_url(self.kyiv.id))
+
+        self.assertEqual([row["id"] for row in res.data], [sooner.id, later.id])
+        self.assertEqual(res.data[0]["destination"], "Lviv")
+        self.assertEqual(res.data[0]["train"], self.train.name)
+
+    def test_arrivals_and_limit(self):
+        first = self.add_journey(2)
+        self.add_journey(4)
+
+        res = self.client.get(board_url(self.lviv.id, "arrivals"), {"limit": 1})
+
+        self.assertEqual([row["id"] for row in res.data], [first.id])
+        self.assertEqual(self.client.get(board_url(self.lviv.id)).data, [])
+
+    def test_board_is_cached_until_journey_changes(self):
+        self.add_journey(2)
+        self.client.get(board_url(self.kyiv.id))
+
+        with self.assertNumQueries(1):
+            self.client.get(board_url(self.kyiv.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added = self.add_journey(1)
+        res = self.client.get(board_url(self.kyiv.id))
+        self.assertEqual(res.data[0]["id"], added.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added.delete()
+        res = self.client.get(board_url(self.kyiv.id))
+        self.assertNotIn(added.id, [row["id"] for row in res.data])
+
+    def test_boards_are_invalidated_only_on_commit(self):
+        self.client.get(board_url(self.kyiv.id))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            added = self.add_journey(1)
+            # Still inside the transaction: the cached board stands
+            res = self.client.get(board_url(self.kyiv.id))
+            self.assertEqual(res.data, [])
+
+        for callback in callbacks:
+            callback()
+        res = self.client.get(board_url(self.kyiv.id))
+        self.assertEqual(res.data[0]["id"], added.id)
+
+    def test_invalid_limit_is_rejected(self):
+        res = self.client.get(board_url(self.kyiv.id), {"limit": "all"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
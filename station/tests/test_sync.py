@@ -0,0 +1,133 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.archive import archive_journey_batch
+from station.models import Crew, Station, Tombstone
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+STATION_SYNC_URL = reverse("station:station-sync")
+JOURNEY_SYNC_URL = reverse("station:journey-sync")
+
+
+class SyncApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+
+    def sync(self, url, since=0, **params):
+        res = self.client.get(url, {"since": since, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_full_sync_then_only_changes_and_deletions(self):
+        full = self.sync(STATION_SYNC_URL)
+        self.assertEqual(
+            [station["name"] for station in full["changed"]],
+            ["Kyiv", "Lviv"],
+        )
+        self.assertEqual(full["deleted"], [])
+
+        self.kyiv.name = "Kyiv-Pasazhyrskyi"
+        self.kyiv.save()
+        lviv_id = self.lviv.id
+        self.lviv.delete()
+        odesa = create_sample_station(name="Odesa")
+
+        delta = self.sync(STATION_SYNC_URL, full["cursor"])
+
+        self.assertEqual(
+            [station["id"] for station in delta["changed"]],
+            [self.kyiv.id, odesa.id],
+        )
+        self.assertEqual(delta["deleted"], [lviv_id])
+        self.assertGreaterEqual(delta["cursor"], full["cursor"])
+        self.assertEqual(
+            self.sync(STATION_SYNC_URL, delta["cursor"])["changed"], []
+        )
+
+    def test_crew_changes_and_archiving_reach_journey_sync(self):
+        route = create_sample_route(source=self.kyiv, destination=self.lviv)
+        departure = timezone.now() + timedelta(days=1)
+        journey = create_sample_journey(
+            route=route,
+            train=create_sample_train(create_sample_traintype()),
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+        cursor = self.sync(JOURNEY_SYNC_URL)["cursor"]
+        crew = Crew.objects.create(first_name="Ivan", last_name="Franko")
+
+        journey.crews.add(crew)
+        delta = self.sync(JOURNEY_SYNC_URL, cursor)
+
+        self.assertEqual(delta["changed"][0]["crews"], [crew.id])
+
+        archive_journey_batch([journey.id])
+        delta = self.sync(JOURNEY_SYNC_URL, delta["cursor"])
+
+        self.assertEqual(delta["changed"], [])
+        self.assertEqual(delta["deleted"], [journey.id])
+
+    def test_pages_by_limit(self):
+        odesa = create_sample_station(name="Odesa")
+        seen = []
+        cursor = 0
+        while True:
+            page = self.sync(STATION_SYNC_URL, cursor, limit=2)
+            seen += [station["id"] for station in page["changed"]]
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+
+        self.assertEqual(seen, [self.kyiv.id, self.lviv.id, odesa.id])
+
+    def test_change_committed_late_still_follows_the_cursor(self):
+        cursor = self.sync(STATION_SYNC_URL)["cursor"]
+        # A row written before the cursor was taken, committed after it
+        Station.objects.filter(pk=self.kyiv.pk).update(sync_sequence=None)
+
+        delta = self.sync(STATION_SYNC_URL, cursor)
+
+        self.assertEqual(
+            [station["id"] for station in delta["changed"]], [self.kyiv.id]
+        )
+
+    def test_expired_and_invalid_cursors(self):
+        cursor = self.sync(STATION_SYNC_URL)["cursor"]
+        self.lviv.delete()
+        self.sync(STATION_SYNC_URL, cursor)
+        Tombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        call_command("purge_tombstones", stdout=StringIO())
+
+        for since in (cursor, cursor + 100):
+            res = self.client.get(STATION_SYNC_URL, {"since": since})
+            self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+        for params in ({"since": "yesterday"}, {"limit": 0}):
+            res = self.client.get(STATION_SYNC_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,136 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Order, Ticket
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+TICKET_URL = reverse("station:ticket-list")
+TICKET_EXPORT_URL = reverse("station:ticket-export")
+
+
+class TicketApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        route = create_sample_route(
+            source=create_sample_station(name="Kyiv"),
+            destination=create_sample_station(name="Lviv"),
+        )
+        train = create_sample_train(create_sample_traintype())
+        self.today = timezone.now().replace(hour=12)
+        self.journey = create_sample_journey(
+            route=route,
+            train=train,
+            departure_time=self.today,
+            arrival_time=self.today + timedelta(hours=5),
+        )
+        self.tomorrow_journey = create_sample_journey(
+            route=route,
+            train=create_sample_train(create_sample_traintype(), name="Two"),
+            departure_time=self.today + timedelta(days=1),
+            arrival_time=self.today + timedelta(days=1, hours=5),
+        )
+
+        order = Order.objects.create(user=self.user)
+        self.tickets = [
+            Ticket.objects.create(
+                journey=journey, order=order, cargo=1, seat=seat
+            )
+            for journey, seat in (
+                (self.journey, 1),
+                (self.journey, 2),
+                (self.tomorrow_journey, 1),
+            )
+        ]
+        self.foreign = Ticket.objects.create(
+            journey=self.journey,
+            order=Order.objects.create(user=self.other),
+            cargo=1,
+            seat=3,
+        )
+
+    def ids(self, res):
+        return [ticket["id"] for ticket in res.data["results"]]
+
+    def test_list_is_scoped_to_user(self):
+        res = self.client.get(TICKET_URL)
+
+        self.assertEqual(
+            self.ids(res), [ticket.id for ticket in reversed(self.tickets)]
+        )
+        detail = self.client.get(
+            reverse("station:ticket-detail", args=[self.foreign.id])
+        )
+        self.assertEqual(detail.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination(self):
+        first = self.client.get(TICKET_URL, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(len(self.ids(first)), 2)
+        self.assertEqual(self.ids(second), [self.tickets[0].id])
+        self.assertIsNone(second.data["next"])
+
+    def test_filter_by_journey_and_date(self):
+        by_journey = self.client.get(
+            TICKET_URL, {"journey": self.tomorrow_journey.id}
+        )
+        by_date = self.client.get(
+            TICKET_URL, {"date": self.today.strftime("%Y-%m-%d")}
+        )
+
+        self.assertEqual(self.ids(by_journey), [self.tickets[2].id])
+        self.assertEqual(
+            self.ids(by_date), [self.tickets[1].id, self.tickets[0].id]
+        )
+
+    def test_invalid_date_is_rejected(self):
+        res = self.client.get(TICKET_URL, {"date": "11.02.2024"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_staff_see_all_tickets_and_can_export(self):
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+
+        self.assertEqual(len(self.ids(self.client.get(TICKET_URL))), 4)
+
+        res = self.client.get(TICKET_EXPORT_URL, {"journey": self.journey.id})
+        rows = [
+            json.loads(line)
+            for line in b"".join(res.streaming_content).splitlines()
+        ]
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual([row["seat"] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[2]["order__user_id"], self.other.id)
+
+    def test_export_is_staff_only(self):
+        res = self.client.get(TICKET_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
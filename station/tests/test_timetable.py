@@ -0,0 +1,185 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import TimetableSnapshot
+from station.timetable import SECTIONS, build_snapshot, snapshot_builder
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+TIMETABLE_URL = reverse("station:timetable-list")
+
+
+class TimetableSnapshotTests(TestCase):
+    def setUp(self):
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+        self.route = create_sample_route(source=self.kyiv, destination=self.lviv)
+        self.train = create_sample_train(create_sample_traintype())
+        self.departure = timezone.now() + timedelta(days=1)
+        self.journey = create_sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=5),
+        )
+
+    def test_bundle_is_columnar_and_limited_to_window(self):
+        create_sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=self.departure + timedelta(days=60),
+            arrival_time=self.departure + timedelta(days=60, hours=5),
+        )
+
+        snapshot = build_snapshot()
+        bundle = json.loads(gzip.decompress(bytes(snapshot.bundle)))
+
+        self.assertEqual(bundle["version"], 1)
+        self.assertEqual(
+            bundle["sections"]["stations"]["name"], ["Kyiv", "Lviv"]
+        )
+        self.assertEqual(
+            bundle["sections"]["journeys"]["id"], [self.journey.id]
+        )
+        self.assertEqual(
+            bundle["sections"]["journeys"]["departure_time"],
+            [int(self.departure.timestamp())],
+        )
+
+    def test_only_dirty_sections_are_rebuilt(self):
+        first = build_snapshot()
+        self.assertEqual(build_snapshot(), first)
+
+        create_sample_station(name="Odesa")
+        journeys = mock.Mock(wraps=SECTIONS["journeys"])
+        with mock.patch.dict(SECTIONS, {"journeys": journeys}):
+            second = build_snapshot()
+
+        journeys.assert_not_called()
+        self.assertEqual(second.version, 2)
+        self.assertEqual(second.content["journeys"], first.content["journeys"])
+        self.assertIn("Odesa", second.content["stations"]["name"])
+
+    def test_changes_schedule_a_rebuild_after_commit(self):
+        build_snapshot()
+
+        with mock.patch.object(
+            snapshot_builder, "_start_timer"
+        ) as start, self.captureOnCommitCallbacks(execute=True):
+            create_sample_station(name="Odesa")
+            start.assert_not_called()
+
+        start.assert_called()
+        self.assertEqual(build_snapshot().version, 2)
+
+    def test_command_builds_snapshot(self):
+        out = StringIO()
+
+        call_command("build_timetable", "--full", stdout=out)
+
+        self.assertIn("Timetable v1", out.getvalue())
+        self.assertEqual(TimetableSnapshot.objects.count(), 1)
+
+
+class TimetableApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+
+    def get(self, **params):
+        return self.client.get(
+            TIMETABLE_URL, params, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+    def test_full_bundle_is_served_compressed(self):
+        build_snapshot()
+        res = self.get()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(res["X-Timetable-Version"], "1")
+        bundle = json.loads(gzip.decompress(res.content))
+        self.assertEqual(len(bundle["sections"]["stations"]["id"]), 2)
+
+    def test_delta_since_older_version(self):
+        build_snapshot()
+        self.lviv.name = "Lviv-Holovnyi"
+        self.lviv.save()
+        odesa = create_sample_station(name="Odesa")
+        kyiv_id = self.kyiv.id
+        self.kyiv.delete()
+        build_snapshot()
+
+        res = self.client.get(TIMETABLE_URL, {"since": 1})
+        delta = json.loads(res.content)
+
+        self.assertNotIn("Content-Encoding", res)
+        self.assertEqual(delta["from_version"], 1)
+        self.assertEqual(list(delta["sections"]), ["stations"])
+        stations = delta["sections"]["stations"]
+        self.assertEqual(stations["upsert"]["id"], [self.lviv.id, odesa.id])
+        self.assertEqual(
+            stations["upsert"]["name"], ["Lviv-Holovnyi", "Odesa"]
+        )
+        self.assertEqual(stations["delete"], [kyiv_id])
+
+    def test_invalid_version_is_rejected(self):
+        res = self.client.get(TIMETABLE_URL, {"since": "latest"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unchanged_client_gets_not_modified(self):
+        build_snapshot()
+        etag = self.get()["ETag"]
+
+        res = self.client.get(TIMETABLE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unavailable_until_the_first_build(self):
+        with mock.patch.object(
+            snapshot_builder, "_start_timer"
+        ) as start, self.captureOnCommitCallbacks(execute=True):
+            res = self.get()
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(TimetableSnapshot.objects.exists())
+        start.assert_called_once()
+
+    def test_stale_window_schedules_a_build(self):
+        build_snapshot()
+        TimetableSnapshot.objects.update(
+            window_start=timezone.localdate() - timedelta(days=1)
+        )
+
+        with mock.patch.object(
+            snapshot_builder, "_start_timer"
+        ) as start, self.captureOnCommitCallbacks(execute=True):
+            res = self.get()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        start.assert_called_once()
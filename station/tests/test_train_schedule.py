@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Crew
+from station.tests.test_journey_api import (
+    create_sample_journey,
+    create_sample_route,
+    create_sample_station,
+    create_sample_train,
+    create_sample_traintype,
+)
+
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def utilization_url(train_id):
+    return reverse("station:train-utilization", args=[train_id])
+
+
+class TrainScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.kyiv = create_sample_station(name="Kyiv")
+        self.lviv = create_sample_station(name="Lviv")
+        self.outbound = create_sample_route(
+            source=self.kyiv, destination=self.lviv
+        )
+        self.inbound = create_sample_route(
+            source=self.lviv, destination=self.kyiv
+        )
+        self.train = create_sample_train(train_type=create_sample_traintype())
+        self.crew = Crew.objects.create(first_name="John", last_name="Doe")
+        self.start = timezone.make_aware(datetime(2024, 3, 1, 8))
+        create_sample_journey(
+            route=self.outbound,
+            train=self.train,
+            departure_time=self.start,
+            arrival_time=self.start + timedelta(hours=6),
+        )
+
+    def create_journey(self, route, hours_after_start, duration=6):
+        departure_time = self.start + timedelta(hours=hours_after_start)
+        return self.client.post(
+            JOURNEY_URL,
+            {
+                "route": route.id,
+                "train": self.train.id,
+                "departure_time": departure_time,
+                "arrival_time": departure_time + timedelta(hours=duration),
+                "crews": [self.crew.id],
+            },
+        )
+
+    def test_overlapping_journey_is_rejected(self):
+        res = self.create_journey(self.inbound, hours_after_start=5)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("train", res.data)
+
+    def test_journey_must_start_where_train_arrived(self):
+        res = self.create_journey(self.outbound, hours_after_start=8)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("route", res.data)
+
+    def test_return_journey_is_accepted(self):
+        res = self.create_journey(self.inbound, hours_after_start=8)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_utilization_over_window(self):
+        self.create_journey(self.inbound, hours_after_start=8)
+
+        res = self.client.get(
+            utilization_url(self.train.id),
+            {"start": "2024-03-01", "end": "2024-03-02"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["journeys"], 2)
+        self.assertEqual(res.data["active_seconds"], 12 * 3600)
+        self.assertEqual(res.data["idle_seconds"], 12 * 3600)
+        self.assertEqual(res.data["utilization"], 0.5)
+
+    def test_utilization_rejects_a_bad_date(self):
+        res = self.client.get(
+            utilization_url(self.train.id), {"start": "01.03.2024"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("start", res.data)
@@ -0,0 +1,43 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+
+ENSURE_CONNECTION = (
+    "django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection"
+)
+PENDING_MIGRATIONS = (
+    "station.management.commands.wait_for_db.Command.pending_migrations"
+)
+
+
+@patch("station.management.commands.wait_for_db.time.sleep")
+class WaitForDbCommandTests(SimpleTestCase):
+    def test_retries_until_database_is_ready(self, sleep):
+        with patch(
+            ENSURE_CONNECTION, side_effect=[OperationalError] * 3 + [None]
+        ) as ensure_connection:
+            call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(ensure_connection.call_count, 4)
+        self.assertEqual(sleep.call_count, 3)
+        for call in sleep.call_args_list:
+            self.assertLessEqual(call.args[0], 5.0)
+
+    def test_gives_up_after_deadline(self, sleep):
+        with patch(ENSURE_CONNECTION, side_effect=OperationalError):
+            with self.assertRaises(CommandError):
+                call_command("wait_for_db", "--timeout=0", stdout=StringIO())
+
+    def test_waits_for_pending_migrations(self, sleep):
+        with patch(ENSURE_CONNECTION), patch(
+            PENDING_MIGRATIONS, side_effect=[["0001_initial"], []]
+        ) as pending:
+            call_command("wait_for_db", "--migrations", stdout=StringIO())
+
+        self.assertEqual(pending.call_count, 2)
+        self.assertEqual(sleep.call_count, 1)
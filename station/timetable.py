@@ -0,0 +1,246 @@
+import gzip
+import json
+import logging
+import threading
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from station.models import (
+    Journey,
+    Route,
+    Station,
+    TimetableSection,
+    TimetableSnapshot,
+    Train,
+)
+
+
+logger = logging.getLogger(__name__)
+
+def _epoch(value):
+    return int(value.timestamp())
+
+
+def _columns(queryset, fields, convert=None):
+    """
+    Lay rows out column by column, which compresses far better than a
+    list of objects repeating every key
+    """
+    convert = convert or {}
+    columns = {field: [] for field in fields}
+    for row in queryset.order_by("id").values_list(*fields):
+        for field, value in zip(fields, row):
+            if field in convert:
+                value = convert[field](value)
+            columns[field].append(value)
+    return columns
+
+
+def _stations(window_start):
+    return _columns(
+        Station.objects.all(), ("id", "name", "latitude", "longitude")
+    )
+
+
+def _routes(window_start):
+    return _columns(
+        Route.objects.all(), ("id", "source_id", "destination_id", "distance")
+    )
+
+
+def _trains(window_start):
+    return _columns(
+        Train.objects.all(),
+        ("id", "name", "cargo_num", "places_in_cargo", "train_type_id"),
+    )
+
+
+def _journeys(window_start):
+    start = timezone.make_aware(datetime.combine(window_start, time.min))
+    end = start + timedelta(days=settings.TIMETABLE_DAYS)
+    return _columns(
+        Journey.objects.filter(
+            departure_time__gte=start, departure_time__lt=end
+        ),
+        ("id", "route_id", "train_id", "departure_time", "arrival_time"),
+        convert={"departure_time": _epoch, "arrival_time": _epoch},
+    )
+
+
+SECTIONS = {
+    "stations": _stations,
+    "routes": _routes,
+    "trains": _trains,
+    "journeys": _journeys,
+}
+
+
+def mark_dirty(*names):
+    """
+    Flag sections whose source rows changed and schedule a rebuild;
+    cheap enough for signals. Nothing is scheduled before the first
+    build (``build_timetable`` on deploy) has created the sections.
+    """
+    if TimetableSection.objects.filter(name__in=names).update(dirty=True):
+        schedule_build()
+
+
+class _SnapshotBuilder:
+    """
+    Runs ``build_snapshot`` in a background thread once the current
+    transaction commits; marks arriving within
+    ``TIMETABLE_REBUILD_DELAY`` share one build
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def schedule(self):
+        transaction.on_commit(self._start_timer)
+
+    def _start_timer(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(
+                settings.TIMETABLE_REBUILD_DELAY, self._build
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _build(self):
+        with self._lock:
+            self._timer = None
+        try:
+            build_snapshot()
+        except IntegrityError:
+            # Another process built the same version first
+            logger.info("Timetable snapshot built elsewhere")
+        except Exception:
+            logger.exception("Timetable snapshot build failed")
+        finally:
+            connections.close_all()
+
+
+snapshot_builder = _SnapshotBuilder()
+
+
+def schedule_build():
+    snapshot_builder.schedule()
+
+
+def _compress(data):
+    return gzip.compress(
+        json.dumps(data, separators=(",", ":")).encode(), compresslevel=9
+    )
+
+
+def build_snapshot(full=False):
+    """
+    Build a new snapshot version if anything changed since the latest.
+
+    Only dirty sections are queried again, the rest are copied from the
+    latest snapshot. Journeys are also rebuilt when the day changes, as
+    their window moves with it. Returns the latest snapshot, new or not.
+    """
+    window_start = timezone.localdate()
+
+    with transaction.atomic():
+        # Every section row is locked, so builds in other processes wait
+        sections = TimetableSection.objects.select_for_update().order_by(
+            "name"
+        )
+        clean = {
+            name
+            for name, dirty in sections.values_list("name", "dirty")
+            if not dirty
+        }
+        latest = TimetableSnapshot.objects.first()
+        if full or latest is None:
+            clean = set()
+        elif latest.window_start != window_start:
+            clean.discard("journeys")
+
+        dirty = [name for name in SECTIONS if name not in clean]
+        if not dirty:
+            return latest
+
+        # Clear the marks before reading, so that writes landing during
+        # the build flag their section again for the next run
+        for name in dirty:
+            TimetableSection.objects.update_or_create(
+                name=name, defaults={"dirty": False}
+            )
+
+        content = dict(latest.content) if latest else {}
+        for name in dirty:
+            content[name] = SECTIONS[name](window_start)
+
+        if (
+            latest
+            and latest.window_start == window_start
+            and content == latest.content
+        ):
+            return latest
+
+        version = latest.version + 1 if latest else 1
+        snapshot = TimetableSnapshot.objects.create(
+            version=version,
+            window_start=window_start,
+            content=content,
+            bundle=_compress(
+                {
+                    "version": version,
+                    "window_start": window_start.isoformat(),
+                    "sections": content,
+                }
+            ),
+        )
+        TimetableSnapshot.objects.filter(
+            version__lte=version - settings.TIMETABLE_KEEP_VERSIONS
+        ).delete()
+
+    return snapshot
+
+
+def _rows_by_id(columns):
+    return {row[0]: row for row in zip(*columns.values())}
+
+
+def section_delta(old, new):
+    """Rows added or changed in ``new`` (columnar) and ids removed from it"""
+    fields = list(new)
+    old_rows = _rows_by_id(old) if list(old) == fields else {}
+    new_rows = _rows_by_id(new)
+
+    changed = [
+        row for row_id, row in new_rows.items() if old_rows.get(row_id) != row
+    ]
+    return {
+        "upsert": {
+            field: [row[index] for row in changed]
+            for index, field in enumerate(fields)
+        },
+        "delete": sorted(set(old.get("id", [])) - set(new_rows)),
+    }
+
+
+def snapshot_delta(old, new):
+    """Pre-compressed delta that moves a client from ``old`` to ``new``"""
+    sections = {
+        name: section_delta(old.content.get(name, {}), columns)
+        for name, columns in new.content.items()
+        if old.content.get(name) != columns
+    }
+    return _compress(
+        {
+            "from_version": old.version,
+            "version": new.version,
+            "window_start": new.window_start.isoformat(),
+            "sections": sections,
+        }
+    )
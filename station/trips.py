@@ -0,0 +1,149 @@
+import heapq
+from bisect import bisect_left
+from datetime import datetime, time, timedelta
+from operator import itemgetter
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from station.models import Journey
+
+
+def _day_range(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def round_trip_candidates(origin, destination, outbound_date, return_date):
+    """
+    Journeys of both directions with free seats, in one query over the
+    (route, departure_time) index, split into (outbound, inbound)
+    """
+    outbound_start, outbound_end = _day_range(outbound_date)
+    return_start, return_end = _day_range(return_date)
+    journeys = (
+        Journey.objects.filter(
+            Q(
+                route__source_id=origin,
+                route__destination_id=destination,
+                departure_time__gte=outbound_start,
+                departure_time__lt=outbound_end,
+            )
+            | Q(
+                route__source_id=destination,
+                route__destination_id=origin,
+                departure_time__gte=return_start,
+                departure_time__lt=return_end,
+            )
+        )
+        .annotate(
+            available_seats=(
+                F("train__cargo_num") * F("train__places_in_cargo")
+                - Count("tickets")
+            )
+        )
+        .filter(available_seats__gt=0)
+        .values(
+            "id",
+            "route__source_id",
+            "train__name",
+            "departure_time",
+            "arrival_time",
+            "available_seats",
+        )
+    )
+
+    outbound, inbound = [], []
+    for journey in journeys:
+        journey["train"] = journey.pop("train__name")
+        is_outbound = journey.pop("route__source_id") == origin
+        (outbound if is_outbound else inbound).append(journey)
+    return outbound, inbound
+
+
+def _duration(journey):
+    return journey["arrival_time"] - journey["departure_time"]
+
+
+def _merge(first, second):
+    """
+    Persistent leftist heap of ``(key, left, right, rank)`` nodes: the
+    merge copies one path and shares every other node
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if second[0] < first[0]:
+        first, second = second, first
+    key, left, right, _ = first
+    right = _merge(right, second)
+    if left is None or left[3] < right[3]:
+        left, right = right, left
+    return key, left, right, (right[3] if right else 0) + 1
+
+
+def pair_round_trips(outbound, inbound, min_stay, limit):
+    """
+    Best ``limit`` (outbound, return) pairs where the return leaves at
+    least ``min_stay`` after the outbound arrives, shortest total travel
+    time first, then most seats available on both legs.
+
+    With returns sorted by departure, the ones an outbound journey can
+    pair with are a suffix of that list. Every suffix gets a heap of its
+    returns by duration, built from the next one in O(log m) and sharing
+    its nodes. Pairs then come out shortest first from a frontier holding
+    one heap node per outbound journey. That costs
+    O((n + m + k) log(n + m)) for the k pairs looked at instead of
+    ranking all n * m. Pairs tied with the last one on duration are
+    looked at too, so the seat tie-break still sees them.
+    """
+    if limit <= 0:
+        return []
+
+    inbound = sorted(inbound, key=itemgetter("departure_time"))
+    departures = [back["departure_time"] for back in inbound]
+
+    suffix_heaps = [None] * (len(inbound) + 1)
+    for position in range(len(inbound) - 1, -1, -1):
+        node = ((_duration(inbound[position]), position), None, None, 1)
+        suffix_heaps[position] = _merge(node, suffix_heaps[position + 1])
+
+    frontier = []
+    for index, leg in enumerate(outbound):
+        first_return = bisect_left(departures, leg["arrival_time"] + min_stay)
+        root = suffix_heaps[first_return]
+        if root is not None:
+            frontier.append((_duration(leg) + root[0][0], index, root))
+    heapq.heapify(frontier)
+
+    pairs = []
+    while frontier and (
+        len(pairs) < limit or frontier[0][0] == pairs[-1][0]
+    ):
+        total, index, node = heapq.heappop(frontier)
+        pairs.append((total, outbound[index], inbound[node[0][1]]))
+        for child in node[1:3]:
+            if child is not None:
+                heapq.heappush(
+                    frontier,
+                    (_duration(outbound[index]) + child[0][0], index, child),
+                )
+
+    def rank(pair):
+        total, leg, back = pair
+        seats = min(leg["available_seats"], back["available_seats"])
+        return total, -seats, leg["departure_time"], back["departure_time"]
+
+    return [
+        {
+            "outbound": leg,
+            "inbound": back,
+            "total_duration": total,
+            "stay": back["departure_time"] - leg["arrival_time"],
+            "available_seats": min(
+                leg["available_seats"], back["available_seats"]
+            ),
+        }
+        for total, leg, back in heapq.nsmallest(limit, pairs, key=rank)
+    ]
@@ -1,5 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+
+from .streams import journey_seat_stream
 from .views import (
     StationViewSet,
     RouteViewSet,
@@ -9,6 +11,11 @@ from .views import (
     JourneyViewSet,
     OrderViewSet,
     TicketViewSet,
+    OccupancyDailyViewSet,
+    BookingRequestViewSet,
+    ScheduleTemplateViewSet,
+    ChangeFeedViewSet,
+    TimetableViewSet,
 )
 
 
@@ -19,10 +26,22 @@ router.register(r"crews", CrewViewSet, basename="crew")
 router.register(r"traintypes", TrainTypeViewSet, basename="traintype")
 router.register(r"trains", TrainViewSet, basename="train")
 router.register(r"journeys", JourneyViewSet, basename="journey")
+router.register(r"schedules", ScheduleTemplateViewSet, basename="schedule")
 router.register(r"orders", OrderViewSet, basename="order")
 router.register(r"tickets", TicketViewSet, basename="ticket")
+router.register(r"bookings", BookingRequestViewSet, basename="booking")
+router.register(r"changes", ChangeFeedViewSet, basename="change")
+router.register(r"timetable", TimetableViewSet, basename="timetable")
+router.register(
+    r"analytics/occupancy", OccupancyDailyViewSet, basename="occupancy"
+)
 
 urlpatterns = [
+    path(
+        "journeys/<int:pk>/seats/stream/",
+        journey_seat_stream,
+        name="journey-seat-stream",
+    ),
     path("", include(router.urls)),
 ]
 
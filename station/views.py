@@ -1,15 +1,35 @@
-from datetime import datetime
+import gzip
+import json
+from datetime import datetime, timedelta
 
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
 from django.db.models import F, Count
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
+from station.boards import station_board
+from station.db_router import ReplicaReadMixin
+from station.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetMixin
+from station.idempotency import IDEMPOTENCY_HEADER, IdempotentCreateMixin
+from station.network import network_matrix
+from station.params import date_param, ids_param, int_param
 from station.permissions import IsAdminOrIfAuthenticatedReadOnly
+from station.sale_queue import SaleQueueCreateMixin, wait_for_booking
+from station.scheduling import materialize_schedules, train_utilization
+from station.search import station_index
+from station.seat_map import get_seat_map
+from station.sync import SyncMixin
+from station.timetable import schedule_build, snapshot_delta
+from station.trips import pair_round_trips, round_trip_candidates
 
 
 from rest_framework.mixins import (
@@ -27,9 +47,15 @@ from station.models import (
     Journey,
     Order,
     Ticket,
+    OccupancyDaily,
+    BookingRequest,
+    ScheduleTemplate,
+    OutboxEvent,
+    TimetableSnapshot,
 )
 from station.serializers import (
     StationSerializer,
+    StationBoardSerializer,
     RouteSerializer,
     CrewSerializer,
     TrainTypeSerializer,
@@ -41,41 +67,180 @@ from station.serializers import (
     JourneyDetailSerializer,
     RouteListSerializer,
     RouteDetailSerializer,
+    RouteBulkCreateSerializer,
+    RouteBulkResultSerializer,
     OrderListSerializer,
     TrainImageSerializer,
     TrainDetailSerializer,
+    OccupancyDailySerializer,
+    BookingRequestSerializer,
+    JourneyCrewAssignmentSerializer,
+    ScheduleTemplateSerializer,
+    ScheduleMaterializeSerializer,
+    OutboxEventSerializer,
+    ChangeFeedSerializer,
+    SeatMapSerializer,
+    RoundTripSearchSerializer,
+    RoundTripSerializer,
+)
+
+
+BOARD_LIMIT_PARAMETER = OpenApiParameter(
+    "limit",
+    type=OpenApiTypes.INT,
+    description="Number of journeys on the board (ex. ?limit=10, max 50)",
 )
 
 
 class StationViewSet(
+    ReplicaReadMixin,
+    SparseFieldsetMixin,
+    SyncMixin,
     CreateModelMixin,
     ListModelMixin,
     GenericViewSet,
 ):
-    queryset = Station.objects.all().prefetch_related(
-        "departure_station", "arrival_station"
-    )
+    queryset = Station.objects.all()
     serializer_class = StationSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    sync_serializer_class = StationSerializer
+
+    def get_queryset(self):
+        return self.optimize_queryset(self.queryset)
+
+    @extend_schema(parameters=FIELDSET_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description="Beginning of a station name (ex. ?q=kyi)",
+                required=True,
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of suggestions (ex. ?limit=5, max 50)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request):
+        """Suggest stations by name prefix, most popular first"""
+        query = request.query_params.get("q", "")
+        limit = int_param(request, "limit", 10, min_value=1, max_value=50)
+
+        return Response(station_index.search(query, limit))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Station ids to measure from (ex. ?source=1,2)",
+                required=True,
+            ),
+            OpenApiParameter(
+                "destination",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Station ids to measure to (ex. ?destination=3,4)",
+                required=True,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="distances")
+    def distances(self, request):
+        """
+        Endpoint for shortest network distances (km) between stations,
+        one row per source; null where no route connects them
+        """
+        sources = ids_param(request, "source")
+        destinations = ids_param(request, "destination")
+        if not sources or not destinations:
+            return Response(
+                {"detail": "Both source and destination are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(sources) > 100 or len(destinations) > 100:
+            return Response(
+                {"detail": "At most 100 sources and 100 destinations."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        distances = network_matrix.distances(sources, destinations)
+        if distances is None:
+            return Response(
+                {"detail": "Distances are being computed, retry later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "30"},
+            )
+
+        return Response(
+            {
+                "source": sources,
+                "destination": destinations,
+                "distances": distances,
+            }
+        )
+
+    def _board(self, request, kind):
+        station = self.get_object()
+        limit = int_param(request, "limit", 20, min_value=1, max_value=50)
+        serializer = StationBoardSerializer(
+            station_board(station.id, kind, limit), many=True
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[BOARD_LIMIT_PARAMETER],
+        responses=StationBoardSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=True, url_path="departures")
+    def departures(self, request, pk=None):
+        """Endpoint for next journeys departing from a station"""
+        return self._board(request, "departures")
+
+    @extend_schema(
+        parameters=[BOARD_LIMIT_PARAMETER],
+        responses=StationBoardSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=True, url_path="arrivals")
+    def arrivals(self, request, pk=None):
+        """Endpoint for next journeys arriving at a station"""
+        return self._board(request, "arrivals")
 
 
 class RouteViewSet(
+    ReplicaReadMixin,
+    SparseFieldsetMixin,
+    SyncMixin,
     CreateModelMixin,
     ListModelMixin,
     RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = Route.objects.all().select_related("source", "destination")
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    sync_serializer_class = RouteSerializer
 
     @staticmethod
     def _params_to_ints(qs):
         """Converts a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(",")]
 
+    def get_field_optimizations(self, expand):
+        return {
+            "source": {"select_related": ("source",)},
+            "destination": {"select_related": ("destination",)},
+        }
+
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.optimize_queryset(self.queryset)
         source = self.request.query_params.get("source")
 
         if source:
@@ -91,10 +256,47 @@ class RouteViewSet(
         if self.action == "retrieve":
             return RouteDetailSerializer
 
+        if self.action == "bulk":
+            return RouteBulkCreateSerializer
+
         return super().get_serializer_class()
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by source station id (ex. ?source=2,5)",
+            ),
+            *FIELDSET_PARAMETERS,
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=FIELDSET_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(responses=RouteBulkResultSerializer(many=True))
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        """
+        Endpoint for creating many routes at once; missing distances are
+        computed from station coordinates and implausible ones flagged
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        routes = serializer.save()["routes"]
+
+        return Response(
+            RouteBulkResultSerializer(routes, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
 
 class CrewViewSet(
+    ReplicaReadMixin,
     CreateModelMixin,
     ListModelMixin,
     GenericViewSet,
@@ -105,6 +307,7 @@ class CrewViewSet(
 
 
 class TrainTypeViewSet(
+    ReplicaReadMixin,
     CreateModelMixin,
     ListModelMixin,
     GenericViewSet,
@@ -115,14 +318,33 @@ class TrainTypeViewSet(
 
 
 class TrainViewSet(
+    ReplicaReadMixin,
+    SparseFieldsetMixin,
+    SyncMixin,
     CreateModelMixin,
     ListModelMixin,
     RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = Train.objects.all().select_related("train_type")
+    queryset = Train.objects.all()
     serializer_class = TrainSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    sync_serializer_class = TrainSerializer
+    sync_related = ("train_type",)
+
+    def get_field_optimizations(self, expand):
+        return {"train_type": {"select_related": ("train_type",)}}
+
+    def get_queryset(self):
+        return self.optimize_queryset(self.queryset)
+
+    @extend_schema(parameters=FIELDSET_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=FIELDSET_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -136,6 +358,52 @@ class TrainViewSet(
 
         return super().get_serializer_class()
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "start",
+                type=OpenApiTypes.DATE,
+                description="Window start, defaults to 30 days ago "
+                            "(ex. ?start=2024-02-01)",
+            ),
+            OpenApiParameter(
+                "end",
+                type=OpenApiTypes.DATE,
+                description="Window end, exclusive, defaults to now "
+                            "(ex. ?end=2024-03-01)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="utilization")
+    def utilization(self, request, pk=None):
+        """Active and idle time of specific train over a window"""
+        train = self.get_object()
+        end = timezone.now()
+        start = end - timedelta(days=30)
+
+        start_date = date_param(request, "start")
+        if start_date:
+            start = self._date_to_datetime(start_date)
+
+        end_date = date_param(request, "end")
+        if end_date:
+            end = self._date_to_datetime(end_date)
+
+        if end <= start:
+            return Response(
+                {"end": "End of the window must be after its start."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(train_utilization(train.id, start, end))
+
+    @staticmethod
+    def _date_to_datetime(value):
+        """Converts a date to an aware midnight datetime"""
+        return timezone.make_aware(
+            datetime.combine(value, datetime.min.time())
+        )
+
     @action(
         methods=["POST"],
         detail=True,
@@ -153,26 +421,66 @@ class TrainViewSet(
 
 
 class JourneyViewSet(
+    ReplicaReadMixin,
+    SparseFieldsetMixin,
+    SyncMixin,
     CreateModelMixin,
     ListModelMixin,
     RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = (
-        Journey.objects.all()
-        .prefetch_related("crews", "tickets")
-        .select_related("route", "train", "train__train_type")
-        .annotate(seats_cargo_num_available=(F("train__cargo_num") - Count("tickets")))
-        .annotate(
-            seats_places_in_cargo_available=(
-                F("train__places_in_cargo") - Count("tickets")
-            )
-        )
-        .annotate(count_taken_seats=Count("tickets"))
-        .annotate(count_taken_cargo=Count("tickets"))
-    )
+    queryset = Journey.objects.all()
     serializer_class = JourneySerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    sync_serializer_class = JourneySerializer
+
+    def get_sync_queryset(self):
+        return super().get_sync_queryset().prefetch_related("crews")
+
+    def get_field_optimizations(self, expand):
+        if self.action == "retrieve":
+            tickets = {"prefetch_related": ("tickets",)}
+            return {
+                "route": {"select_related": ("route",)},
+                "train": (
+                    {"select_related": ("train__train_type",)}
+                    if "train" in expand
+                    else {}
+                ),
+                "crews": {"prefetch_related": ("crews",)},
+                "tickets": tickets,
+                "taken_seats": tickets,
+                "taken_cargo": tickets,
+            }
+
+        return {
+            "train": {"select_related": ("train__train_type",)},
+            "route_distance": {"select_related": ("route",)},
+            "route": {
+                "select_related": ("route__source", "route__destination")
+            },
+            "crews": {"prefetch_related": ("crews",)},
+            "seats_cargo_num_available": {
+                "annotate": {
+                    "seats_cargo_num_available": (
+                        F("train__cargo_num") - Count("tickets")
+                    )
+                }
+            },
+            "seats_places_in_cargo_available": {
+                "annotate": {
+                    "seats_places_in_cargo_available": (
+                        F("train__places_in_cargo") - Count("tickets")
+                    )
+                }
+            },
+            "count_taken_seats": {
+                "annotate": {"count_taken_seats": Count("tickets")}
+            },
+            "count_taken_cargo": {
+                "annotate": {"count_taken_cargo": Count("tickets")}
+            },
+        }
 
     def get_serializer_class(self):
 
@@ -182,15 +490,79 @@ class JourneyViewSet(
         if self.action == "retrieve":
             return JourneyDetailSerializer
 
+        if self.action == "assign_crews":
+            return JourneyCrewAssignmentSerializer
+
         return super().get_serializer_class()
 
+    @extend_schema(
+        parameters=[RoundTripSearchSerializer],
+        responses=RoundTripSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="round-trip")
+    def round_trip(self, request):
+        """
+        Endpoint for pairing outbound and return journeys between two
+        stations, shortest total travel time first
+        """
+        search = RoundTripSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        outbound, inbound = round_trip_candidates(
+            params["origin"],
+            params["destination"],
+            params["outbound_date"],
+            params["return_date"],
+        )
+        trips = pair_round_trips(
+            outbound,
+            inbound,
+            timedelta(hours=params["min_stay"]),
+            params["limit"],
+        )
+        return Response(RoundTripSerializer(trips, many=True).data)
+
+    @extend_schema(responses=SeatMapSerializer)
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """
+        Endpoint for the seat grid of a journey: one string per cargo,
+        ``1`` for a taken seat, served from cache
+        """
+        seat_map = get_seat_map(int(pk)) if pk.isdigit() else None
+        if seat_map is None:
+            raise NotFound()
+        return Response(seat_map)
+
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="assign-crews",
+        permission_classes=[IsAdminUser],
+    )
+    def assign_crews(self, request, pk=None):
+        """Endpoint for adding crew members to specific journey"""
+        journey = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "journey": journey},
+        )
+
+        serializer.is_valid(raise_exception=True)
+        journey.crews.add(*serializer.validated_data["crews"])
+        return Response(
+            {"crews": list(journey.crews.values_list("id", flat=True))},
+            status=status.HTTP_200_OK,
+        )
+
     @staticmethod
     def _params_to_ints(qs):
         """Converts a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(",")]
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.optimize_queryset(self.queryset)
         train = self.request.query_params.get("train")
         departure_time = self.request.query_params.get("departure_time")
         arrival_time = self.request.query_params.get("arrival_time")
@@ -232,11 +604,55 @@ class JourneyViewSet(
                     "(ex. ?arrival_time=2024-02-15)"
                 ),
             ),
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(parameters=FIELDSET_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ScheduleTemplateViewSet(
+    ReplicaReadMixin,
+    CreateModelMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
+):
+    queryset = ScheduleTemplate.objects.all().prefetch_related("crews")
+    serializer_class = ScheduleTemplateSerializer
+    permission_classes = (IsAdminUser,)
+
+    def get_serializer_class(self):
+        if self.action == "materialize":
+            return ScheduleMaterializeSerializer
+
+        return super().get_serializer_class()
+
+    @action(methods=["POST"], detail=True, url_path="materialize")
+    def materialize(self, request, pk=None):
+        """Endpoint for creating the journeys of specific schedule"""
+        template = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        until = timezone.localdate() + timedelta(
+            days=serializer.validated_data["days"]
+        )
+        journeys, skipped = materialize_schedules(
+            until, ScheduleTemplate.objects.filter(pk=template.pk)
+        )
+        return Response(
+            {
+                "created": [journey.id for journey in journeys],
+                "skipped": [departure for _, departure, _ in skipped],
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class OrderPagination(PageNumberPagination):
     page_size = 10
@@ -245,6 +661,8 @@ class OrderPagination(PageNumberPagination):
 
 
 class OrderViewSet(
+    IdempotentCreateMixin,
+    SaleQueueCreateMixin,
     CreateModelMixin,
     ListModelMixin,
     RetrieveModelMixin,
@@ -258,15 +676,17 @@ class OrderViewSet(
     def get_queryset(self):
         queryset = self.queryset.filter(user=self.request.user)
 
-        if self.action == "list":
+        if self.action in ("list", "retrieve"):
             queryset = queryset.prefetch_related(
-                "tickets__journey__train", "tickets__journey__crews"
+                "tickets__journey__train",
+                "tickets__journey__crews",
+                "archived_tickets__journey",
             )
 
         return queryset
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "retrieve"):
             return OrderListSerializer
 
         return super().get_serializer_class()
@@ -274,6 +694,68 @@ class OrderViewSet(
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "Unique key per order attempt; retries with the same key "
+                    "return the original response instead of booking again"
+                ),
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+
+class BookingRequestViewSet(
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
+):
+    queryset = BookingRequest.objects.all()
+    serializer_class = BookingRequestSerializer
+    pagination_class = OrderPagination
+    permission_classes = (IsAuthenticated,)
+    max_wait = 25
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "wait",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Seconds to wait for a pending booking to be processed "
+                    "(ex. ?wait=10, max 25)"
+                ),
+            ),
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        booking = self.get_object()
+        wait = int_param(
+            request, "wait", 0, min_value=0, max_value=self.max_wait
+        )
+
+        if wait:
+            booking = wait_for_booking(booking, wait)
+
+        serializer = self.get_serializer(booking)
+        return Response(serializer.data)
+
+
+class TicketPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = "-id"
+
 
 class TicketViewSet(
     CreateModelMixin,
@@ -281,10 +763,274 @@ class TicketViewSet(
     RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = (
-        Ticket.objects.all()
-        .select_related("journey", "journey__train", "order", "journey__route")
-        .prefetch_related("journey__crews")
-    )
+    queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
+    pagination_class = TicketPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    export_fields = (
+        "id",
+        "cargo",
+        "seat",
+        "journey_id",
+        "order_id",
+        "order__user_id",
+        "journey__departure_time",
+    )
+
+    @staticmethod
+    def _params_to_ints(qs):
+        """Converts a list of string IDs to a list of integers"""
+        return [int(str_id) for str_id in qs.split(",")]
+
+    def get_queryset(self):
+        queryset = self.queryset
+
+        # Staff see every ticket, everybody else only their own
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(order__user=self.request.user)
+
+        journey = self.request.query_params.get("journey")
+        date = date_param(self.request, "date")
+
+        if journey:
+            queryset = queryset.filter(
+                journey_id__in=self._params_to_ints(journey)
+            )
+
+        if date:
+            # A range keeps the departure_time index usable, unlike __date
+            day_start = timezone.make_aware(
+                datetime.combine(date, datetime.min.time())
+            )
+            queryset = queryset.filter(
+                journey__departure_time__gte=day_start,
+                journey__departure_time__lt=day_start + timedelta(days=1),
+            )
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "journey",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by journey id (ex. ?journey=2,5)",
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Filter by journey departure date "
+                    "(ex. ?date=2024-02-11)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(responses={(200, "application/x-ndjson"): OpenApiTypes.STR})
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        permission_classes=[IsAdminUser],
+    )
+    def export(self, request):
+        """Endpoint for streaming every matching ticket as NDJSON"""
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .order_by("id")
+            .values(*self.export_fields)
+            .iterator(chunk_size=2000)
+        )
+        return StreamingHttpResponse(
+            (
+                json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+                for row in rows
+            ),
+            content_type="application/x-ndjson",
+        )
+
+
+class OccupancyDailyViewSet(
+    ListModelMixin,
+    GenericViewSet,
+):
+    queryset = OccupancyDaily.objects.all().select_related(
+        "route__source", "route__destination", "train"
+    )
+    serializer_class = OccupancyDailySerializer
+    pagination_class = OrderPagination
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self):
+        queryset = self.queryset
+        route = ids_param(self.request, "route")
+        train = ids_param(self.request, "train")
+        date_from = date_param(self.request, "date_from")
+        date_to = date_param(self.request, "date_to")
+
+        if route:
+            queryset = queryset.filter(route_id__in=route)
+
+        if train:
+            queryset = queryset.filter(train_id__in=train)
+
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "route",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by route id (ex. ?route=2,5)",
+            ),
+            OpenApiParameter(
+                "train",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by train id (ex. ?train=2,5)",
+            ),
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="Days starting from (ex. ?date_from=2024-02-01)",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Days up to (ex. ?date_to=2024-02-29)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class ChangeFeedViewSet(ListModelMixin, GenericViewSet):
+    # Consumers advance a cursor over commit sequences (see
+    # CommitSequence), read from the primary: a lagging replica could
+    # hide events they skip.
+    queryset = OutboxEvent.objects.all()
+    serializer_class = OutboxEventSerializer
+    permission_classes = (IsAdminUser,)
+    max_limit = 1000
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(sequence__isnull=False)
+        topic = self.request.query_params.get("topic")
+
+        if topic:
+            queryset = queryset.filter(topic__in=topic.split(","))
+
+        return queryset.order_by("sequence")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "after",
+                type=OpenApiTypes.INT,
+                description="Return events after this cursor (ex. ?after=120)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Events per batch (ex. ?limit=500, max 1000)",
+            ),
+            OpenApiParameter(
+                "topic",
+                type={"type": "list", "items": {"type": "string"}},
+                description="Filter by topic (ex. ?topic=order.created)",
+            ),
+        ],
+        responses=ChangeFeedSerializer,
+    )
+    def list(self, request, *args, **kwargs):
+        """Endpoint for reading changes in order, one batch at a time"""
+        after = int_param(request, "after", 0, min_value=0)
+        limit = int_param(
+            request, "limit", 100, min_value=1, max_value=self.max_limit
+        )
+        OutboxEvent.assign_sequences()
+
+        events = list(
+            self.get_queryset().filter(sequence__gt=after)[: limit + 1]
+        )
+        has_more = len(events) > limit
+        events = events[:limit]
+
+        serializer = ChangeFeedSerializer(
+            {
+                "next_cursor": events[-1].sequence if events else after,
+                "has_more": has_more,
+                "results": events,
+            }
+        )
+        return Response(serializer.data)
+
+
+class TimetableViewSet(ReplicaReadMixin, GenericViewSet):
+    queryset = TimetableSnapshot.objects.all()
+    permission_classes = (IsAuthenticated,)
+
+    @staticmethod
+    def _delta(old, new):
+        key = f"timetable-delta:{old.version}:{new.version}"
+        body = cache.get(key)
+        if body is None:
+            body = snapshot_delta(old, new)
+            cache.set(key, body, 60 * 60 * 24)
+        return body
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Version held by the client; answered with a delta "
+                    "while that version is kept (ex. ?since=12)"
+                ),
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def list(self, request, *args, **kwargs):
+        """Endpoint for the gzip-compressed offline timetable"""
+        since = int_param(request, "since", None, min_value=0)
+        latest = self.get_queryset().first()
+        if latest is None:
+            # Built on deploy (build_timetable); never inline in a request
+            schedule_build()
+            return Response(
+                {"detail": "The timetable is being built, retry later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "30"},
+            )
+        if latest.window_start != timezone.localdate():
+            # The journeys window moved on; serve this one meanwhile
+            schedule_build()
+
+        etag = f'"timetable-v{latest.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+
+        old = since and self.get_queryset().filter(version=since).first()
+        body = self._delta(old, latest) if old else bytes(latest.bundle)
+
+        response = HttpResponse(content_type="application/json")
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response["Content-Encoding"] = "gzip"
+        else:
+            body = gzip.decompress(body)
+        response.content = body
+        response["ETag"] = etag
+        response["Vary"] = "Accept-Encoding"
+        response["X-Timetable-Version"] = latest.version
+        return response
@@ -0,0 +1,157 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET"], default="GET")
+    path = serializers.CharField()
+    params = serializers.DictField(
+        child=serializers.CharField(), required=False, default=dict
+    )
+
+    def validate_path(self, value):
+        if not value.startswith(tuple(settings.BATCH_ALLOWED_PREFIXES)):
+            raise serializers.ValidationError(
+                f"Path must start with one of "
+                f"{', '.join(settings.BATCH_ALLOWED_PREFIXES)}"
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"At most {settings.BATCH_MAX_REQUESTS} requests per batch."
+            )
+        return value
+
+
+class SubResponseSerializer(serializers.Serializer):
+    status = serializers.IntegerField()
+    body = serializers.JSONField()
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    responses = SubResponseSerializer(many=True)
+
+
+class BatchView(APIView):
+    """
+    Run several read requests to the station and user APIs in one round
+    trip.
+
+    The batch is authenticated once and every sub-request reuses that
+    identity. Sub-requests still go through their own permission and
+    throttle checks, so a batch can not bypass per-user limits.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def build_sub_request(self, request, sub_request):
+        query = QueryDict(mutable=True)
+        query.update(sub_request["params"])
+
+        sub = HttpRequest()
+        sub.method = sub_request["method"]
+        sub.path = sub.path_info = sub_request["path"]
+        sub.META = {
+            key: value
+            for key, value in request._request.META.items()
+            if key not in ("CONTENT_LENGTH", "CONTENT_TYPE", "wsgi.input")
+        }
+        sub.META["REQUEST_METHOD"] = sub.method
+        sub.META["QUERY_STRING"] = query.urlencode()
+        sub.GET = query
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+        return sub
+
+    def run_sub_request(self, request, sub_request):
+        try:
+            match = resolve(sub_request["path"])
+        except Resolver404:
+            return {
+                "status": status.HTTP_404_NOT_FOUND,
+                "body": {"detail": "Not found."},
+            }
+
+        sub = self.build_sub_request(request, sub_request)
+        sub.resolver_match = match
+        try:
+            response = match.func(sub, *match.args, **match.kwargs)
+        except Exception:
+            # One failing sub-request must not take the batch down
+            logger.exception("Batch sub-request %s failed", sub.path)
+            return {
+                "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "body": {"detail": "Internal server error."},
+            }
+
+        if response.streaming:
+            # Exports and event streams may never end; their generators
+            # are closed before producing anything
+            response.close()
+            return {
+                "status": status.HTTP_400_BAD_REQUEST,
+                "body": {
+                    "detail": "Streaming endpoints can not be batched, "
+                    "call them directly."
+                },
+            }
+
+        if hasattr(response, "data"):
+            body = response.data
+        elif response.get("Content-Type", "").startswith("application/json"):
+            body = json.loads(response.content or "null")
+        else:
+            body = None
+        return {"status": response.status_code, "body": body}
+
+    def run_in_thread(self, request, sub_request):
+        try:
+            return self.run_sub_request(request, sub_request)
+        finally:
+            connections.close_all()
+
+    @extend_schema(request=BatchSerializer, responses=BatchResponseSerializer)
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sub_requests = serializer.validated_data["requests"]
+
+        if serializer.validated_data["parallel"] and len(sub_requests) > 1:
+            with ThreadPoolExecutor(
+                max_workers=settings.BATCH_MAX_WORKERS
+            ) as executor:
+                responses = list(
+                    executor.map(
+                        lambda sub_request: self.run_in_thread(
+                            request, sub_request
+                        ),
+                        sub_requests,
+                    )
+                )
+        else:
+            responses = [
+                self.run_sub_request(request, sub_request)
+                for sub_request in sub_requests
+            ]
+
+        return Response({"responses": responses})
@@ -0,0 +1,92 @@
+import json
+import random
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+class RequestCaptureMiddleware:
+    """
+    Append a sample of API requests to ``REQUEST_CAPTURE_PATH`` as JSON
+    lines for ``manage.py loadtest`` to replay.
+
+    Only the request shape is kept: method, path, the id of the
+    authenticated user, a small body and the observed status/latency.
+    Headers are never stored and neither are query parameters outside
+    ``REQUEST_CAPTURE_QUERY_PARAMS`` (so ``?token=`` credentials are
+    not). Only paths under ``REQUEST_CAPTURE_PREFIXES`` are sampled;
+    streaming responses and bodies over ``REQUEST_CAPTURE_MAX_BODY`` are
+    left out as they can not be replayed faithfully. Disabled unless the
+    path is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_CAPTURE_PATH:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_CAPTURE_SAMPLE_RATE
+        self.max_body = settings.REQUEST_CAPTURE_MAX_BODY
+        self.prefixes = tuple(settings.REQUEST_CAPTURE_PREFIXES)
+        self.query_params = set(settings.REQUEST_CAPTURE_QUERY_PARAMS)
+        self._lock = threading.Lock()
+        self._file = open(
+            settings.REQUEST_CAPTURE_PATH, "a", buffering=1, encoding="utf-8"
+        )
+
+    def should_capture(self, request):
+        return (
+            request.path.startswith(self.prefixes)
+            and random.random() < self.sample_rate
+        )
+
+    def path_of(self, request):
+        """Path with only the allowed query parameters"""
+        query = urlencode(
+            [
+                (name, value)
+                for name, values in request.GET.lists()
+                if name in self.query_params
+                for value in values
+            ]
+        )
+        return f"{request.path}?{query}" if query else request.path
+
+    def __call__(self, request):
+        if not self.should_capture(request):
+            return self.get_response(request)
+
+        # Read the body before the view consumes the stream
+        body = None
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+            if length > self.max_body:
+                # Replayed without its body it would only measure errors
+                return self.get_response(request)
+            if length:
+                body = request.body.decode("utf-8", errors="replace")
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if response.streaming:
+            return response
+
+        # DRF copies the authenticated user back onto the Django request
+        user = getattr(request, "user", None)
+        record = {
+            "ts": round(time.time(), 3),
+            "method": request.method,
+            "path": self.path_of(request),
+            "user": user.pk if user and user.is_authenticated else None,
+            "content_type": request.content_type if body else None,
+            "body": body,
+            "status": response.status_code,
+            "ms": round(elapsed_ms, 1),
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+        return response
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import patch_cache_control
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework import status
+from rest_framework.settings import api_settings
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    ``CODE_VERSION`` when the deploy sets it (ex. the git commit),
+    otherwise a fingerprint of the project's Python sources
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(__file__).resolve().parent}
+    roots.update(
+        Path(config.path).resolve()
+        for config in apps.get_app_configs()
+        if Path(config.path).resolve().is_relative_to(base_dir)
+    )
+    digest = hashlib.sha256()
+    for root in sorted(roots):
+        for path in sorted(root.rglob("*.py")):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def write_schema_artifact(schema, path):
+    """Store a generated schema with the code version it belongs to"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump({"code_version": code_version(), "schema": schema}, file)
+    os.replace(tmp_path, path)
+
+
+def read_schema_artifact(path):
+    """Schema stored by ``build_schema`` if it matches the running code"""
+    try:
+        with open(path, encoding="utf-8") as file:
+            artifact = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if artifact.get("code_version") != code_version():
+        return None
+    return artifact["schema"]
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    OpenAPI schema generated once per code version instead of on every
+    request: read from the ``SCHEMA_PATH`` artifact written by
+    ``manage.py build_schema`` or generated on the first request, then
+    held in memory together with each rendered format.
+
+    Responses carry an ETag derived from the schema, so Swagger UI,
+    Redoc and other clients revalidate with ``304 Not Modified``.
+
+    Only versions in ``ALLOWED_VERSIONS`` and languages in ``LANGUAGES``
+    get a schema of their own; anything else a client sends is served
+    the default one, so the cache can not grow with arbitrary input.
+    """
+
+    _lock = threading.Lock()
+    _schemas = {}
+    _rendered = {}
+
+    @staticmethod
+    def schema_language(language=None):
+        """Closest language of ``LANGUAGES``, the default one if none"""
+        try:
+            return translation.get_supported_language_variant(
+                language or translation.get_language()
+            )
+        except LookupError:
+            return translation.get_supported_language_variant(
+                settings.LANGUAGE_CODE
+            )
+
+    def get_schema(self, request, version, language):
+        key = (code_version(), version, language)
+        schema = self._schemas.get(key)
+        if schema is not None:
+            return schema
+
+        with self._lock, translation.override(language):
+            schema = self._schemas.get(key)
+            if schema is None:
+                # The artifact is generated for the default language and
+                # API version only
+                default = self.schema_language(settings.LANGUAGE_CODE)
+                if version is None and language == default:
+                    schema = read_schema_artifact(settings.SCHEMA_PATH)
+                if schema is None:
+                    generator = self.generator_class(
+                        urlconf=self.urlconf,
+                        api_version=version,
+                        patterns=self.patterns,
+                    )
+                    schema = generator.get_schema(
+                        request=request, public=self.serve_public
+                    )
+                self._schemas[key] = schema
+        return schema
+
+    def render(self, request, schema, key):
+        """Rendered body and its ETag, rendered once per format"""
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            content = request.accepted_renderer.render(
+                schema,
+                request.accepted_renderer.media_type,
+                self.get_renderer_context(),
+            )
+            etag = hashlib.sha256(content).hexdigest()[:32]
+            rendered = self._rendered[key] = (content, f'"{etag}"')
+        return rendered
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version
+            or request.version
+            or self._get_version_parameter(request)
+        )
+        if version not in (api_settings.ALLOWED_VERSIONS or ()):
+            version = None
+        language = self.schema_language()
+        schema = self.get_schema(request, version, language)
+        # Keyed by renderer, not by the negotiated media type, which
+        # carries whatever parameters the Accept header had
+        content, etag = self.render(
+            request,
+            schema,
+            (
+                code_version(),
+                version,
+                language,
+                type(request.accepted_renderer),
+            ),
+        )
+
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(
+                content,
+                content_type=(
+                    f"{request.accepted_renderer.media_type}; "
+                    f"charset={request.accepted_renderer.charset}"
+                    if request.accepted_renderer.charset
+                    else request.accepted_renderer.media_type
+                ),
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.SCHEMA_CACHE_MAX_AGE
+        )
+        return response
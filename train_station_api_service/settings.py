@@ -63,6 +63,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "train_station_api_service.capture.RequestCaptureMiddleware",
 ]
 
 ROOT_URLCONF = "train_station_api_service.urls"
@@ -97,9 +98,55 @@ DATABASES = {
         "NAME": os.environ["POSTGRES_DB"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+        # Keep connections open between requests and check them on reuse.
+        # Each worker thread holds one connection, so the per-worker pool
+        # size is the number of threads the worker runs.
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "connect_timeout": int(
+                os.environ.get("POSTGRES_CONNECT_TIMEOUT", 5)
+            ),
+        },
     }
 }
 
+# Read replicas, e.g. POSTGRES_REPLICA_HOSTS=replica-1,replica-2
+DATABASE_REPLICAS = []
+
+for index, host in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")),
+    start=1,
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["station.db_router.PrimaryReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they write
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -173,6 +220,110 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# /api/schema/ is generated once per code version: CODE_VERSION (ex. the
+# git commit, set at deploy) or a fingerprint of the sources if unset.
+# `manage.py build_schema` stores it at SCHEMA_PATH ahead of the first
+# request.
+CODE_VERSION = os.environ.get("CODE_VERSION")
+SCHEMA_PATH = os.environ.get("SCHEMA_PATH", "/vol/web/data/schema.json")
+SCHEMA_CACHE_MAX_AGE = 60 * 60
+
+# Journeys that arrived longer ago are moved by archive_journeys
+JOURNEY_RETENTION_DAYS = 180
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+# An unfinished request holding a key longer than this is taken to have
+# died, and a retry runs it again
+IDEMPOTENCY_LOCK_TIMEOUT = timedelta(minutes=2)
+
+# Seconds a station departure/arrival board stays cached
+BOARD_CACHE_TTL = 30
+
+# Seconds before autocomplete counts journeys per station again
+STATION_POPULARITY_TTL = 10 * 60
+
+# Seat availability SSE stream: seconds between heartbeats and before
+# the server closes the stream (clients reconnect for a fresh snapshot)
+SEAT_STREAM_HEARTBEAT = 15
+SEAT_STREAM_MAX_SECONDS = 300
+# Redis that carries seat events between processes (web workers and
+# process_sale_queue); without it streams only see their own process
+SEAT_EVENTS_REDIS_URL = os.environ.get("REDIS_URL")
+
+# Seconds a journey seat map stays cached; it is patched on every sale.
+# Caching needs a cache shared by every process (Redis): patches made by
+# process_sale_queue or other workers never reach a process-local cache,
+# so without one the map is rendered from the primary on each request.
+SEAT_MAP_CACHE = bool(os.environ.get("REDIS_URL"))
+SEAT_MAP_CACHE_TTL = 60 * 60
+
+# Days change feed events are kept before purge_outbox_events drops them
+OUTBOX_RETENTION_DAYS = 30
+
+# Delta sync (?since= on stations, routes, trains and journeys): days
+# tombstones of deleted rows are kept (older cursors must start over)
+SYNC_TOMBSTONE_DAYS = 30
+
+# Offline timetable: days of journeys in a snapshot, how many past
+# versions are kept for delta downloads and seconds after a change before
+# the background rebuild
+TIMETABLE_DAYS = 30
+TIMETABLE_KEEP_VERSIONS = 10
+TIMETABLE_REBUILD_DELAY = 10
+
+# All-pairs station distance matrix file, rebuilt in the background this
+# many seconds after routes change
+DISTANCE_MATRIX_PATH = os.environ.get(
+    "DISTANCE_MATRIX_PATH", "/vol/web/data/distance_matrix.bin"
+)
+DISTANCE_MATRIX_REBUILD_DELAY = 5
+
+# /api/batch/ limits
+BATCH_ALLOWED_PREFIXES = ("/api/station/", "/api/user/")
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# Sampled request log replayed by `manage.py loadtest`; capture is off
+# unless REQUEST_CAPTURE_PATH is set
+REQUEST_CAPTURE_PATH = os.environ.get("REQUEST_CAPTURE_PATH")
+REQUEST_CAPTURE_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_CAPTURE_SAMPLE_RATE", 0.01)
+)
+REQUEST_CAPTURE_MAX_BODY = 4096
+REQUEST_CAPTURE_PREFIXES = ("/api/station/", "/api/batch/")
+# Query parameters kept in the log; anything else (ex. ?token=) is dropped
+REQUEST_CAPTURE_QUERY_PARAMS = (
+    "after",
+    "arrival_time",
+    "cursor",
+    "date",
+    "date_from",
+    "date_to",
+    "departure_time",
+    "destination",
+    "end",
+    "expand",
+    "fields",
+    "format",
+    "journey",
+    "limit",
+    "min_stay",
+    "origin",
+    "outbound_date",
+    "page",
+    "page_size",
+    "q",
+    "return_date",
+    "route",
+    "since",
+    "source",
+    "start",
+    "topic",
+    "train",
+    "wait",
+)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
@@ -19,17 +19,19 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
+from train_station_api_service.batch import BatchView
+from train_station_api_service.schema import CachedSchemaView
 from drf_spectacular.views import (
     SpectacularSwaggerView,
     SpectacularRedocView,
-    SpectacularAPIView,
 )
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/station/", include("station.urls", namespace="station")),
     path("api/user/", include("api_user.urls", namespace="user")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path("api/schema/", CachedSchemaView.as_view(), name="schema"),
     path(
         "api/doc/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),